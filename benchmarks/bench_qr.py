@@ -0,0 +1,42 @@
+"""Benchmark de l'étape QR : temps d'encodage selon le nombre de workers.
+
+Usage : python -m benchmarks.bench_qr [--n 2000] [--workers 1,2,4,8]
+Chaque mesure part d'un cache vide ; une dernière passe montre le coût
+d'un build où toutes les URLs sont déjà en cache.
+"""
+import argparse, os, tempfile, time
+from pathlib import Path
+
+import src.qr_codes as QR
+
+def run(n, workers, base="https://example.org/eco-score/p"):
+    urls = [f"{base}/sku-{i:07d}/" for i in range(n)]
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "qr"; out.mkdir()
+        jobs = [(u, out / f"{i}.png") for i, u in enumerate(urls)]
+        t0 = time.perf_counter()
+        QR.generate(jobs, Path(tmp) / "cache", workers=workers)
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        QR.generate(jobs, Path(tmp) / "cache", workers=workers)
+        warm = time.perf_counter() - t0
+    return cold, warm
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=2000)
+    ap.add_argument("--workers", default=None, help="liste séparée par des virgules")
+    args = ap.parse_args()
+    cpus = os.cpu_count() or 1
+    counts = [int(w) for w in args.workers.split(",")] if args.workers else sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+
+    print(f"{args.n} QR, {cpus} cœurs")
+    print(f"{'workers':>8} {'froid (s)':>10} {'QR/s':>8} {'speedup':>8} {'cache (s)':>10}")
+    base = None
+    for w in counts:
+        cold, warm = run(args.n, w)
+        base = base or cold
+        print(f"{w:>8} {cold:>10.2f} {args.n / cold:>8.0f} {base / cold:>7.2f}x {warm:>10.2f}")
+
+if __name__ == "__main__":
+    main()
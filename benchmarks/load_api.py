@@ -0,0 +1,115 @@
+"""Test de charge du service de scores (src/api.py).
+
+Usage :
+  python -m benchmarks.load_api                       # lance un service local sur data/
+  python -m benchmarks.load_api --size 100k           # ... sur un catalogue synthétique
+  python -m benchmarks.load_api --url http://127.0.0.1:8765 --batch 50
+
+N connexions keep-alive en parallèle (--concurrency) envoient des requêtes
+GET /score/<id> (ou POST /scores par lots de --batch ids) pendant --duration s ;
+affiche p50 / p99 de latence et requêtes par seconde.
+"""
+import argparse, asyncio, json, random, socket, subprocess, sys, time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+import src.validate_data as V
+from benchmarks.run import dataset
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+async def _request(reader, writer, raw):
+    writer.write(raw)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (h := await reader.readline()) not in (b"\r\n", b""):
+        if h.lower().startswith(b"content-length:"):
+            length = int(h.split(b":")[1])
+    await reader.readexactly(length)
+    return status
+
+def _raw(host, keys, batch):
+    if batch <= 1:
+        return f"GET /score/{keys[0]} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    body = json.dumps({"ids": keys}).encode()
+    return (f"POST /scores HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+async def _client(host, port, keys, batch, deadline, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            raw = _raw(host, rng.sample(keys, min(batch, len(keys))), batch)
+            t0 = time.perf_counter()
+            status = await _request(reader, writer, raw)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def load(url, keys, concurrency=16, duration=5.0, batch=1, seed=0):
+    parts = urlsplit(url)
+    latencies, errors = [], []
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    await asyncio.gather(*(_client(parts.hostname, parts.port, keys, batch, deadline, latencies, errors,
+                                   random.Random(seed + i)) for i in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "ids_per_s": round(len(latencies) * batch / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_service(data_dir: Path, timeout=600):
+    """Service lancé dans un sous-process (pas de partage de boucle avec le client)."""
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, "-m", "src.api", "--port", str(port), "--data", str(data_dir)],
+                            stdout=subprocess.PIPE, text=True)
+    t0 = time.perf_counter()
+    for line in proc.stdout:
+        if line.startswith("Service de scores"):
+            print(f"{line.strip()} (prêt en {time.perf_counter() - t0:.1f}s)")
+            return proc, f"http://127.0.0.1:{port}"
+        if time.perf_counter() - t0 > timeout:
+            break
+    proc.kill()
+    raise RuntimeError("le service n'a pas démarré")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Test de charge du service de scores")
+    ap.add_argument("--url", help="service déjà lancé ; sinon un service local est démarré")
+    ap.add_argument("--size", help="catalogue synthétique (1k, 100k, ...) au lieu de data/")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=5.0)
+    ap.add_argument("--batch", type=int, default=1, help="ids par requête (POST /scores si > 1)")
+    args = ap.parse_args(argv)
+
+    data_dir = dataset(args.size, 0) if args.size else V.DATA_DIR
+    keys = pd.read_csv(data_dir / "products.csv", usecols=["id"], dtype=str)["id"].str.strip().tolist()
+    proc, url = (None, args.url) if args.url else start_service(data_dir)
+    try:
+        res = asyncio.run(load(url, keys, args.concurrency, args.duration, args.batch))
+    finally:
+        if proc:
+            proc.terminate()
+    print(f"{res['requests']} requêtes ({res['errors']} erreurs) en {args.duration}s, "
+          f"{args.concurrency} connexions, lots de {args.batch}")
+    print(f"p50 {res['p50_ms']} ms  p99 {res['p99_ms']} ms  {res['rps']} req/s  {res['ids_per_s']} ids/s")
+
+if __name__ == "__main__":
+    main()
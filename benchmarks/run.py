@@ -0,0 +1,198 @@
+"""Benchmark de bout en bout du pipeline sur un catalogue synthétique.
+
+Usage :
+  python -m benchmarks.run --size 1k               # mesure + comparaison aux baselines
+  python -m benchmarks.run --size 100k --check     # code retour 1 si régression
+  python -m benchmarks.run --size 1k --update-baseline
+
+Pour chaque étape : durée (s) et pic mémoire Python (Mo, tracemalloc) au-delà
+de la mémoire déjà allouée. Les étapes QR et planches PDF tournent sur un
+échantillon (--qr-sample, --sheet-pages) : le débit est extrapolé au catalogue.
+Les baselines (baselines.json) sont mesurées avec tracemalloc actif ; ne les
+comparer qu'à des mesures prises de la même façon et sur la même machine.
+Taille (ou étape) sans baseline : signalée, et échec avec --check.
+"""
+import argparse, json, shutil, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+import src.validate_data as V
+import src.dataset as D
+import src.build_site as B
+import src.qr_codes as QR
+import src.manifest as M
+import src.catalog_index as CI
+import src.render as R
+from src.scoring import score_frame
+import export_scores as ES
+import qr_sheet as S
+from benchmarks.synth import generate, parse_size
+
+HERE = Path(__file__).resolve().parent
+BASELINES = HERE / "baselines.json"
+DATA_CACHE = B.ROOT / ".cache" / "bench"
+
+# Marges absolues : en dessous, l'écart relève du bruit de mesure
+MIN_SLACK_S = 0.05
+MIN_SLACK_MB = 2.0
+
+def _stages(ctx):
+    """(nom, fonction) dans l'ordre du pipeline ; chaque fonction enrichit ctx."""
+    cfg = B.load_config()
+    weights, _, grade_bands = B.score_config(cfg)
+    auto = cfg.get("auto_bounds") or {}
+
+    def load_all():
+        ctx["tables"] = V.load_all()
+
+    def merges():
+        df = D.join(*ctx.pop("tables"))
+        for col in ["base_kgco2e", "distance_km", "biodiversity_risk"]:
+            df = B.ensure_numeric(df, col, 0.0)
+        ctx["df"] = df
+
+    def auto_bounds():
+        low, high = auto.get("low", 0.05), auto.get("high", 0.95)
+        ctx["bounds"] = {k: list(B.auto_bounds(ctx["df"][k], low, high))
+                         for k in ["base_kgco2e", "distance_km", "biodiversity_risk"]}
+
+    def scoring():
+        # Bornes de l'étape précédente : celles de config.yaml sont calibrées sur les données réelles
+        df = ctx["df"]
+        df["score"], df["grade"] = score_frame(df, weights, ctx["bounds"], grade_bands)
+
+    def records():
+        ctx["records"] = [B.make_record(r) for r in ctx["df"].to_dict(orient="records")]
+
+    def html_render():
+        renderer = R.Renderer(B.REPO_URL_BASE, cfg.get("meta", {}) | {"build_time": "bench"})
+        recs = ctx["records"]
+        for rec in recs:
+            renderer.render_product(rec)
+        for loc in renderer.locales:
+            for start in range(0, len(recs), CI.PAGE_SIZE):
+                renderer.index_page(loc, recs[start:start + CI.PAGE_SIZE])
+        ctx["render_report"] = renderer.report()
+
+    def qr_generation():
+        sample = ctx["records"][:ctx["qr_sample"]]
+        out = ctx["tmp"] / "qr"; out.mkdir()
+        QR.generate([(r["url"], out / f"{r['slug']}.png") for r in sample], ctx["tmp"] / "qr-cache", workers=1)
+        ctx["extrapolate"]["qr_generation"] = len(ctx["records"]) / max(1, len(sample))
+
+    def manifest_write():
+        M.write(ctx["build"], ctx["records"], {"bench": True}, fmt="ndjson")
+
+    def export_scores():
+        ES.BUILD, ES.OUT_DIR = ctx["build"], ctx["tmp"]
+        ES.main()
+
+    def qr_sheet():
+        sample = ctx["records"][:ctx["sheet_pages"] * S.COLS * S.ROWS]
+        S.write_pdf(sample, ctx["tmp"] / "sheets.pdf", workers=1)
+        ctx["extrapolate"]["qr_sheet"] = len(ctx["records"]) / max(1, len(sample))
+
+    return [("load_all", load_all), ("merges", merges), ("auto_bounds", auto_bounds),
+            ("scoring", scoring), ("records", records), ("html_render", html_render),
+            ("qr_generation", qr_generation), ("manifest_write", manifest_write),
+            ("export_scores", export_scores), ("qr_sheet", qr_sheet)]
+
+def dataset(size, seed):
+    """Catalogue synthétique (généré une fois, gardé dans .cache/bench)."""
+    dest = DATA_CACHE / f"{size}-seed{seed}"
+    if not (dest / "biodiv.csv").exists():
+        shutil.rmtree(dest, ignore_errors=True)
+        generate(dest, parse_size(size), seed)
+    return dest
+
+def run(size="1k", seed=0, qr_sample=200, sheet_pages=5, memory=True):
+    V.DATA_DIR = dataset(size, seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = {"tmp": Path(tmp), "build": Path(tmp) / "site_build", "extrapolate": {},
+               "qr_sample": qr_sample, "sheet_pages": sheet_pages}
+        ctx["build"].mkdir()
+        if memory:
+            tracemalloc.start()
+        for name, fn in _stages(ctx):
+            base = tracemalloc.get_traced_memory()[0] if memory else 0
+            if memory:
+                tracemalloc.reset_peak()
+            t0 = time.perf_counter()
+            fn()
+            seconds = time.perf_counter() - t0
+            res = {"seconds": round(seconds, 4)}
+            if memory:
+                res["peak_mb"] = round((tracemalloc.get_traced_memory()[1] - base) / 2**20, 1)
+            if name in ctx["extrapolate"]:
+                res["estimated_full_seconds"] = round(seconds * ctx["extrapolate"][name], 1)
+            results[name] = res
+        if memory:
+            tracemalloc.stop()
+    return results
+
+def regressions(results, baseline, threshold):
+    """Étapes plus lentes (ou plus gourmandes) que baseline × (1 + threshold), ou sans baseline."""
+    out = []
+    for name, res in results.items():
+        ref = baseline.get(name)
+        if not ref:
+            out.append(f"{name}: pas de baseline")
+            continue
+        if res["seconds"] > ref["seconds"] * (1 + threshold) + MIN_SLACK_S:
+            out.append(f"{name}: {res['seconds']}s > {ref['seconds']}s")
+        if "peak_mb" in res and "peak_mb" in ref and res["peak_mb"] > ref["peak_mb"] * (1 + threshold) + MIN_SLACK_MB:
+            out.append(f"{name}: {res['peak_mb']} Mo > {ref['peak_mb']} Mo")
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark du pipeline éco-score")
+    ap.add_argument("--size", default="1k", help="1k, 100k, 1m ou un entier")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--qr-sample", type=int, default=None, help="défaut : celui de la baseline, sinon 200")
+    ap.add_argument("--sheet-pages", type=int, default=None, help="défaut : celui de la baseline, sinon 5")
+    ap.add_argument("--no-memory", action="store_true", help="sans tracemalloc (timings plus fidèles)")
+    ap.add_argument("--threshold", type=float, default=0.25, help="tolérance relative (0.25 = +25 %%)")
+    ap.add_argument("--check", action="store_true", help="code retour 1 en cas de régression")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--json", help="écrit les résultats dans ce fichier")
+    args = ap.parse_args(argv)
+
+    baselines = json.loads(BASELINES.read_text(encoding="utf-8")) if BASELINES.exists() else {}
+    # Mêmes échantillons que la baseline, pour des mesures comparables
+    params = {"qr_sample": 200, "sheet_pages": 5}
+    params.update(baselines.get(args.size, {}).get("params", {}))
+    params.update({k: v for k, v in [("qr_sample", args.qr_sample), ("sheet_pages", args.sheet_pages)] if v})
+    params["seed"] = args.seed
+    results = run(args.size, params["seed"], params["qr_sample"], params["sheet_pages"], memory=not args.no_memory)
+    baseline = baselines.get(args.size, {}).get("stages", {})
+
+    print(f"catalogue {args.size} ({params})")
+    print(f"{'étape':<16}{'s':>10}{'Mo':>10}{'baseline s':>12}{'estim. total s':>16}")
+    for name, res in results.items():
+        ref = baseline.get(name, {}).get("seconds", "-")
+        print(f"{name:<16}{res['seconds']:>10}{res.get('peak_mb', '-'):>10}{ref:>12}"
+              f"{res.get('estimated_full_seconds', ''):>16}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({args.size: {"params": params, "stages": results}}, indent=2),
+                                   encoding="utf-8")
+    if args.update_baseline:
+        baselines[args.size] = {"params": params, "stages": results}
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Baseline {args.size} mise à jour ({BASELINES.name})")
+        return
+
+    if not baseline:
+        print(f"AUCUNE BASELINE pour {args.size} ({BASELINES.name}) : rien à comparer, "
+              f"--update-baseline pour l'enregistrer")
+        if args.check:
+            sys.exit(1)
+        return
+    bad = regressions(results, baseline, args.threshold)
+    for line in bad:
+        print(f"RÉGRESSION {line}")
+    if bad and args.check:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Générateur déterministe de catalogues synthétiques (mêmes colonnes que data/).
+
+Usage : python -m benchmarks.synth <dossier> --size 100k [--seed 0]
+Produit products, agribalyse, distances, biodiv, seasonality, suppliers et
+examples/{lca,transport}.csv, cohérents entre eux (ids, lcaRefId, supplierId).
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+CATEGORIES = ["Dairy", "Beef", "LegumeSec", "Tomate", "Cereales", "Volaille", "Fruits", "Boissons"]
+WORDS = ["Yaourt", "Steak", "Lentilles", "Tomates", "Pâtes", "Poulet", "Pommes", "Jus",
+         "Fromage", "Riz", "Haricots", "Soupe", "Biscuits", "Lait", "Compote", "Farine"]
+QUALIFIERS = ["nature", "bio", "haché", "vertes", "complètes", "fermier", "local", "allégé",
+              "entier", "doux", "épicé", "classique"]
+COUNTRIES = ["FR", "ES", "IT", "DE", "BE", "NL", "MA", "BR"]
+MODES = ["road", "ship", "rail", "air"]
+REFS_PER_CATEGORY = 50
+
+def parse_size(size) -> int:
+    return SIZES.get(str(size).lower()) or int(size)
+
+def generate(dest: Path, n: int, seed: int = 0) -> dict:
+    """Écrit un catalogue de `n` produits dans `dest` ; renvoie {fichier: lignes}."""
+    rng = np.random.default_rng(seed)
+    dest = Path(dest)
+    (dest / "examples").mkdir(parents=True, exist_ok=True)
+
+    ids = (3_000_000_000_000 + np.arange(n)).astype(str)
+    cat = rng.integers(0, len(CATEGORIES), n)
+    categories = np.array(CATEGORIES)[cat]
+    names = (pd.Series(np.array(WORDS)[rng.integers(0, len(WORDS), n)]) + " "
+             + pd.Series(np.array(QUALIFIERS)[rng.integers(0, len(QUALIFIERS), n)]) + " "
+             + pd.Series(rng.integers(1, 100, n) * 10).astype(str) + "g")
+    n_sup = max(10, n // 100)
+    ref = rng.integers(0, REFS_PER_CATEGORY, n)
+
+    tables = {}
+    tables["products.csv"] = pd.DataFrame({
+        "id": ids, "gtin": ids, "name": names,
+        "brand": "Marque" + pd.Series(rng.integers(0, 500, n)).astype(str),
+        "category": categories,
+        "unit": np.where(rng.random(n) < 0.8, "unit", "kg"),
+        "originCountry": np.array(COUNTRIES)[rng.integers(0, len(COUNTRIES), n)],
+        "supplierId": "SUP" + pd.Series(rng.integers(0, n_sup, n)).map("{:05d}".format),
+        "lcaRefId": "LCA-" + pd.Series(categories) + "-" + pd.Series(ref).map("{:03d}".format),
+    })
+    tables["agribalyse.csv"] = pd.DataFrame({"id": ids, "kgco2e_unit": rng.lognormal(0.3, 0.9, n).round(3)})
+    tables["distances.csv"] = pd.DataFrame({
+        "id": ids, "distance_km": rng.gamma(2.0, 600.0, n).round(0),
+        "mode": np.array(MODES)[rng.integers(0, len(MODES), n)],
+    })
+    tables["biodiv.csv"] = pd.DataFrame({"id": ids, "biodiversity_risk": rng.random(n).round(2)})
+    tables["seasonality.csv"] = pd.DataFrame(
+        [(c, m, round(float(rng.uniform(0.3, 1.0)), 2)) for c in CATEGORIES for m in range(1, 13)],
+        columns=["category", "month", "factor"])
+    tables["suppliers.csv"] = pd.DataFrame({
+        "id": [f"SUP{i:05d}" for i in range(n_sup)],
+        "name": [f"Fournisseur {i}" for i in range(n_sup)],
+        "country": np.array(COUNTRIES)[rng.integers(0, len(COUNTRIES), n_sup)],
+        "practices": np.array(["agroecology;pasture", "intensive", "rotation", ""])[rng.integers(0, 4, n_sup)],
+        "certs": np.array(["AB;HVE", "", "EQ;FAIR", "BIO"])[rng.integers(0, 4, n_sup)],
+        "policy": "https://example.org/policy",
+    })
+    n_ref = len(CATEGORIES) * REFS_PER_CATEGORY
+    tables["examples/lca.csv"] = pd.DataFrame({
+        "ref": [f"LCA-{c}-{k:03d}" for c in CATEGORIES for k in range(REFS_PER_CATEGORY)],
+        "category": [c for c in CATEGORIES for _ in range(REFS_PER_CATEGORY)],
+        "ghg": rng.lognormal(0.5, 1.0, n_ref).round(2),
+        "water": rng.uniform(5, 3000, n_ref).round(0),
+        "land": rng.uniform(0.1, 15, n_ref).round(2),
+        "pm": rng.uniform(0.005, 0.4, n_ref).round(3),
+        "eutro": rng.uniform(0.005, 0.4, n_ref).round(3),
+        "biodiversity": rng.uniform(0.05, 4, n_ref).round(2),
+    })
+    legs = rng.random(n) < 0.3
+    tables["examples/transport.csv"] = pd.DataFrame({
+        "gtin": ids[legs],
+        "mode": np.array(["truck", "ship", "rail"])[rng.integers(0, 3, legs.sum())],
+        "km": rng.integers(50, 5000, legs.sum()),
+        "emissionFactor": np.array([0.0007, 0.0001, 0.00003])[rng.integers(0, 3, legs.sum())],
+    })
+
+    for name, df in tables.items():
+        df.to_csv(dest / name, index=False)
+    return {name: len(df) for name, df in tables.items()}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Catalogue synthétique déterministe")
+    ap.add_argument("dest")
+    ap.add_argument("--size", default="1k", help="1k, 100k, 1m ou un entier")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    for name, rows in generate(Path(args.dest), parse_size(args.size), args.seed).items():
+        print(f"{name}: {rows} lignes")
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,13 @@
 import { defaultWeights, saveWeights } from '../src/score/weights.js';
-import { computeScore, defaultNorms, loadCSV } from '../src/score/compute.js';
+import { loadAll, scoreFor } from '../src/score/precomputed.js';
+import { loadAlternatives } from '../src/score/alternatives.js';
 
 const tbody = document.querySelector('#productsTable tbody');
 const loadBtn = document.getElementById('loadDemo');
 const clearBtn = document.getElementById('clear');
 const slidersDiv = document.getElementById('sliders');
 
-let ctx = {
-  lcaByRef: {},
-  seasonTable: [],
-  transportsByGtin: {},
-  suppliersById: {},
-  month: (new Date().getMonth()+1),
-  norms: defaultNorms
-};
-
-async function init(){
-  // Load auxiliary data
-  const [lca, season, trans, sups] = await Promise.all([
-    loadCSV('../data/examples/lca.csv'),
-    loadCSV('../data/seasonality.csv'),
-    loadCSV('../data/examples/transport.csv'),
-    loadCSV('../data/suppliers.csv')
-  ]);
-  lca.forEach(r=> ctx.lcaByRef[r.ref] = { impacts: {
-    ghg: Number(r.ghg), water: Number(r.water), land: Number(r.land), pm: Number(r.pm), eutro: Number(r.eutro), biodiversity: Number(r.biodiversity||NaN)
-  }});
-  ctx.seasonTable = season;
-  trans.forEach(r=> {
-    ctx.transportsByGtin[r.gtin] = ctx.transportsByGtin[r.gtin] || [];
-    ctx.transportsByGtin[r.gtin].push({mode:r.mode, km:Number(r.km), emissionFactor:Number(r.emissionFactor)});
-  });
-  sups.forEach(s=> ctx.suppliersById[s.id] = s);
-
-  renderSliders();
-}
-init();
+renderSliders();
 
 function renderSliders(){
   const w = defaultWeights();
@@ -65,7 +37,7 @@ function renderSliders(){
 }
 
 loadBtn.addEventListener('click', async ()=>{
-  const products = await loadCSV('../data/products.csv');
+  const products = await loadAll();
   window.productsCache = products;
   renderTable(products);
 });
@@ -75,22 +47,28 @@ clearBtn.addEventListener('click', ()=>{
   window.productsCache = null;
 });
 
-async function renderTable(products){
+function renderTable(products){
   tbody.innerHTML = '';
+  const w = defaultWeights();
   for(const p of products){
-    const res = await computeScore(p, ctx);
+    const res = scoreFor(p, w);
     const tr = document.createElement('tr');
-    tr.innerHTML = \`
-      <td>\${p.gtin}</td>
-      <td>\${p.name}</td>
-      <td>\${p.originCountry}</td>
-      <td><b>\${res.score}</b></td>
-      <td class="badge badge-\${res.letter}">\${res.letter}</td>
+    tr.innerHTML = `
+      <td>${p.gtin}</td>
+      <td>${p.name}</td>
+      <td>${p.originCountry}</td>
+      <td><b>${res.score}</b></td>
+      <td class="badge badge-${res.letter}">${res.letter}</td>
       <td>
-        <a href="../p/?gtin=\${encodeURIComponent(p.gtin)}">Fiche</a> ·
-        <button data-gtin="\${p.gtin}" class="add">+ Panier</button>
-      </td>\`;
+        <a href="../p/?gtin=${encodeURIComponent(p.gtin)}">Fiche</a> ·
+        <button data-gtin="${p.gtin}" class="add">+ Panier</button>
+        <span class="alt"></span>
+      </td>`;
     tbody.appendChild(tr);
+    loadAlternatives(p.gtin, { weights: w, score: res.score }).then(alts=> {
+      if(alts.length) tr.querySelector('.alt').innerHTML =
+        ` · mieux : <a href="../p/?gtin=${encodeURIComponent(alts[0].gtin)}">${alts[0].name}</a> (${alts[0].grade})`;
+    });
   }
   tbody.querySelectorAll('button.add').forEach(btn=> btn.addEventListener('click', ()=> addToBasket(btn.dataset.gtin)));
 }
@@ -1,10 +1,24 @@
 // Simple embeddable widget (no framework)
-export function initWidget({ el, gtin, theme='light' }){
+// api : URL du service local de scores (python -m src.api) ; sinon iframe de la fiche
+export async function initWidget({ el, gtin, theme='light', api=null }){
   const root = (typeof el === 'string') ? document.querySelector(el) : el;
   if(!root) return;
+  if(api){
+    const res = await fetch(`${api.replace(/\/$/, '')}/score/${encodeURIComponent(gtin)}`).catch(()=> null);
+    if(res && res.ok){
+      const p = await res.json();
+      const month = new Date().getMonth();
+      const score = p.monthly ? p.monthly.score[month] : Math.round(p.score);
+      const letter = p.monthly ? p.monthly.letter[month] : p.grade;
+      root.innerHTML = `
+    <div class="eco-widget eco-${theme}"><span class="badge badge-${letter}">${letter}</span> ${p.name} — Score ${score}</div>
+  `;
+      return;
+    }
+  }
   const url = new URL('/p/', location.origin);
   url.searchParams.set('gtin', gtin);
-  root.innerHTML = \`
-    <iframe src="\${url.toString()}" style="width:100%;height:220px;border:0;"></iframe>
-  \`;
+  root.innerHTML = `
+    <iframe src="${url.toString()}" style="width:100%;height:220px;border:0;"></iframe>
+  `;
 }
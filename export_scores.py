@@ -1,14 +1,17 @@
 from pathlib import Path
-import json, csv
+import csv
 
-ROOT = Path(__file__).resolve().parents[1]
+import src.manifest as M
+
+ROOT = Path(__file__).resolve().parent
 BUILD = ROOT / "site_build"
 OUT_DIR = ROOT / "artifacts"
-OUT_DIR.mkdir(exist_ok=True, parents=True)
 
-def main():
-    manifest = json.loads((BUILD / "manifest.json").read_text(encoding="utf-8"))
-    rows = manifest["records"]
+def main(rows=None):
+    """`rows` : records déjà en mémoire (pipeline), sinon relus du manifest."""
+    if rows is None:
+        rows = M.iter_records(BUILD)   # en flux, shard par shard
+    OUT_DIR.mkdir(exist_ok=True, parents=True)
     out = OUT_DIR / "scores.csv"
     with out.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
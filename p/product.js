@@ -1,4 +1,6 @@
-import { computeScore, defaultNorms, loadCSV } from '../src/score/compute.js';
+import { defaultWeights } from '../src/score/weights.js';
+import { loadRecord, scoreFor } from '../src/score/precomputed.js';
+import { loadAlternatives } from '../src/score/alternatives.js';
 
 const container = document.getElementById('product');
 
@@ -8,27 +10,12 @@ async function init(){
   const gtin = params().gtin;
   if(!gtin){ container.textContent = 'GTIN manquant'; return; }
 
-  const [products, lca, season, trans, sups] = await Promise.all([
-    loadCSV('../data/products.csv'),
-    loadCSV('../data/examples/lca.csv'),
-    loadCSV('../data/seasonality.csv'),
-    loadCSV('../data/examples/transport.csv'),
-    loadCSV('../data/suppliers.csv')
-  ]);
-  const p = products.find(r=> r.gtin===gtin);
+  const p = await loadRecord(gtin);
   if(!p){ container.textContent = 'Produit introuvable'; return; }
 
-  const ctx = { lcaByRef:{}, seasonTable: season, transportsByGtin:{}, suppliersById:{}, month:(new Date().getMonth()+1), norms: defaultNorms };
-  lca.forEach(r=> ctx.lcaByRef[r.ref] = { impacts: {
-    ghg: Number(r.ghg), water: Number(r.water), land: Number(r.land), pm: Number(r.pm), eutro: Number(r.eutro), biodiversity: Number(r.biodiversity||NaN)
-  }});
-  trans.forEach(r=> {
-    ctx.transportsByGtin[r.gtin] = ctx.transportsByGtin[r.gtin] || [];
-    ctx.transportsByGtin[r.gtin].push({mode:r.mode, km:Number(r.km), emissionFactor:Number(r.emissionFactor)});
-  });
-  sups.forEach(s=> ctx.suppliersById[s.id] = s);
-
-  const res = await computeScore(p, ctx);
+  const weights = defaultWeights();
+  const res = scoreFor(p, weights);
+  const alts = await loadAlternatives(gtin, { weights, score: res.score });
 
   container.innerHTML = `
     <div class="product">
@@ -40,6 +27,10 @@ async function init(){
         ${res.breakdown.map(b=> `<li>${b.label}: ${b.normalized} (poids ${Math.round(b.weight*100)}%) → contrib ${b.contribution}</li>`).join('')}
       </ul>
       <p>Saisonnalité (facteur): ${res.sf}</p>
+      ${alts.length ? `<h3>Alternatives mieux notées</h3>
+      <ul>
+        ${alts.map(a=> `<li><a href="?gtin=${encodeURIComponent(a.gtin)}">${a.name}</a> — ${a.grade} (${a.score})</li>`).join('')}
+      </ul>` : ''}
       <p><a href="../compare/">← Retour</a></p>
     </div>
   `;
@@ -1,74 +1,193 @@
 from pathlib import Path
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import os, zlib, argparse
+
+import numpy as np
+import qrcode
 from PIL import Image, ImageDraw, ImageFont
-import json
+from slugify import slugify
+
+import src.manifest as M
 
-ROOT = Path(__file__).resolve().parents[1]
+ROOT = Path(__file__).resolve().parent
 BUILD = ROOT / "site_build"
-QR_DIR = BUILD / "qr"
 OUT_DIR = ROOT / "artifacts"
-OUT_DIR.mkdir(exist_ok=True, parents=True)
 
 DPI = 300
 A4_W, A4_H = int(8.27 * DPI), int(11.69 * DPI)
 MARGIN = int(0.5 * DPI)
 COLS, ROWS = 3, 3
 GUTTER = int(0.25 * DPI)
+CELL_W = (A4_W - 2*MARGIN - (COLS-1)*GUTTER) // COLS
+CELL_H = (A4_H - 2*MARGIN - (ROWS-1)*GUTTER) // ROWS
+MAX_QR = min(CELL_W, CELL_H - int(0.6*DPI))
+TITLE = "QR produits — Éco-score"
+
+_fonts = {}
 
 def get_font(size):
-    try:
-        return ImageFont.truetype("DejaVuSans.ttf", size)
-    except:
-        return ImageFont.load_default()
-
-def chunk(lst, n):
-    for i in range(0, len(lst), n):
-        yield lst[i:i+n]
-
-def make_pages():
-    manifest = json.loads((BUILD / "manifest.json").read_text(encoding="utf-8"))
-    items = manifest["records"]
-    qr_map = {(QR_DIR / f"{it['slug']}.png"): it for it in items}
-    qr_paths = list(qr_map.keys())
-
-    pages = []
-    font_title = get_font(26)
-    font_label = get_font(20)
-
-    cell_w = (A4_W - 2*MARGIN - (COLS-1)*GUTTER) // COLS
-    cell_h = (A4_H - 2*MARGIN - (ROWS-1)*GUTTER) // ROWS
-
-    for group in chunk(qr_paths, COLS*ROWS):
-        page = Image.new("RGB", (A4_W, A4_H), "white")
-        draw = ImageDraw.Draw(page)
-        title = "QR produits — Éco-score"
-        draw.text((MARGIN, MARGIN - int(0.3*DPI)), title, fill="black", font=font_title)
-
-        for idx, qr_path in enumerate(group):
-            r = idx // COLS
-            c = idx % COLS
-            x = MARGIN + c*(cell_w + GUTTER)
-            y = MARGIN + r*(cell_h + GUTTER) + int(0.2*DPI)
-
-            qr = Image.open(qr_path).convert("RGB")
-            max_qr = min(cell_w, cell_h - int(0.6*DPI))
-            qr = qr.resize((max_qr, max_qr), Image.NEAREST)
-            page.paste(qr, (x + (cell_w - max_qr)//2, y))
-
-            item = qr_map[qr_path]
-            label = f"{item['name']} — {item['grade']} ({item['score']})"
-            draw.text((x + int(0.05*DPI), y + max_qr + int(0.15*DPI)), label, fill="black", font=font_label)
-
-        pages.append(page)
-
-    return pages
-
-def save_pdf(pages, dest):
-    if not pages:
+    if size not in _fonts:
+        try:
+            _fonts[size] = ImageFont.truetype("DejaVuSans.ttf", size)
+        except:
+            _fonts[size] = ImageFont.load_default()
+    return _fonts[size]
+
+def chunk(items, n):
+    it = iter(items)
+    while group := list(islice(it, n)):
+        yield group
+
+def qr_image(url, size):
+    """QR dessiné depuis la matrice encodée, modules entiers, centré dans size×size."""
+    qr = qrcode.QRCode(border=4)
+    qr.add_data(url)
+    qr.make(fit=True)
+    matrix = np.array(qr.get_matrix(), dtype=bool)
+    k = max(1, size // len(matrix))
+    modules = np.where(matrix, 0, 255).astype(np.uint8).repeat(k, axis=0).repeat(k, axis=1)
+    img = Image.new("L", (size, size), 255)
+    off = (size - modules.shape[0]) // 2
+    img.paste(Image.fromarray(modules), (off, off))
+    return img
+
+def render_page(group, title=TITLE):
+    """Une page A4 (niveaux de gris) pour au plus COLS×ROWS records."""
+    page = Image.new("L", (A4_W, A4_H), 255)
+    draw = ImageDraw.Draw(page)
+    draw.text((MARGIN, MARGIN - int(0.3*DPI)), title, fill=0, font=get_font(26))
+
+    for idx, item in enumerate(group):
+        r = idx // COLS
+        c = idx % COLS
+        x = MARGIN + c*(CELL_W + GUTTER)
+        y = MARGIN + r*(CELL_H + GUTTER) + int(0.2*DPI)
+
+        page.paste(qr_image(item["url"], MAX_QR), (x + (CELL_W - MAX_QR)//2, y))
+
+        label = f"{item['name']} — {item['grade']} ({item['score']})"
+        draw.text((x + int(0.05*DPI), y + MAX_QR + int(0.15*DPI)), label, fill=0, font=get_font(20))
+
+    return page
+
+def _render_compressed(job):
+    group, title = job
+    page = render_page(group, title)
+    return page.width, page.height, zlib.compress(page.tobytes(), 6)
+
+class PdfWriter:
+    """PDF minimal écrit au fil de l'eau : une image (Flate, gris) par page."""
+    def __init__(self, dest):
+        self.f = open(dest, "wb")
+        self.offsets = {}
+        self.kids = []
+        self.next_id = 3            # 1 = catalogue, 2 = arbre des pages (écrit à la fin)
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _obj(self, num, body, stream=None):
+        self.offsets[num] = self.f.tell()
+        self.f.write(f"{num} 0 obj\n".encode() + body)
+        if stream is not None:
+            self.f.write(b"\nstream\n" + stream + b"\nendstream")
+        self.f.write(b"\nendobj\n")
+
+    def add_page(self, width, height, data):
+        img, content, page = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+        w_pt, h_pt = width * 72 / DPI, height * 72 / DPI
+        self._obj(img, (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                        f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode "
+                        f"/Length {len(data)} >>").encode(), data)
+        draw = f"q {w_pt:.2f} 0 0 {h_pt:.2f} 0 0 cm /Im0 Do Q".encode()
+        self._obj(content, f"<< /Length {len(draw)} >>".encode(), draw)
+        self._obj(page, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {w_pt:.2f} {h_pt:.2f}] "
+                         f"/Resources << /XObject << /Im0 {img} 0 R >> >> /Contents {content} 0 R >>").encode())
+        self.kids.append(page)
+
+    def close(self):
+        self._obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = " ".join(f"{k} 0 R" for k in self.kids)
+        self._obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.kids)} >>".encode())
+        xref = self.f.tell()
+        self.f.write(f"xref\n0 {self.next_id}\n0000000000 65535 f \n".encode())
+        for num in range(1, self.next_id):
+            self.f.write(f"{self.offsets[num]:010d} 00000 n \n".encode())
+        self.f.write(f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+        self.f.close()
+
+def _rendered(jobs, workers):
+    """Pages compressées dans l'ordre ; au plus 2×workers pages en vol (mémoire bornée)."""
+    if workers <= 1:
+        yield from map(_render_compressed, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(_render_compressed, job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def write_pdf(items, dest, title=TITLE, workers=1):
+    """Rend `items` (records du manifest) dans `dest` ; renvoie le nombre de pages."""
+    writer = PdfWriter(dest)
+    jobs = ((group, title) for group in chunk(items, COLS*ROWS))
+    for width, height, data in _rendered(jobs, workers):
+        writer.add_page(width, height, data)
+    writer.close()
+    return len(writer.kids)
+
+def _split_pages(items, pages_per_file):
+    if not pages_per_file:
+        yield None, items
+        return
+    for n, part in enumerate(chunk(items, pages_per_file * COLS*ROWS), start=1):
+        yield f"{n:03d}", part
+
+def make_sheets(out_dir=OUT_DIR, split_by=None, pages_per_file=None, workers=1, items=None):
+    """Écrit les planches PDF ; renvoie [(chemin, nombre de pages), ...].
+
+    `items` : records déjà en mémoire (pipeline), sinon relus du manifest.
+    """
+    if items is None:
+        items = M.iter_records(BUILD)   # en flux, shard par shard
+    if split_by:
+        # Regroupement par catégorie : seuls les records (légers) sont gardés en mémoire
+        groups = {}
+        for it in items:
+            groups.setdefault(str(it.get(split_by) or "autre"), []).append(it)
+        parts = [(slugify(k) or "autre", f"{TITLE} — {k}", v) for k, v in sorted(groups.items())]
+    else:
+        parts = [(None, TITLE, items)]
+
+    Path(out_dir).mkdir(exist_ok=True, parents=True)
+    written = []
+    for key, title, part in parts:
+        for n, sub in _split_pages(part, pages_per_file):
+            suffix = "".join(f"-{s}" for s in (key, n) if s)
+            dest = Path(out_dir) / f"qr_sheets_a4{suffix}.pdf"
+            pages = write_pdf(sub, dest, title, workers)
+            if pages:
+                written.append((dest, pages))
+            else:
+                dest.unlink()
+    if not written:
         raise SystemExit("No QR pages to save")
-    pages[0].save(dest, save_all=True, append_images=pages[1:], resolution=DPI)
+    return written
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Planches A4 de QR codes (PDF)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--split-by", choices=["category"], default=None,
+                    help="un PDF par valeur du champ")
+    ap.add_argument("--pages-per-file", type=int, default=None,
+                    help="nouveau PDF toutes les N pages")
+    args = ap.parse_args(argv)
+    for dest, pages in make_sheets(OUT_DIR, args.split_by, args.pages_per_file, args.workers):
+        print(f"Wrote {dest} ({pages} pages)")
 
 if __name__ == "__main__":
-    pages = make_pages()
-    out_pdf = OUT_DIR / "qr_sheets_a4.pdf"
-    save_pdf(pages, out_pdf)
-    print(f"Wrote {out_pdf}")
+    main()
@@ -0,0 +1,94 @@
+"""Pipeline éco-score en un seul process.
+
+Usage : python -m src <commande> [options]
+
+  validate   validation des CSV (+ snapshot joint)    [--chunksize N]
+  qa         règles qa_rules.yaml, rapport complet     [--report qa_report.json] [--chunksize N]
+  build      site statique                           [--qr-workers N] [--profile] [--archive]
+  export     artifacts/scores.csv
+  sheets     planches PDF de QR                       [--workers N] [--split-by category] [--pages-per-file N]
+  serve      service local de scores (src/api.py)
+  whatif     analyse de configurations (src/whatif.py)
+  store      catalogue versionné, deltas partenaires (src/catalog_store.py)
+  baskets    score de paniers en masse (src/baskets.py)
+  multi      plusieurs catalogues en parallèle (src/multi_build.py)
+  all        validate -> qa -> build -> export -> sheets, options de build et de sheets
+
+En mode `all`, la table jointe est chargée une fois et passée à la QA et au
+build, et les records du build vont directement à l'export et aux planches
+(pas de relecture des CSV ni du manifest). Chaque commande n'importe ses
+dépendances (pandas, qrcode, PIL...) qu'au moment où elle s'exécute.
+"""
+import os, argparse, importlib, sys, time
+
+# commande -> module dont la fonction main(argv) est appelée telle quelle
+PASSTHROUGH = {
+    "validate": "src.validate_data",
+    "qa": "src.qa_checks",
+    "sheets": "qr_sheet",
+    "serve": "src.api",
+    "whatif": "src.whatif",
+    "store": "src.catalog_store",
+    "baskets": "src.baskets",
+    "multi": "src.multi_build",
+}
+
+def _stage(name, fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    print(f"[{name}] {time.perf_counter() - t0:.2f}s")
+    return result
+
+def build(argv):
+    B = importlib.import_module("src.build_site")
+    args = B.parse_args(argv)
+    B.main(qr_workers=args.qr_workers, profile=args.profile, archive=args.archive)
+
+def export(argv):
+    argparse.ArgumentParser(prog="python -m src export", description="Export CSV des scores").parse_args(argv)
+    importlib.import_module("export_scores").main()
+
+def run_all(argv):
+    ap = argparse.ArgumentParser(prog="python -m src all", description="Pipeline complet en un process")
+    ap.add_argument("--qr-workers", type=int, default=None)
+    ap.add_argument("--profile", action="store_true", default=None)
+    ap.add_argument("--archive", action="store_true", default=None)
+    ap.add_argument("--workers", type=int, default=None, help="processus de rendu des planches")
+    ap.add_argument("--split-by", choices=["category"], default=None)
+    ap.add_argument("--pages-per-file", type=int, default=None)
+    ap.add_argument("--no-sheets", action="store_true", help="s'arrêter après l'export")
+    args = ap.parse_args(argv)
+
+    D = importlib.import_module("src.dataset")
+    B = importlib.import_module("src.build_site")
+    # même snapshot que le build seul (.cache/dataset)
+    df = _stage("validate", D.load_joined, B.CACHE_DIR / "dataset")
+    print(f"Validation OK — {len(df)} produits")
+    _stage("qa", importlib.import_module("src.qa_checks").main, [], df)
+    records = _stage("build", B.main, args.qr_workers, args.profile, args.archive, df)
+    _stage("export", importlib.import_module("export_scores").main, records)
+    if not args.no_sheets:
+        S = importlib.import_module("qr_sheet")
+        workers = args.workers or os.cpu_count() or 1
+        for dest, pages in _stage("sheets", S.make_sheets, S.OUT_DIR, args.split_by, args.pages_per_file,
+                                  workers, records):
+            print(f"Wrote {dest} ({pages} pages)")
+
+COMMANDS = {"build": build, "export": export, "all": run_all}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    names = sorted([*PASSTHROUGH, *COMMANDS])
+    if not argv or argv[0] in ("-h", "--help") or argv[0] not in names:
+        print(__doc__.strip())
+        if argv and argv[0] not in ("-h", "--help"):
+            sys.exit(f"commande inconnue : {argv[0]} (attendu : {', '.join(names)})")
+        return
+    cmd, rest = argv[0], argv[1:]
+    if cmd in PASSTHROUGH:
+        importlib.import_module(PASSTHROUGH[cmd]).main(rest)
+    else:
+        COMMANDS[cmd](rest)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Index « meilleures alternatives » : pour chaque produit, les k produits de
+même catégorie (et, en option, même unité) dont le score est plus élevé.
+
+Le score est celui qu'affichent les pages `p/`, `compare/` et `basket/` :
+le score multicritère du mois (`multicriteria.precompute`, poids par
+défaut), classé mois par mois ; sans données ACV, l'éco-score du build.
+
+Le catalogue est trié une fois par (groupe, score décroissant, distance_km,
+clé) : dans un groupe, les meilleures alternatives d'un produit sont les
+k + 1 premières positions du groupe, lui-même exclu, à score strictement
+supérieur. Une matrice (produits × k + 1) de positions candidates suffit,
+sans comparaison deux à deux.
+
+Le build écrit `alternatives/meta.json` et `alternatives/<suffixe>.json`
+(même découpage par suffixe de GTIN que `scores/`) ; un shard contient
+`alt` ({gtin: [indices]}, ou 12 listes, une par mois, quand le classement
+change dans l'année) et `ref` (les alternatives citées, décrites une seule
+fois, `score` et `grade` par mois, et avec les données ACV les notes
+normalisées `m` = {n, adj, sf} de `scores/` pour re-noter avec d'autres
+poids) : une page charge les alternatives d'un produit en une requête, sans
+shard `scores/` par alternative. Les produits sans meilleure alternative
+n'ont pas d'entrée.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import src.multicriteria as MC
+import src.output as O
+
+K = 5
+
+def _codes(values: pd.Series) -> np.ndarray:
+    return pd.factorize(values.fillna("").astype(str), sort=True)[0]
+
+def keys(df: pd.DataFrame) -> pd.Series:
+    """Clé de lookup : GTIN (clé des pages JS), sinon id."""
+    key = df["id"].astype(str)
+    if "gtin" in df.columns:
+        gtin = df["gtin"].astype(str).str.strip()
+        key = gtin.where(df["gtin"].notna() & (gtin != ""), key)
+    return key.reset_index(drop=True)
+
+def monthly_scores(df: pd.DataFrame, products: pd.DataFrame, res: dict):
+    """(scores (n, 12), lettres, positions dans `products`, res) du modèle multicritère alignés sur `df`.
+
+    Sans ACV : score -inf (jamais suggéré), position -1.
+    """
+    pos = pd.Index(products["gtin"].astype(str).str.strip()).get_indexer(keys(df))
+    ok = pos >= 0
+    ok[ok] = res["has_lca"][pos[ok]]
+    score = np.full((len(df), 12), -np.inf)
+    score[ok] = res["score"][pos[ok]]
+    grade = np.full(len(df), "E" * 12, dtype=object)
+    grade[ok] = MC.letters(res["score"][pos[ok]]).sum(axis=1)
+    return score, grade, np.where(ok, pos, -1), res
+
+def model_inputs(res: dict, p: int) -> dict:
+    """Notes normalisées du produit `p` utilisées par `scoreFor` (mêmes valeurs que `multicriteria.records`)."""
+    return {"n": {k: res[f"n_{k}"][p].tolist() for k in MC.CRITERIA},
+            "adj": int(res["adj"][p]), "sf": res["sf"][p].round(4).tolist()}
+
+def sort_keys(df: pd.DataFrame, same_unit: bool = False):
+    """(groupe, distance, clé) du tri, à calculer une fois pour plusieurs scores."""
+    category = df["category"].fillna("").astype(str).str.strip().str.lower()
+    group = category + ("\x1f" + df["unit"].fillna("").astype(str).str.strip().str.lower()
+                        if same_unit and "unit" in df.columns else "")
+    g = pd.factorize(group)[0]
+    g[(category == "").to_numpy()] = -1                     # sans catégorie : pas d'alternative
+    distance = df["distance_km"].to_numpy(dtype=float) if "distance_km" in df.columns else np.zeros(len(df))
+    return g, distance, _codes(keys(df))
+
+def rank(df: pd.DataFrame, k: int = K, same_unit: bool = False, score=None, by=None) -> np.ndarray:
+    """Positions (dans `df`) des k meilleures alternatives de chaque produit ; -1 = aucune.
+
+    `score` : score de classement (défaut : colonne `score`) ; `by` : `sort_keys(df, same_unit)`.
+    """
+    n = len(df)
+    if n == 0:
+        return np.empty((0, k), dtype=np.int64)
+    g, distance, key = by if by is not None else sort_keys(df, same_unit)
+    score = df["score"].to_numpy(dtype=float) if score is None else np.asarray(score, dtype=float)
+
+    # Tri : groupe, puis score décroissant, distance, et clé (ordre stable d'un build à l'autre)
+    order = np.lexsort((key, distance, -score, g))
+    g_sorted = g[order]
+    start = np.searchsorted(g_sorted, g_sorted, side="left")
+    end = np.searchsorted(g_sorted, g_sorted, side="right")
+    where = np.empty(n, dtype=np.int64)
+    where[order] = np.arange(n)
+
+    # k + 1 premiers du groupe (le produit lui-même peut en faire partie)
+    cand = start[where][:, None] + np.arange(k + 1)[None, :]
+    valid = cand < end[where][:, None]
+    cand = order[np.minimum(cand, n - 1)]
+    self_ = np.arange(n)[:, None]
+    valid &= (cand != self_) & (score[cand] > score[:, None]) & (g >= 0)[:, None]
+    # Compaction : les candidats valides d'abord, ordre du tri conservé
+    pick = np.argsort(~valid, axis=1, kind="stable")[:, :k]
+    return np.where(np.take_along_axis(valid, pick, axis=1), np.take_along_axis(cand, pick, axis=1), -1)
+
+def write_shards(out: Path, df: pd.DataFrame, records, k: int = K, same_unit: bool = False, write=None,
+                 remove=None, monthly=None):
+    """`alternatives/meta.json` + shards ; `records` alignés sur `df` (nom, note, URL).
+
+    `monthly` : `monthly_scores(...)`, classement par mois sur le score des pages
+    (chaque alternative porte ses notes normalisées) ; None : éco-score du build (`records`).
+    """
+    write, remove = write or O.write_file, remove or O.remove_path
+    dest = out / "alternatives"
+    if monthly is None:
+        alt = rank(df, k, same_unit)[None]
+    else:
+        by = sort_keys(df, same_unit)
+        alt = np.stack([rank(df, k, same_unit, monthly[0][:, m], by) for m in range(12)])
+    key = keys(df).tolist()
+    n_alt = (alt >= 0).sum(axis=2)                         # (mois, produits)
+    suffix = MC.suffix_len(len(df))
+
+    # Produits regroupés par shard ; dans un shard, chaque alternative citée est décrite une fois
+    has = np.flatnonzero(n_alt.any(axis=0))
+    codes, names = pd.factorize(pd.Series(key).iloc[has].str[-suffix:])
+    order = np.argsort(codes, kind="stable")
+    cuts = np.searchsorted(codes[order], np.arange(len(names) + 1))
+    described = {}
+    for s, name in enumerate(names):
+        members = has[order[cuts[s]:cuts[s + 1]]]
+        sub = alt[:, members]
+        refs = np.unique(sub[sub >= 0])
+        # Par produit : une liste par mois (-1 de fin de ligne coupés par n_alt)
+        local = np.searchsorted(refs, sub).transpose(1, 0, 2).tolist()
+        counts = n_alt[:, members].T.tolist()
+        # Même classement toute l'année : une seule liste
+        same = (sub == sub[:1]).all(axis=(0, 2)).tolist()
+        shard_alt = {}
+        for c, i in enumerate(members.tolist()):
+            rows = [row[:m] for row, m in zip(local[c], counts[c])]
+            shard_alt[key[i]] = rows[0] if same[c] else rows
+        ref = []
+        for j in refs.tolist():
+            if j not in described:
+                r = records[j]
+                score, grade = ((r["score"], r["grade"]) if monthly is None
+                                else (monthly[0][j].astype(int).tolist(), monthly[1][j]))
+                described[j] = {"gtin": key[j], "name": r["name"], "score": score, "grade": grade,
+                                "url": r["url"], "distance_km": r["distance_km"]}
+                if monthly is not None:
+                    described[j]["m"] = model_inputs(monthly[3], monthly[2][j])
+            ref.append(described[j])
+        write(dest / f"{name}.json", json.dumps({"alt": shard_alt, "ref": ref},
+                                                ensure_ascii=False, separators=(",", ":")))
+    shards = set(names)
+    write(dest / "meta.json", json.dumps({"suffix_len": suffix, "k": k, "same_unit": same_unit,
+                                          "monthly": monthly is not None, "shards": sorted(shards)},
+                                         separators=(",", ":")))
+    for old in dest.glob("*.json"):
+        if old.stem != "meta" and old.stem not in shards:
+            remove(old)
+    return len(shards)
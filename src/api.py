@@ -0,0 +1,217 @@
+"""Service local de scores (HTTP/1.1 asyncio, sans dépendance).
+
+Usage : python -m src.api [--host 127.0.0.1] [--port 8765] [--poll 2] [--data data/]
+
+  GET  /score/<id ou gtin>          record scoré (404 si inconnu)
+  GET  /scores?ids=a,b,c            lot (ou POST /scores {"ids": [...]})
+  GET  /health                      version des données, nombre de produits
+
+Le catalogue joint est chargé une fois et indexé par id et GTIN ; chaque
+record est sérialisé en JSON au chargement, une requête n'est qu'un accès
+dict. `data/` et config.yaml sont surveillés (mtime/taille) : en cas de
+changement, le nouvel index est construit dans un thread puis remplace
+l'ancien d'un coup ; si les nouvelles données (ou la config) sont
+invalides, l'ancien index reste servi.
+"""
+import argparse, asyncio, hashlib, json, time
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import pandas as pd
+import yaml
+
+import src.build_site as B
+import src.dataset as D
+import src.multicriteria as MC
+import src.validate_data as V
+from src.scoring import score_frame
+
+MAX_BATCH = 1000
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+class Catalog:
+    """Index figé : clé (id ou GTIN) -> record JSON déjà encodé."""
+
+    def __init__(self, records, version):
+        self.version = version
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self.count = len(records)
+        self.by_key = {}
+        for rec in records:
+            body = json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            self.by_key[rec["id"]] = body
+            if rec.get("gtin"):
+                self.by_key.setdefault(rec["gtin"], body)
+
+def load_catalog() -> Catalog:
+    """Même chaîne que le build : snapshot joint, bornes, score vectorisé.
+
+    Version : hash des CSV et de config.yaml (une config modifiée change les scores).
+    """
+    raw = B.config_path().read_bytes()
+    version = f"{D.input_key()}-{hashlib.sha256(raw).hexdigest()[:8]}"
+    df = D.load_joined(B.CACHE_DIR / "dataset")
+    cfg = yaml.safe_load(raw) or {}
+    weights, bounds, grade_bands = B.score_config(cfg)
+    df = B.prepare(df, bounds, cfg.get("auto_bounds"))
+    df["score"], df["grade"] = score_frame(df, weights, bounds, grade_bands)
+
+    rows = df.to_dict(orient="records")
+    records = []
+    for r in rows:
+        rec = B.make_record(r)
+        if pd.notna(r.get("gtin")):
+            rec["gtin"] = str(r["gtin"]).strip()
+        records.append(rec)
+
+    # Score multicritère des pages JS (12 mois), quand les données ACV sont là
+    if all((V.DATA_DIR / name).exists() for name in MC.INPUTS):
+        inputs = MC.load_inputs(V.DATA_DIR)
+        monthly = {m["gtin"]: {"score": m["score"], "letter": m["letter"]}
+                   for m in MC.records(inputs[0], MC.precompute(*inputs))}
+        for rec in records:
+            if rec.get("gtin") in monthly:
+                rec["monthly"] = monthly[rec["gtin"]]
+    return Catalog(records, version)
+
+def data_signature():
+    """(chemin, mtime, taille) des CSV de data/ et de config.yaml : change dès qu'un fichier est réécrit."""
+    paths = [*V.DATA_DIR.rglob("*.csv"), B.config_path()]
+    return sorted((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in paths if p.exists())
+
+def _json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class ScoreService:
+    def __init__(self, poll=2.0):
+        self.poll = poll
+        self.catalog = None
+        self.signature = None
+        self.reloads = 0
+
+    async def reload(self) -> bool:
+        """Recharge si data/ a changé ; True si un nouvel index est en service."""
+        signature = data_signature()
+        if signature == self.signature:
+            return False
+        try:
+            catalog = await asyncio.to_thread(load_catalog)
+        except Exception as e:
+            # Toute erreur de chargement (CSV, YAML, bornes...) : le service continue sur l'ancien index
+            print(f"Rechargement refusé, index précédent conservé : {type(e).__name__}: {e}")
+            self.signature = signature      # pas de nouvel essai tant que rien ne bouge
+            return False
+        self.signature = signature
+        if self.catalog and catalog.version == self.catalog.version:
+            return False
+        self.catalog = catalog              # bascule atomique : une seule affectation
+        self.reloads += 1
+        print(f"Catalogue {catalog.version} : {catalog.count} produits")
+        return True
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll)
+            try:
+                await self.reload()
+            except Exception as e:      # ex. fichier supprimé pendant data_signature : prochain tour
+                print(f"Surveillance de data/ : {type(e).__name__}: {e}")
+
+    # ----- Routage ---------------------------------------------------------
+    def lookup_many(self, keys):
+        if len(keys) > MAX_BATCH:
+            return 400, _json({"error": f"au plus {MAX_BATCH} ids par lot"})
+        by_key = self.catalog.by_key
+        found = [(k, by_key[k]) for k in keys if k in by_key]
+        missing = [k for k in keys if k not in by_key]
+        results = b",".join(_json(k) + b":" + body for k, body in found)
+        return 200, b'{"results":{' + results + b'},"missing":' + _json(missing) + b"}"
+
+    def route(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip("/")
+        if method == "OPTIONS":
+            return 204, b""
+        if path.startswith("/score/") and method == "GET":
+            rec = self.catalog.by_key.get(unquote(path[len("/score/"):]))
+            return (200, rec) if rec else (404, _json({"error": "produit inconnu"}))
+        if path == "/scores":
+            if method == "GET":
+                ids = [k for v in parse_qs(url.query).get("ids", []) for k in v.split(",") if k]
+            elif method == "POST":
+                try:
+                    ids = [str(k) for k in json.loads(body or b"{}").get("ids", [])]
+                except (ValueError, AttributeError):
+                    return 400, _json({"error": 'corps attendu : {"ids": [...]}'})
+            else:
+                return 405, _json({"error": "GET ou POST"})
+            return self.lookup_many(ids)
+        if path == "/health" and method == "GET":
+            c = self.catalog
+            return 200, _json({"version": c.version, "products": c.count, "loaded_at": c.loaded_at,
+                               "reloads": self.reloads})
+        return 404, _json({"error": "route inconnue"})
+
+    # ----- HTTP/1.1 minimal (keep-alive) -----------------------------------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                    body = await reader.readexactly(int(headers.get("content-length") or 0))
+                    status, payload = self.route(method, target, body)
+                    keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                except ValueError:
+                    status, payload, keep = 400, _json({"error": "requête invalide"}), False
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    "Content-Type: application/json; charset=utf-8\r\n"
+                    "Access-Control-Allow-Origin: *\r\n"
+                    "Access-Control-Allow-Headers: Content-Type\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep else 'close'}\r\n\r\n".encode("latin-1") + payload)
+                await writer.drain()
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Charge le catalogue puis ouvre le port ; renvoie le serveur asyncio."""
+        await self.reload()
+        if self.catalog is None:
+            raise RuntimeError("catalogue initial invalide")
+        return await asyncio.start_server(self.handle, host, port)
+
+async def serve(host, port, poll):
+    service = ScoreService(poll)
+    server = await service.start(host, port)
+    print(f"Service de scores sur http://{host}:{server.sockets[0].getsockname()[1]}", flush=True)
+    async with server:
+        await asyncio.gather(server.serve_forever(), service.watch())
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Service local de scores éco-score")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--poll", type=float, default=2.0, help="intervalle de surveillance de data/ (s)")
+    ap.add_argument("--data", type=Path, default=None, help="dossier des CSV (défaut : data/)")
+    args = ap.parse_args(argv)
+    if args.data:
+        V.DATA_DIR = args.data.resolve()
+    try:
+        asyncio.run(serve(args.host, args.port, args.poll))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
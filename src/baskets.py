@@ -0,0 +1,164 @@
+"""Score de paniers en masse (tickets de caisse, cartes de fidélité).
+
+Usage : python -m src.baskets tickets.csv [--month 5] [--out artifacts/basket_scores.csv]
+                                          [--chunksize 1000000]
+
+Entrée : lignes (basket_id, gtin, qty). Les impacts par produit viennent du
+modèle multicritère (`multicriteria.precompute`, calculé une fois) : GES
+ACV + étapes de transport (kgCO₂e), eau (L), score et lettre du mois.
+
+Chaque bloc de lignes forme une matrice creuse paniers × produits (triplets
+ligne, colonne, quantité) ; les totaux par panier sont des produits
+matrice × vecteur calculés en une passe (`np.bincount` pondéré). Même
+logique que `basket/basket.js` pour un panier : totaux pondérés par la
+quantité, score moyen des articles ; en plus, score pondéré par la quantité
+et distribution des lettres. Les articles sans ACV (« No LCA ») ou inconnus
+du catalogue sont comptés à part et n'entrent pas dans les scores.
+
+Le CSV est lu en flux ; un panier coupé entre deux blocs est reporté sur le
+bloc suivant (tickets contigus, ordre naturel d'un export de caisse).
+"""
+import argparse, time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import src.multicriteria as MC
+import src.validate_data as V
+
+ROOT = Path(__file__).resolve().parents[1]
+OUT_DIR = ROOT / "artifacts"
+COLUMNS = ["basket_id", "gtin", "qty"]
+GRADES = [g for g, _ in MC.LETTERS] + ["E"]
+DEFAULT_CHUNKSIZE = 1_000_000
+
+def load_impacts(month: int, data_dir: Path = None, weights=None) -> dict:
+    """Impacts par produit pour `month` (1–12), alignés sur l'index des GTIN."""
+    inputs = MC.load_inputs(data_dir or V.DATA_DIR)
+    products = inputs[0]
+    res = MC.precompute(*inputs, weights=weights)
+    score = res["score"][:, month - 1]
+    grade = np.zeros(len(products), dtype=np.int64)
+    for _, cut in MC.LETTERS:
+        grade += score < cut
+    return {
+        "index": pd.Index(products["gtin"].astype(str).str.strip()),
+        "ghg": res["ghg"] + res["transport"],
+        "water": res["water"],
+        "score": score.astype(float),
+        "grade": grade,
+        "has_lca": res["has_lca"],
+        "month": month,
+    }
+
+def _matvec(rows, cols, weights, vector, nrows):
+    """(M @ vector) pour M creuse donnée en triplets (rows, cols, weights)."""
+    return np.bincount(rows, weights=weights * vector[cols], minlength=nrows)
+
+def score_baskets(lines: pd.DataFrame, impacts: dict) -> pd.DataFrame:
+    """Agrégats par panier (une ligne par basket_id, dans l'ordre d'apparition).
+
+    Les lignes sans basket_id (vide ou manquant) sont écartées et comptées
+    dans `attrs["invalid_lines"]` du résultat ; une qty vide ou non numérique
+    compte pour 0 (lignes dans `attrs["invalid_qty"]`).
+    """
+    ids = lines["basket_id"]
+    valid = ids.notna() & (ids.astype(str).str.strip() != "")
+    invalid = int((~valid).sum())
+    if invalid:
+        lines = lines[valid]
+    rows, baskets = pd.factorize(lines["basket_id"], sort=False)
+    gtin = lines["gtin"].astype(str)
+    cols = impacts["index"].get_indexer(gtin)
+    # Espaces parasites : seules les clés inconnues telles quelles sont nettoyées
+    miss = cols < 0
+    if miss.any():
+        cols[miss] = impacts["index"].get_indexer(gtin[miss].str.strip())
+    try:
+        qty = lines["qty"].astype(float)        # cas courant, bien plus rapide que to_numeric
+    except (ValueError, TypeError):
+        qty = pd.to_numeric(lines["qty"], errors="coerce")
+    invalid_qty = int(qty.isna().sum())
+    qty = qty.fillna(0).to_numpy(dtype=float)
+    nb = len(baskets)
+
+    known = cols >= 0
+    scored = known & impacts["has_lca"][np.where(known, cols, 0)]
+    # Triplets de la matrice paniers × produits : articles connus uniquement
+    r, c, q = rows[known], cols[known], qty[known]
+    s_r, s_c, s_q = rows[scored], cols[scored], qty[scored]
+    ones = np.ones(len(s_r))
+
+    out = pd.DataFrame({
+        "basket_id": baskets,
+        "lines": np.bincount(rows, minlength=nb),
+        "unknown": np.bincount(rows[~known], minlength=nb),
+        "no_lca": np.bincount(rows[known & ~scored], minlength=nb),
+        "qty": np.bincount(rows, weights=qty, minlength=nb),
+        "ghg_kg": _matvec(r, c, q, impacts["ghg"], nb),
+        "water_l": _matvec(r, c, q, impacts["water"], nb),
+    })
+    n_scored = np.bincount(s_r, minlength=nb)
+    q_scored = np.bincount(s_r, weights=s_q, minlength=nb)
+    score_sum = _matvec(s_r, s_c, ones, impacts["score"], nb)
+    score_qty = _matvec(s_r, s_c, s_q, impacts["score"], nb)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["score_mean"] = np.where(n_scored > 0, score_sum / n_scored, np.nan)
+        out["score_weighted"] = np.where(q_scored > 0, score_qty / q_scored, np.nan)
+    # Distribution des lettres (articles notés) : une seule passe sur panier × lettre
+    letters = np.bincount(s_r * len(GRADES) + impacts["grade"][s_c], minlength=nb * len(GRADES))
+    out[GRADES] = letters.reshape(nb, len(GRADES))
+    out[["ghg_kg", "water_l"]] = out[["ghg_kg", "water_l"]].round(3)
+    out[["score_mean", "score_weighted"]] = out[["score_mean", "score_weighted"]].round(1)
+    out.attrs["invalid_lines"] = invalid
+    out.attrs["invalid_qty"] = invalid_qty
+    return out
+
+def iter_csv(path: Path, impacts: dict, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Résultats par bloc ; le dernier panier d'un bloc est complété par le bloc suivant."""
+    # qty en texte : une valeur invalide ne doit pas interrompre la lecture (cf. score_baskets)
+    reader = pd.read_csv(path, usecols=COLUMNS, dtype=str, chunksize=chunksize)
+    carry = None
+    for chunk in reader:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        ids = chunk["basket_id"].to_numpy()
+        # Début du dernier panier : première ligne du dernier bloc contigu d'ids
+        change = np.flatnonzero(ids[1:] != ids[:-1])
+        cut = change[-1] + 1 if len(change) else 0
+        carry = chunk.iloc[cut:]
+        if cut:
+            yield score_baskets(chunk.iloc[:cut], impacts)
+    if carry is not None and len(carry):
+        yield score_baskets(carry, impacts)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Score de paniers en masse (basket_id, gtin, qty)")
+    ap.add_argument("lines", type=Path, help="CSV des lignes de tickets")
+    ap.add_argument("--month", type=int, default=None, help="mois du score (défaut : mois courant)")
+    ap.add_argument("--out", type=Path, default=OUT_DIR / "basket_scores.csv")
+    ap.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    impacts = load_impacts(args.month or time.localtime().tm_mon)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = args.out.with_name(f".{args.out.name}.tmp")
+    baskets = lines = invalid = invalid_qty = 0
+    with tmp.open("w", newline="", encoding="utf-8") as f:
+        for i, res in enumerate(iter_csv(args.lines, impacts, args.chunksize)):
+            res.to_csv(f, index=False, header=(i == 0))
+            baskets += len(res); lines += int(res["lines"].sum())
+            invalid += res.attrs["invalid_lines"]
+            invalid_qty += res.attrs["invalid_qty"]
+    tmp.replace(args.out)
+    dt = time.perf_counter() - t0
+    print(f"{baskets} paniers, {lines} lignes en {dt:.1f}s ({lines / max(dt, 1e-9):,.0f} lignes/s) -> {args.out}")
+    if invalid:
+        print(f"{invalid} ligne(s) sans basket_id ignorée(s)")
+    if invalid_qty:
+        print(f"{invalid_qty} ligne(s) avec qty vide ou non numérique, comptée(s) pour 0")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Cache de build incrémental : une empreinte par fiche produit.
+
+Chaque produit est associé à un hash de ses colonnes d'entrée, combiné à
+l'empreinte de tout ce qui influe sur le rendu (poids, bornes, méta/version
+de méthode, URL de base, version des templates). Une fiche dont le hash n'a
+pas bougé n'est ni re-rendue ni re-encodée en QR.
+"""
+import json, hashlib
+from pathlib import Path
+
+import pandas as pd
+
+import src.output as O
+
+CACHE_VERSION = 1
+
+def config_digest(**parts) -> str:
+    """Empreinte stable des paramètres globaux (dict/list/str sérialisables en JSON)."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+def record_hashes(df: pd.DataFrame, columns, digest: str) -> list:
+    """Hash par ligne des colonnes d'entrée, préfixé de l'empreinte globale."""
+    cols = [c for c in columns if c in df.columns]
+    row_hash = pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+    return [f"{digest}-{h:016x}" for h in row_hash]
+
+def load(path: Path) -> dict:
+    """Renvoie {slug: hash} du build précédent (vide si absent ou obsolète)."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("records", {})
+
+def save(path: Path, records: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": CACHE_VERSION, "records": records}), encoding="utf-8")
+    tmp.replace(path)
+
+def is_fresh(previous: dict, slug: str, h: str, outputs) -> bool:
+    """Vrai si la fiche est inchangée et que ses fichiers de sortie existent encore."""
+    return previous.get(slug) == h and all(p.exists() for p in outputs)
+
+def remove_stale(out: Path, previous: dict, current, page_roots=None, remove=None) -> list:
+    """Supprime pages (de chaque langue) + QR des slugs qui ne sont plus au catalogue.
+
+    `remove(path)` : cf. src/output.py (défaut : suppression immédiate).
+    """
+    remove = remove or O.remove_path
+    stale = sorted(set(previous) - set(current))
+    for slug in stale:
+        for root in page_roots or [out / "p"]:
+            remove(root / slug)
+        remove(out / "qr" / f"{slug}.png")
+    return stale
@@ -1,29 +1,79 @@
-import os, json, hashlib, time
+import os, hashlib, time
 from pathlib import Path
 
 import pandas as pd
 from slugify import slugify
-import qrcode
 import yaml
 
-# Validation (vérifie colonnes, doublons, valeurs hors bornes)
+# Validation + jointure des CSV (snapshot partagé avec validate/QA)
+import src.dataset as D
+# Score vectorisé (score_row ci-dessous reste la référence ligne à ligne)
+from src.scoring import score_frame
+# Cache de build incrémental (hash par fiche)
+import src.build_cache as BC
+# Étape QR (pool de processus + cache par URL)
+import src.qr_codes as QR
+# Index paginé + index de recherche partitionné
+import src.catalog_index as CI
+# Templates précompilés, toutes langues
+import src.render as R
+# Manifest (json historique ou shards NDJSON)
+import src.manifest as M
+# Durées / mémoire / compteurs par étape -> build_report.json
+import src.instrument as IN
+# Écritures groupées / atomiques / si changement (staging + bascule)
+import src.output as O
+# Score multicritère des pages JS, précalculé pour les 12 mois
+import src.multicriteria as MC
+# Meilleures alternatives par catégorie (lookup shardé pour les pages JS)
+import src.alternatives as AL
+# Sketch de quantiles fusionnable (bornes auto en flux / incrémentales)
+import src.quantiles as QS
 import src.validate_data as V
 
 # ----- Chemins robustes (ancrés à la racine du repo) -------------------------
 ROOT = Path(__file__).resolve().parents[1]   # /<repo>
 DATA_DIR = ROOT / "data"
 OUT = ROOT / "site_build"
+CACHE_DIR = ROOT / ".cache"
+
+# À incrémenter dès qu'un template HTML change (invalide le cache de build)
+TEMPLATE_VERSION = "2"
 
 # BASE_URL est injectée par GitHub Actions ; valeur par défaut pour usage local
 REPO_URL_BASE = os.environ.get("BASE_URL", "https://<ton-user>.github.io/eco-score").rstrip("/")
 
+# Valeurs de config.yaml par défaut (sections absentes)
+DEFAULT_WEIGHTS = {"emissions": 0.5, "distance": 0.3, "biodiversity": 0.2}
+DEFAULT_GRADE_BANDS = [("A", 90), ("B", 75), ("C", 60), ("D", 45), ("E", 0)]
+
+# Surcharges du mode multi-catalogue (None : ROOT/config.yaml, CACHE_DIR/qr,
+# ROOT/artifacts/site_build.tar.gz), cf. configure() et src/multi_build.py
+CONFIG_PATH = None
+QR_CACHE_DIR = None
+ARCHIVE_PATH = None
+
+def configure(out: Path, data_dir: Path, base_url: str, cache_dir: Path, config: Path = None,
+              qr_cache: Path = None, archive: Path = None):
+    """Redirige le build vers un autre catalogue (données, config, URL, sortie, caches).
+
+    Modifie les globales du module : un process par catalogue (src/multi_build.py).
+    """
+    global OUT, CACHE_DIR, DATA_DIR, REPO_URL_BASE, CONFIG_PATH, QR_CACHE_DIR, ARCHIVE_PATH
+    OUT, CACHE_DIR = Path(out), Path(cache_dir)
+    REPO_URL_BASE = base_url.rstrip("/")
+    CONFIG_PATH, QR_CACHE_DIR, ARCHIVE_PATH = config, qr_cache, archive
+    # Les CSV sont lus via validate_data (src/dataset.py), d'où V.DATA_DIR
+    DATA_DIR = V.DATA_DIR = Path(data_dir)
+
 # ===================== Utilitaires robustes ==================================
-def ensure_dirs():
-    (OUT / "p").mkdir(parents=True, exist_ok=True)
-    (OUT / "qr").mkdir(parents=True, exist_ok=True)
-    (OUT / "assets").mkdir(parents=True, exist_ok=True)
+def ensure_dirs(root: Path = None):
+    root = root or OUT
+    (root / "p").mkdir(parents=True, exist_ok=True)
+    (root / "qr").mkdir(parents=True, exist_ok=True)
+    (root / "assets").mkdir(parents=True, exist_ok=True)
 
-def write_style():
+def write_style(write=None, root: Path = None):
     css = """
 html,body{font-family:system-ui,-apple-system,Segoe UI,Roboto,Ubuntu,'Helvetica Neue',Arial,sans-serif;margin:0;padding:0}
 main{max-width:880px;margin:24px auto;padding:0 16px}
@@ -38,12 +88,9 @@ th,td{padding:10px;border-bottom:1px solid #ddd}
 a{color:inherit}
 header{padding:12px 16px;border-bottom:1px solid #eee}
 input[type="search"]{padding:8px 12px;margin:12px 0;width:100%;max-width:360px;border:1px solid #ddd;border-radius:8px}
+.pager{display:flex;gap:12px;justify-content:center;margin:16px 0}
 """
-    (OUT / "assets" / "style.css").write_text(css, encoding="utf-8")
-
-def make_qr(url, dest):
-    img = qrcode.make(url)
-    img.save(dest)
+    (write or O.write_file)((root or OUT) / "assets" / "style.css", css)
 
 def file_hash(path: Path) -> str:
     with open(path, "rb") as f:
@@ -56,7 +103,11 @@ def normalize(value, vmin, vmax):
         return 0.0
     return clamp01((value - vmin) / (vmax - vmin))
 
-def auto_bounds(series: pd.Series, low=0.05, high=0.95):
+def auto_bounds(series: pd.Series, low=0.05, high=0.95, sketch=None):
+    """Percentiles low/high de `series` ; avec `sketch` (QS.KLLSketch déjà alimenté),
+    percentiles approchés du sketch, sans relire la colonne."""
+    if sketch is not None:
+        return tuple(sketch.quantiles([low, high])) if sketch.n else (0.0, 1.0)
     s = pd.to_numeric(series, errors="coerce").dropna()
     if s.empty:
         # Bornes “fallback” si aucune donnée exploitable
@@ -64,9 +115,18 @@ def auto_bounds(series: pd.Series, low=0.05, high=0.95):
     q = s.quantile([low, high]).values
     return float(q[0]), float(q[1])
 
+def config_path() -> Path:
+    return CONFIG_PATH or ROOT / "config.yaml"
+
 def load_config():
-    with open(ROOT / "config.yaml", "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    with open(config_path(), "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+def score_config(cfg: dict):
+    """(weights, bounds, grade_bands) de config.yaml, défauts compris (build, API, what-if)."""
+    weights = cfg.get("weights") or DEFAULT_WEIGHTS
+    grade_bands = [tuple(b) for b in cfg.get("grade_bands") or DEFAULT_GRADE_BANDS]
+    return dict(weights), dict(cfg.get("bounds") or {}), grade_bands
 
 def score_row(row, weights, bounds, grade_bands):
     e = normalize(row["base_kgco2e"], *bounds["base_kgco2e"])
@@ -80,22 +140,58 @@ def score_row(row, weights, bounds, grade_bands):
             return score100, g
     return score100, grade_bands[-1][0] if grade_bands else "E"
 
-# -------- Helpers robustes sur DataFrames ------------------------------------
-def coerce_id(df: pd.DataFrame, name: str) -> pd.DataFrame:
-    """
-    - Si 'id' absent mais 'gtin' présent, utilise gtin comme id.
-    - Force 'id' en string sans espaces.
+def make_record(r):
+    """Record du manifest pour une ligne scorée (dict issu de df.to_dict)."""
+    # sécurise name vide
+    name = str(r.get("name") or r.get("id") or "Produit")
+    slug = slugify(f"{r['id']}-{name}")
+    return {
+        "id": str(r["id"]),
+        "name": name,
+        "slug": slug,
+        "url": f"{REPO_URL_BASE}/p/{slug}/",
+        "score": float(r["score"]),
+        "grade": r["grade"],
+        "base_kgco2e": float(r["base_kgco2e"]),
+        "distance_km": float(r["distance_km"]),
+        "biodiversity_risk": float(r["biodiversity_risk"]),
+        "category": str(r.get("category") or ""),
+        "year": 2025
+    }
+
+def prepare(df: pd.DataFrame, bounds: dict, auto: dict = None, state_path: Path = None) -> pd.DataFrame:
+    """Table jointe prête à scorer (build et API) ; complète `bounds` en place.
+
+    `auto` : section `auto_bounds` de config.yaml (`method: sketch`, `eps`, `buckets`,
+    `low`, `high`) ; avec `state_path`, les sketches par paquet d'ids sont gardés
+    d'un build à l'autre et seuls les paquets modifiés sont recalculés.
     """
-    if "id" not in df.columns:
-        if "gtin" in df.columns:
-            df = df.rename(columns={"gtin": "id"})
-        else:
-            # Génère un id si vraiment rien (ligne + hash simple)
-            df = df.copy()
-            df["id"] = [f"{name}_{i}" for i in range(len(df))]
-    df["id"] = df["id"].astype(str).str.strip()
+    # 3) Valeurs par défaut si NaN après jointure
+    df = ensure_numeric(df, "base_kgco2e", 0.0)
+    df = ensure_numeric(df, "distance_km", 0.0)
+    df = ensure_numeric(df, "biodiversity_risk", 0.0)
+
+    # 4) Bornes auto si manquantes (percentiles 5–95 par défaut)
+    auto = auto or {}
+    low, high = float(auto.get("low", 0.05)), float(auto.get("high", 0.95))
+    todo = [key for key in ["base_kgco2e", "distance_km", "biodiversity_risk"]
+            if not bounds.get(key) or bounds[key][0] is None or bounds[key][1] is None]
+    if todo and auto.get("method") == "sketch":
+        eps = float(auto.get("eps", QS.DEFAULT_EPS))
+        buckets = int(auto.get("buckets", QS.DEFAULT_BUCKETS))
+        state = QS.load_state(state_path, eps, buckets) if state_path else {}
+        ids = QS.id_hashes(df["id"])
+        for key in todo:
+            sketch, state[key], _ = QS.incremental_sketch(ids, df[key], state.get(key, {}), eps, buckets)
+            bounds[key] = list(auto_bounds(df[key], low, high, sketch=sketch))
+        if state_path:
+            QS.save_state(state_path, state, eps, buckets)
+    else:
+        for key in todo:
+            bounds[key] = list(auto_bounds(df[key], low, high))
     return df
 
+# -------- Helpers robustes sur DataFrames ------------------------------------
 def ensure_numeric(df: pd.DataFrame, col: str, default: float = 0.0) -> pd.DataFrame:
     """
     Crée la colonne si absente, convertit en float, remplace NaN par défaut.
@@ -105,172 +201,172 @@ def ensure_numeric(df: pd.DataFrame, col: str, default: float = 0.0) -> pd.DataF
     df[col] = pd.to_numeric(df[col], errors="coerce").fillna(default).astype(float)
     return df
 
-# ----- Templates HTML ---------------------------------------------------------
-def product_page_html(item, meta):
-    return f"""<!doctype html>
-<html lang="fr"><head>
-<meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
-<title>{item['name']} — Éco-score</title>
-<meta name="description" content="Fiche éco-score pour {item['name']}">
-<link rel="stylesheet" href="{REPO_URL_BASE}/assets/style.css">
-</head><body>
-<header><a href="{REPO_URL_BASE}/">← Retour</a></header>
-<main>
-  <h1>{item['name']}</h1>
-  <p><strong>Note :</strong> <span class="badge {item['grade']}">{item['grade']}</span> ({item['score']}/100)</p>
-  <ul>
-    <li>Émissions (unité produit) : {item['base_kgco2e']} kgCO₂e</li>
-    <li>Distance estimée : {item['distance_km']} km</li>
-    <li>Risque biodiversité : {item['biodiversity_risk']}</li>
-  </ul>
-  <h2>QR code</h2>
-  <p>Scannez pour ouvrir cette fiche :</p>
-  <img alt="QR code fiche {item['name']}" src="{REPO_URL_BASE}/qr/{item['slug']}.png" width="180">
-  <h3>Sources & version</h3>
-  <ul>
-    <li>Agribalyse : {meta['data_source']['agribalyse']}</li>
-    <li>Distances : {meta['data_source']['distances']}</li>
-    <li>Biodiversité : {meta['data_source']['biodiversity']}</li>
-    <li>Version de la méthode : {meta['method_version']}</li>
-    <li>Build : {meta['build_time']}</li>
-  </ul>
-</main>
-</body></html>"""
-
-def index_html(items):
-    rows = "\n".join(
-        f"""<tr>
-<td><a href="{REPO_URL_BASE}/p/{it['slug']}/">{it['name']}</a></td>
-<td class="grade"><span class="badge {it['grade']}">{it['grade']}</span></td>
-<td>{it['score']}</td>
-</tr>"""
-        for it in items
-    )
-    # Doubles accolades pour échapper le JS dans une f-string
-    return f"""<!doctype html>
-<html lang="fr"><head>
-<meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
-<title>Éco-score — Catalogue</title>
-<link rel="stylesheet" href="{REPO_URL_BASE}/assets/style.css">
-</head><body>
-<main>
-  <h1>Catalogue Éco-score</h1>
-  <input id="q" type="search" placeholder="Rechercher un produit...">
-  <table>
-    <thead><tr><th>Produit</th><th>Note</th><th>Score</th></tr></thead>
-    <tbody>{rows}</tbody>
-  </table>
-</main>
-<script>
-const q = document.getElementById('q');
-q.addEventListener('input', () => {{
-  const term = q.value.toLowerCase();
-  for (const tr of document.querySelectorAll('tbody tr')) {{
-    tr.style.display = tr.innerText.toLowerCase().includes(term) ? '' : 'none';
-  }}
-}});
-</script>
-</body></html>"""
-
 # ============================= Main build ====================================
-def main():
-    ensure_dirs()
-    write_style()
-
-    # 1) Validation / chargement
-    p, a, d, b = V.load_all()
-
-    # 1.b) Robustesse des clés: forcer 'id' en str partout, fallback sur 'gtin' pour p
-    p = coerce_id(p, "products")
-    a = coerce_id(a, "agribalyse")
-    d = coerce_id(d, "distances")
-    b = coerce_id(b, "biodiv")
-
-    # 1.c) Colonnes numériques minimales (créées si absentes + cast float)
-    #    - a: kgco2e_unit
-    #    - d: distance_km
-    #    - b: biodiversity_risk
-    a = ensure_numeric(a, "kgco2e_unit", 0.0)
-    d = ensure_numeric(d, "distance_km", 0.0)
-    b = ensure_numeric(b, "biodiversity_risk", 0.0)
+def main(qr_workers=None, profile=None, archive=None, df=None):
+    """Build complet ; `profile` (ou BUILD_PROFILE=1) active cProfile, `archive`
+    (ou BUILD_ARCHIVE=1) produit aussi artifacts/site_build.tar.gz.
+
+    `df` : table jointe déjà chargée (pipeline en un process) ; renvoie les records.
+    """
+    if profile is None:
+        profile = bool(os.environ.get("BUILD_PROFILE"))
+    if archive is None:
+        archive = bool(os.environ.get("BUILD_ARCHIVE"))
+    report = IN.BuildReport()
+    with IN.profiled(CACHE_DIR / "build.prof", profile):
+        # Fichiers modifiés écrits dans le staging ; OUT n'est touché qu'en fin de build réussi
+        out = O.OutputWriter(OUT, CACHE_DIR / "output_hashes.json")
+        with report.stage("staging"):
+            out.start()
+        with out:
+            records = _build(report, qr_workers, out, df)
+        for name, n in out.stats.items():
+            report.count(name, n)
+        if archive:
+            with report.stage("archive"):
+                report.count("archive_bytes", O.archive(OUT, ARCHIVE_PATH or ROOT / "artifacts" / "site_build.tar.gz",
+                                                        exclude={"build_report.json"}))
+    report.write(OUT / "build_report.json")
+    print(report.summary())
+    return records
+
+def _build(report, qr_workers, out, df=None):
+    # Chemins de sortie : ceux de OUT, mais écritures et suppressions passent par `out`
+    root = out.root
+    with report.stage("setup"):
+        ensure_dirs(out.staging)
+        write_style(out.write, root)
+
+    # 1) Validation + jointure (snapshot partagé avec validate/QA, cf. src/dataset.py)
+    with report.stage("load"):
+        # copie : le build ajoute des colonnes à la table qu'on lui passe
+        df = D.load_joined(CACHE_DIR / "dataset") if df is None else df.copy()
 
     # 2) Config (poids, bornes, bandes, méta)
     cfg = load_config()
-    weights = cfg.get("weights", {"emissions": 0.5, "distance": 0.3, "biodiversity": 0.2})
-    grade_bands = cfg.get("grade_bands", [("A", 90), ("B", 75), ("C", 60), ("D", 45), ("E", 0)])
-    bounds = cfg.get("bounds", {})
-
-    # 3) Fusions robustes (toutes les clés en str)
-    p["id"] = p["id"].astype(str)
-    a["id"] = a["id"].astype(str)
-    d["id"] = d["id"].astype(str)
-    b["id"] = b["id"].astype(str)
-
-    df = (p.merge(a[["id", "kgco2e_unit"]], on="id", how="left")
-            .merge(d[["id", "distance_km"]], on="id", how="left")
-            .merge(b[["id", "biodiversity_risk"]], on="id", how="left"))
-
-    # 3.b) Renommage standard
-    df = df.rename(columns={"kgco2e_unit": "base_kgco2e"})
-
-    # 3.c) Valeurs par défaut si NaN après merge
-    df = ensure_numeric(df, "base_kgco2e", 0.0)
-    df = ensure_numeric(df, "distance_km", 0.0)
-    df = ensure_numeric(df, "biodiversity_risk", 0.0)
-
-    # 4) Bornes auto si manquantes (percentiles 5–95)
-    for key in ["base_kgco2e", "distance_km", "biodiversity_risk"]:
-        v = bounds.get(key, None)
-        if (not v) or (v[0] is None) or (v[1] is None):
-            bounds[key] = list(auto_bounds(df[key]))
-
-    # 5) Génération pages + QR + manifest
-    records = []
+    weights, bounds, grade_bands = score_config(cfg)
+
+    # 3) + 4) Valeurs par défaut et bornes auto
+    with report.stage("bounds"):
+        df = prepare(df, bounds, cfg.get("auto_bounds"), CACHE_DIR / "bounds_sketch.pkl")
+
+    # 4.b) Empreinte par fiche (entrées + config) pour le build incrémental
+    with report.stage("hash"):
+        record_hashes = BC.record_hashes(df, list(df.columns), BC.config_digest(
+            weights=weights, bounds=bounds, grade_bands=grade_bands, meta=cfg.get("meta", {}),
+            base_url=REPO_URL_BASE, template_version=TEMPLATE_VERSION, locales=list(R.LOCALES)))
+        cache_path = CACHE_DIR / "build_cache.json"
+        previous = BC.load(cache_path)
+        force = bool(os.environ.get("FORCE_REBUILD"))
+        current = {}
+
+    # 4.c) Scores + notes de tout le catalogue en une passe NumPy
+    with report.stage("score"):
+        df["score"], df["grade"] = score_frame(df, weights, bounds, grade_bands)
+    report.count("records_scored", len(df))
+
+    # 5) Records (slugs, URLs) puis pages + QR + manifest
+    with report.stage("records"):
+        records = [make_record(r) for r in df.to_dict(orient="records")]
+
+    qr_jobs = []
     build_time = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-
-    for _, r in df.iterrows():
-        # sécurise name vide
-        name = str(r.get("name") or r.get("id") or "Produit")
-        slug = slugify(f"{r['id']}-{name}")
-        score100, grade = score_row(r, weights, bounds, grade_bands)
-        url = f"{REPO_URL_BASE}/p/{slug}/"
-        rec = {
-            "id": str(r["id"]),
-            "name": name,
-            "slug": slug,
-            "url": url,
-            "score": score100,
-            "grade": grade,
-            "base_kgco2e": float(r["base_kgco2e"]),
-            "distance_km": float(r["distance_km"]),
-            "biodiversity_risk": float(r["biodiversity_risk"]),
-            "year": 2025
-        }
-        records.append(rec)
-
-        dest_dir = OUT / "p" / slug
-        dest_dir.mkdir(parents=True, exist_ok=True)
-        meta = (cfg.get("meta", {}) | {"build_time": build_time})
-        (dest_dir / "index.html").write_text(product_page_html(rec, meta), encoding="utf-8")
-        make_qr(url, OUT / "qr" / f"{slug}.png")
-
-    manifest = {
-        "records": records,
-        "meta": {
-            "build_time": build_time,
-            "method_version": cfg.get("meta", {}).get("method_version", "v1"),
-            "data_hash": {
-                str(pth): file_hash(ROOT / pth) for pth in [
-                    "data/products.csv", "data/agribalyse.csv", "data/distances.csv", "data/biodiv.csv"
-                ] if (ROOT / pth).exists()
-            },
-            "bounds": bounds,
-            "weights": weights
-        }
+    # Fragments invariants (en-têtes, sources, URLs d'assets) compilés une fois
+    renderer = R.Renderer(REPO_URL_BASE, cfg.get("meta", {}) | {"build_time": build_time})
+    page_roots = [R.locale_root(root, loc) / "p" for loc in renderer.locales]
+
+    with report.stage("pages"):
+        for rec, rec_hash in zip(records, record_hashes):
+            slug = rec["slug"]
+            current[slug] = rec_hash
+
+            # Fiche inchangée depuis le dernier build : ni rendu ni QR
+            pages = [root / slug / "index.html" for root in page_roots]
+            qr_path = root / "qr" / f"{slug}.png"
+            if not force and BC.is_fresh(previous, slug, rec_hash, pages + [qr_path]):
+                report.count("pages_skipped", len(pages))
+                continue
+
+            for dest, html in zip(pages, renderer.render_product(rec).values()):
+                out.write(dest, html)
+                report.count("pages_rendered")
+            qr_jobs.append((rec["url"], qr_path))
+
+    # 5.b) QR des fiches à (re)générer, en parallèle et dédoublonnés par URL
+    with report.stage("qr"):
+        qr_stats = QR.generate(qr_jobs, QR_CACHE_DIR or CACHE_DIR / "qr", workers=qr_workers, copy=out.copy)
+    report.count("qr_encoded", qr_stats["encoded"])
+    report.count("qr_from_cache", qr_stats["from_cache"])
+    report.count("qr_skipped", len(records) - len(qr_jobs))
+
+    # 5.c) Slugs disparus du catalogue : suppression des pages/QR orphelins
+    with report.stage("cleanup"):
+        report.count("slugs_removed", len(BC.remove_stale(root, previous, current, page_roots, out.remove)))
+
+    manifest_meta = {
+        "build_time": build_time,
+        "method_version": cfg.get("meta", {}).get("method_version", "v1"),
+        "data_hash": {
+            f"data/{name}": file_hash(V.DATA_DIR / name) for name in [
+                "products.csv", "agribalyse.csv", "distances.csv", "biodiv.csv"
+            ] if (V.DATA_DIR / name).exists()
+        },
+        "bounds": bounds,
+        "weights": weights
     }
 
-    (OUT / "index.html").write_text(index_html(records), encoding="utf-8")
-    (OUT / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    with report.stage("index"):
+        for loc in renderer.locales:
+            CI.write_pages(R.locale_root(root, loc), records,
+                           lambda items, n, pages, loc=loc: renderer.index_page(loc, items, n, pages),
+                           write=out.write, remove=out.remove)
+        CI.write_search_index(root, records, write=out.write, remove=out.remove)
+
+    # manifest.json complet, ou index + shards NDJSON précompressés (MANIFEST_FORMAT)
+    with report.stage("manifest"):
+        # Écrit en flux directement dans le staging ; l'ancien manifest (shards compris) part au commit
+        for old in [root / "manifest", *root.glob("manifest.json.*")]:
+            out.remove(old)
+        M.write(out.staging, records, manifest_meta)
+    report.count("manifest_bytes", IN.tree_bytes(*out.staging.glob("manifest.json*"), out.staging / "manifest"))
+
+    # 5.d) Shards scores/ pour p/, compare/ et basket/ (si les données ACV sont là)
+    monthly = None
+    if all((V.DATA_DIR / name).exists() for name in MC.INPUTS):
+        with report.stage("multicriteria"):
+            inputs = MC.load_inputs(V.DATA_DIR)
+            res = MC.precompute(*inputs)
+            report.count("score_shards", MC.write_shards(root, inputs[0], res,
+                                                         write=out.write, remove=out.remove))
+            monthly = AL.monthly_scores(df, inputs[0], res)
+
+    # 6) Meilleures alternatives de même catégorie, sur le score affiché par ces pages
+    with report.stage("alternatives"):
+        alt_cfg = cfg.get("alternatives") or {}
+        report.count("alternative_shards", AL.write_shards(
+            root, df, records, k=int(alt_cfg.get("k", AL.K)), same_unit=bool(alt_cfg.get("same_unit", False)),
+            write=out.write, remove=out.remove, monthly=monthly))
+
+    # 7) Fin des écritures puis bascule staging -> OUT ; le cache de build n'est
+    #    sauvegardé qu'après : il ne décrit jamais un OUT qui n'a pas été publié
+    with report.stage("commit"):
+        out.commit()
+        BC.save(cache_path, current)
+
+    report.add("build_time", build_time)
+    report.add("render", renderer.report())
+    return records
+
+def parse_args(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Build du site statique éco-score")
+    ap.add_argument("--qr-workers", type=int, default=None, help="défaut : QR_WORKERS ou nombre de cœurs")
+    ap.add_argument("--profile", action="store_true", default=None,
+                    help="profil cProfile dans .cache/build.prof (ou BUILD_PROFILE=1)")
+    ap.add_argument("--archive", action="store_true", default=None,
+                    help="archive déployable artifacts/site_build.tar.gz (ou BUILD_ARCHIVE=1)")
+    return ap.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(qr_workers=args.qr_workers, profile=args.profile, archive=args.archive)
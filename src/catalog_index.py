@@ -0,0 +1,198 @@
+"""Index du catalogue paginé + index de recherche statique partitionné.
+
+- pages : `index.html` (page 1) puis `page/<n>/index.html`, PAGE_SIZE produits chacune ;
+- recherche : `search/name/<préfixe>.json` (tokens des noms) et `search/id/<préfixe>.json`
+  (tokens des ids), tokens normalisés (minuscules, sans accents). Un shard
+  couvre un préfixe de 2 caractères, allongé (3, 4...) tant qu'il dépasse
+  MAX_ITEMS produits ; `search/meta.json` liste les préfixes découpés. La page
+  ne télécharge que les shards du terme tapé, quelle que soit la taille du
+  catalogue.
+"""
+import json
+from collections import defaultdict
+from itertools import groupby
+from pathlib import Path
+
+from slugify import slugify
+
+import src.output as O
+
+PAGE_SIZE = 200
+PREFIX_LEN = 2
+# Produits par shard au plus (~100 Ko de JSON)
+MAX_ITEMS = 1000
+# Champs indexés, chacun dans ses propres shards (les ids d'un catalogue partagent
+# souvent leur début : mêlés aux noms, ils rempliraient un seul shard)
+FIELDS = ("name", "id")
+
+def page_url(base_url, n):
+    return f"{base_url}/" if n == 1 else f"{base_url}/page/{n}/"
+
+def tokens(text):
+    """Tokens normalisés : même normalisation (unidecode) que les slugs."""
+    return [t for t in slugify(str(text)).split("-") if t]
+
+def shard_key(term, split, min_len=PREFIX_LEN):
+    """Shard d'un terme : préfixe de `min_len` caractères, allongé tant qu'il est découpé."""
+    key = term[:min_len]
+    while key in split and len(term) > len(key):
+        key = term[:len(key) + 1]
+    return key
+
+def _shard(toks, postings, records, max_items):
+    """Shard des tokens `toks` (triés) ; arrêté au-delà de `max_items` produits (`partial`)."""
+    items, local, index, partial = [], {}, {}, False
+    for tok in toks:
+        idx = []
+        for i in postings[tok]:
+            if i not in local:
+                if len(items) >= max_items:
+                    partial = True
+                    break
+                local[i] = len(items)
+                rec = records[i]
+                items.append([rec["slug"], rec["name"], rec["grade"], rec["score"]])
+            idx.append(local[i])
+        if idx:
+            index[tok] = idx
+        if partial:
+            break
+    shard = {"items": items, "tokens": index}
+    if partial:
+        shard["partial"] = True
+    return shard
+
+def build_search_shards(records, field="name", max_items=MAX_ITEMS):
+    """({préfixe: {"items": [[slug, name, grade, score], ...], "tokens": {token: [i, ...]}}}, préfixes découpés)
+
+    Un préfixe dont les tokens couvrent plus de `max_items` produits est découpé
+    sur un caractère de plus ; son propre shard (terme tapé aussi court que le
+    préfixe) ne garde que les `max_items` premiers produits (`partial`).
+    """
+    postings = defaultdict(list)
+    for i, rec in enumerate(records):
+        for tok in dict.fromkeys(tokens(rec[field])):
+            if len(tok) >= PREFIX_LEN:
+                postings[tok].append(i)
+    shards, split = {}, set()
+    pending = [(key, list(group)) for key, group in groupby(sorted(postings), key=lambda t: t[:PREFIX_LEN])]
+    while pending:
+        key, toks = pending.pop()
+        shards[key] = _shard(toks, postings, records, max_items)
+        if not shards[key].get("partial"):
+            continue
+        longer = [t for t in toks if len(t) > len(key)]
+        if longer:
+            split.add(key)
+            n = len(key) + 1
+            pending += [(k, list(g)) for k, g in groupby(longer, key=lambda t: t[:n])]
+    return shards, split
+
+def write_search_index(out: Path, records, write=None, max_items=MAX_ITEMS, remove=None):
+    """`search/meta.json` + shards `search/name/` et `search/id/` ; `write(path, data)`,
+    `remove(path)` : cf. src/output.py (défaut : écriture atomique, suppression immédiate)."""
+    write, remove = write or O.write_file, remove or O.remove_path
+    dest = out / "search"
+    meta = {"min": PREFIX_LEN, "max_items": max_items}
+    total = 0
+    for field in FIELDS:
+        shards, split = build_search_shards(records, field, max_items)
+        for key, shard in shards.items():
+            write(dest / field / f"{key}.json", json.dumps(shard, ensure_ascii=False, separators=(",", ":")))
+        meta[field] = sorted(split)
+        total += len(shards)
+        # Préfixes disparus du catalogue
+        for old in (dest / field).glob("*.json"):
+            if old.stem not in shards:
+                remove(old)
+    write(dest / "meta.json", json.dumps(meta, separators=(",", ":")))
+    # Shards à plat d'avant le découpage par champ
+    for old in dest.glob("*.json"):
+        if old.name != "meta.json":
+            remove(old)
+    return total
+
+def write_pages(out: Path, records, render, page_size=PAGE_SIZE, write=None, remove=None):
+    """Écrit les pages d'index ; `render(items, page, pages)` produit le HTML."""
+    write, remove = write or O.write_file, remove or O.remove_path
+    pages = max(1, -(-len(records) // page_size))
+    for n in range(1, pages + 1):
+        dest = out if n == 1 else out / "page" / str(n)
+        items = records[(n - 1) * page_size:n * page_size]
+        write(dest / "index.html", render(items, n, pages))
+    # Pages au-delà de la dernière (catalogue plus court qu'au build précédent)
+    for old in (out / "page").glob("*"):
+        if not (old.name.isdigit() and 2 <= int(old.name) <= pages):
+            remove(old)
+    return pages
+
+def pager_html(base_url, page, pages, prev_label, next_label):
+    if pages <= 1:
+        return ""
+    links = []
+    if page > 1:
+        links.append(f'<a href="{page_url(base_url, page - 1)}">{prev_label}</a>')
+    links.append(f"<span>{page} / {pages}</span>")
+    if page < pages:
+        links.append(f'<a href="{page_url(base_url, page + 1)}">{next_label}</a>')
+    return f'<nav class="pager">{" ".join(links)}</nav>'
+
+def search_script(base_url, link_base=None):
+    """Recherche paresseuse : charge les shards `name/` et `id/` du premier terme tapé.
+
+    `search/meta.json` (lu une fois) donne les préfixes découpés, cf. `shard_key`.
+    Les shards sont communs à toutes les langues ; `link_base` est la racine
+    des fiches de la page courante (ex. `<base>/en`).
+    """
+    link_base = link_base or base_url
+    return f"""<script>
+const q = document.getElementById('q');
+const tbody = document.querySelector('tbody');
+const pageRows = tbody.innerHTML;
+const shards = new Map();
+let meta = null;
+let last = 0;
+const norm = s => s.normalize('NFD').replace(/[\\u0300-\\u036f]/g, '').toLowerCase().split(/[^a-z0-9]+/).filter(Boolean);
+function loadMeta() {{
+  meta = meta || fetch('{base_url}/search/meta.json').then(r => r.ok ? r.json() : {{}})
+    .then(m => ({{min: m.min || {PREFIX_LEN}, name: new Set(m.name || []), id: new Set(m.id || [])}}));
+  return meta;
+}}
+function shardKey(term, split, min) {{
+  let key = term.slice(0, min);
+  while (split.has(key) && term.length > key.length) key = term.slice(0, key.length + 1);
+  return key;
+}}
+async function shard(field, key) {{
+  const path = field + '/' + key;
+  if (!shards.has(path)) {{
+    shards.set(path, fetch('{base_url}/search/' + path + '.json').then(r => r.ok ? r.json() : {{items: [], tokens: {{}}}}));
+  }}
+  return shards.get(path);
+}}
+q.addEventListener('input', async () => {{
+  const seq = ++last;
+  const terms = norm(q.value);
+  const m = await loadMeta();
+  if (!terms.length || terms[0].length < m.min) {{ if (seq === last) tbody.innerHTML = pageRows; return; }}
+  const found = await Promise.all(['name', 'id'].map(f => shard(f, shardKey(terms[0], m[f], m.min))));
+  if (seq !== last) return;   // une frappe plus récente a pris la main
+  const hits = new Map();
+  for (const s of found) {{
+    for (const [tok, idx] of Object.entries(s.tokens)) {{
+      if (tok.startsWith(terms[0])) idx.forEach(i => hits.set(s.items[i][0], s.items[i]));
+    }}
+  }}
+  const rows = [];
+  for (const [slug, name, grade, score] of hits.values()) {{
+    const words = norm(name);
+    if (!terms.slice(1).every(t => words.some(w => w.startsWith(t)))) continue;
+    const tr = document.createElement('tr');
+    tr.innerHTML = `<td><a href="{link_base}/p/${{slug}}/"></a></td><td class="grade"><span class="badge ${{grade}}">${{grade}}</span></td><td>${{score}}</td>`;
+    tr.querySelector('a').textContent = name;
+    rows.push(tr);
+    if (rows.length >= 200) break;
+  }}
+  tbody.replaceChildren(...rows);
+}});
+</script>"""
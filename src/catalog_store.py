@@ -0,0 +1,307 @@
+"""Catalogue versionné : base compactée + journal de deltas partenaires.
+
+Usage :
+  python -m src.catalog_store init                        # base v0 depuis data/*.csv
+  python -m src.catalog_store ingest products delta.csv   # upserts/suppressions -> nouvelle version
+  python -m src.catalog_store export dossier/ [--version N]
+  python -m src.catalog_store compact
+
+Un delta est un CSV d'une des 4 tables, clé `id` (ou `gtin` pour les
+produits, comme `dataset.coerce_id`). Colonne optionnelle `_op` :
+`upsert` (défaut) ou `delete`. Un upsert ne remplace que les colonnes
+présentes et non vides : un partenaire peut n'envoyer que ce qui change.
+
+Stockage (`store/`, ou variable CATALOG_STORE) :
+- `base-<version>/<table>.pkl` : tables complètes (DataFrame indexé par id) ;
+- `log.jsonl` : une ligne par version (table, upserts, suppressions), en
+  ajout seul ;
+- `head/<table>.pkl` : chaque table à sa dernière version, tenue à jour par
+  `ingest` (seul le delta est appliqué, sans rejeu du journal).
+Lire « à la version N » = tête (ou base la plus récente) <= N, puis rejeu
+du journal ; seules les versions passées rejouent vraiment des deltas.
+Un verrou (`.lock`, fcntl) sérialise lecture de version, ajout au journal
+et compaction entre process.
+La compaction écrit une nouvelle base à la version courante et ne garde
+que les `KEEP_BASES` dernières bases (et le journal postérieur à la plus
+ancienne) : les versions antérieures ne sont plus lisibles.
+Les valeurs sont gardées telles quelles (texte) ; `export()` réécrit des
+CSV que la chaîne habituelle (validation, jointure, build) relit.
+"""
+import argparse, json, os, pickle, shutil, time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl    # verrou entre process (POSIX)
+except ImportError:
+    fcntl = None
+
+import pandas as pd
+
+import src.dataset as D
+import src.validate_data as V
+
+ROOT = Path(__file__).resolve().parents[1]
+STORE_DIR = Path(os.environ.get("CATALOG_STORE", ROOT / "store"))
+TABLES = D.TABLES
+# Compaction automatique après ce nombre de versions dans le journal
+COMPACT_EVERY = 50
+KEEP_BASES = 2
+
+def _base_dir(store: Path, version: int) -> Path:
+    return store / f"base-{version:06d}"
+
+@contextmanager
+def _locked(store: Path):
+    """Section exclusive sur le store (ingest, compaction)."""
+    with open(store / ".lock", "a") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def _read_head(store: Path, table: str):
+    """(version, DataFrame) de la tête de `table` ; (-1, None) si absente ou illisible."""
+    try:
+        head = pd.read_pickle(store / "head" / f"{table}.pkl")
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return -1, None
+    return head["v"], head["df"]
+
+def _write_head(store: Path, table: str, version: int, df: pd.DataFrame):
+    path = store / "head" / f"{table}.pkl"
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    pd.to_pickle({"v": version, "df": df}, tmp)
+    tmp.replace(path)
+
+def bases(store: Path = None) -> list:
+    """Versions des bases présentes, croissantes."""
+    store = store or STORE_DIR
+    return sorted(int(p.name.split("-")[1]) for p in store.glob("base-*") if (p / ".complete").exists())
+
+def read_log(store: Path = None) -> list:
+    """Entrées du journal ; une dernière ligne tronquée (crash en cours d'ajout) est ignorée."""
+    path = (store or STORE_DIR) / "log.jsonl"
+    if not path.exists():
+        return []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    entries = []
+    for i, line in enumerate(lines):
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            if i != len(lines) - 1:
+                raise
+    return entries
+
+def current_version(store: Path = None) -> int:
+    store = store or STORE_DIR
+    log = read_log(store)
+    b = bases(store)
+    if not b:
+        raise FileNotFoundError(f"pas de catalogue dans {store} (python -m src.catalog_store init)")
+    return max([b[-1]] + [e["v"] for e in log])
+
+def _write_base(store: Path, version: int, tables: dict):
+    final = _base_dir(store, version)
+    tmp = final.with_name(final.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, df in tables.items():
+        df.to_pickle(tmp / f"{name}.pkl")
+    (tmp / ".complete").touch()
+    shutil.rmtree(final, ignore_errors=True)
+    tmp.rename(final)
+
+def _read_table(path: Path) -> pd.DataFrame:
+    """CSV en texte, indexé par id (id absent : gtin), sans doublon."""
+    df = D.coerce_id(pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""]), path.stem)
+    return df.drop_duplicates(subset="id", keep="last").set_index("id")
+
+def init(data_dir: Path = None, store: Path = None, force: bool = False) -> int:
+    """Base v0 à partir des 4 CSV complets (colonnes requises vérifiées)."""
+    store = store or STORE_DIR
+    data_dir = data_dir or V.DATA_DIR
+    if bases(store) and not force:
+        raise ValueError(f"catalogue déjà initialisé dans {store}")
+    shutil.rmtree(store, ignore_errors=True)
+    store.mkdir(parents=True)
+    tables = {name: _read_table(data_dir / f"{name}.csv") for name in TABLES}
+    for name, df in tables.items():
+        V.ensure_cols(df.reset_index(), V.REQUIRED[name], name)
+    _write_base(store, 0, tables)
+    return 0
+
+def _apply(df: pd.DataFrame, upserts: pd.DataFrame, deletes) -> pd.DataFrame:
+    """Suppressions puis upserts colonne par colonne (NaN = valeur inchangée)."""
+    if len(deletes):
+        df = df.drop(index=deletes, errors="ignore")
+    if len(upserts):
+        order = df.index.append(upserts.index.difference(df.index, sort=False))
+        columns = df.columns.append(upserts.columns.difference(df.columns, sort=False))
+        df = upserts.combine_first(df).reindex(index=order, columns=columns)
+    return df
+
+def _entry_frame(entry) -> pd.DataFrame:
+    return pd.DataFrame(entry["upserts"], dtype=object).set_index("id") if entry["upserts"] \
+        else pd.DataFrame(index=pd.Index([], name="id"))
+
+def as_of(version: int = None, store: Path = None) -> dict:
+    """Tables {nom: DataFrame indexé par id} telles qu'à la version `version` (défaut : courante).
+
+    Point de départ par table : sa tête si elle n'est pas plus récente que
+    `version` (cas courant : rien à rejouer), sinon la base la plus récente.
+    """
+    store = store or STORE_DIR
+    available = bases(store)
+    version = current_version(store) if version is None else version
+    usable = [b for b in available if b <= version]
+    if not usable:
+        raise ValueError(f"version {version} compactée (plus ancienne base : {available[0] if available else '-'})")
+    base = usable[-1]
+    tables, start = {}, {}
+    for name in TABLES:
+        head_v, df = _read_head(store, name)
+        if base <= head_v <= version:
+            tables[name], start[name] = df, head_v
+        else:
+            tables[name], start[name] = pd.read_pickle(_base_dir(store, base) / f"{name}.pkl"), base
+    for entry in read_log(store):
+        t = entry["table"]
+        if start[t] < entry["v"] <= version:
+            tables[t] = _apply(tables[t], _entry_frame(entry), entry["deletes"])
+    return tables
+
+def _normalize_delta(table: str, delta: pd.DataFrame, current: pd.DataFrame):
+    """(upserts indexés par id, ids supprimés) ; erreurs -> ValueError, comme la validation."""
+    if table not in TABLES:
+        raise ValueError(f"table inconnue : {table} (attendu : {', '.join(TABLES)})")
+    delta = delta.copy()
+    op = delta.pop("_op").fillna("upsert").str.strip().str.lower() if "_op" in delta.columns \
+        else pd.Series("upsert", index=delta.index)
+    if not op.isin(["upsert", "delete"]).all():
+        raise ValueError(f"{table}: _op inconnu {sorted(set(op) - {'upsert', 'delete'})}")
+    # Produits : une suppression peut désigner le GTIN plutôt que l'id
+    if table == "products" and "id" not in delta.columns and "gtin" in delta.columns:
+        by_gtin = dict(zip(current["gtin"].dropna().str.strip(), current.index)) if "gtin" in current else {}
+        delta["id"] = [by_gtin.get(str(g).strip(), str(g).strip()) for g in delta["gtin"]]
+    delta = D.coerce_id(delta, table)
+    if (delta["id"].isin(["", "nan"])).any():
+        raise ValueError(f"{table}: ligne sans id ni gtin")
+
+    deletes = delta.loc[op.eq("delete").to_numpy(), "id"].unique().tolist()
+    # Doublons dans un même delta : la dernière ligne gagne
+    up = delta[op.eq("upsert").to_numpy()].drop_duplicates(subset="id", keep="last").set_index("id")
+
+    new = up.index.difference(current.index)
+    missing = [c for c in V.REQUIRED[table] if c != "id" and c not in up.columns]
+    if len(new) and (missing or up.loc[new, [c for c in V.REQUIRED[table] if c != "id"]].isna().any().any()):
+        raise ValueError(f"{table}: nouveaux ids sans colonnes requises {V.REQUIRED[table]}")
+    col = D.VALUE_COLUMNS.get(table)
+    if col in up.columns:
+        values = pd.to_numeric(up[col], errors="coerce")
+        if (values.isna() & up[col].notna()).any():
+            raise ValueError(f"{table}: {col} non numérique")
+        V.check_values(pd.DataFrame({col: values.dropna()}), table)
+    return up, deletes
+
+def ingest(table: str, delta: pd.DataFrame, store: Path = None, source: str = None,
+           compact_every: int = COMPACT_EVERY) -> int:
+    """Applique un delta (DataFrame texte) ; renvoie la nouvelle version.
+
+    Sous verrou : deux ingestions concurrentes ne peuvent pas écrire la même version.
+    """
+    store = store or STORE_DIR
+    with _locked(store):
+        version = current_version(store)
+        current = as_of(version, store)[table]
+        up, deletes = _normalize_delta(table, delta, current)
+        entry = {"v": version + 1, "table": table, "source": source,
+                 "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                 "upserts": json.loads(up.reset_index().to_json(orient="records", force_ascii=False)),
+                 "deletes": deletes}
+        path = store / "log.jsonl"
+        with open(path, "a+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    # dernière ligne tronquée par un crash : retirée avant d'ajouter
+                    f.seek(0)
+                    data = f.read()
+                    f.truncate(data.rfind(b"\n") + 1)
+            f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        # Tête : delta appliqué à la table déjà en mémoire (journal écrit d'abord : une tête
+        # en retard après un crash est rattrapée par rejeu)
+        _write_head(store, table, entry["v"], _apply(current, _entry_frame(entry), deletes))
+        if compact_every and entry["v"] - bases(store)[-1] >= compact_every:
+            _compact(store)
+    return entry["v"]
+
+def ingest_file(table: str, path: Path, store: Path = None) -> int:
+    delta = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+    return ingest(table, delta, store, source=Path(path).name)
+
+def compact(store: Path = None, keep: int = KEEP_BASES) -> int:
+    """Nouvelle base à la version courante ; bases et journal trop anciens supprimés."""
+    store = store or STORE_DIR
+    with _locked(store):
+        return _compact(store, keep)
+
+def _compact(store: Path, keep: int = KEEP_BASES) -> int:
+    version = current_version(store)
+    if version not in bases(store):
+        _write_base(store, version, as_of(version, store))
+    kept = bases(store)[-keep:]
+    for b in bases(store)[:-keep]:
+        shutil.rmtree(_base_dir(store, b))
+    log = [e for e in read_log(store) if e["v"] > kept[0]]
+    tmp = store / "log.jsonl.tmp"
+    tmp.write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in log), encoding="utf-8")
+    tmp.replace(store / "log.jsonl")
+    return version
+
+def export(dest: Path, version: int = None, store: Path = None) -> dict:
+    """Écrit les 4 CSV de la version dans `dest` (relisibles par validate_data / dataset)."""
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    counts = {}
+    for name, df in as_of(version, store).items():
+        df.reset_index().to_csv(dest / f"{name}.csv", index=False)
+        counts[name] = len(df)
+    return counts
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Catalogue versionné (deltas partenaires)")
+    ap.add_argument("--store", type=Path, default=None, help="défaut : store/ (ou CATALOG_STORE)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("init"); p.add_argument("--data", type=Path); p.add_argument("--force", action="store_true")
+    p = sub.add_parser("ingest"); p.add_argument("table", choices=TABLES); p.add_argument("delta", type=Path)
+    p = sub.add_parser("export"); p.add_argument("dest", type=Path); p.add_argument("--version", type=int)
+    sub.add_parser("compact")
+    sub.add_parser("log")
+    args = ap.parse_args(argv)
+    store = args.store
+
+    if args.cmd == "init":
+        init(args.data, store, args.force)
+        print(f"Catalogue initialisé (version 0) dans {store or STORE_DIR}")
+    elif args.cmd == "ingest":
+        print(f"{args.delta} -> version {ingest_file(args.table, args.delta, store)}")
+    elif args.cmd == "export":
+        counts = export(args.dest, args.version, store)
+        print(f"Exporté dans {args.dest} : {counts}")
+    elif args.cmd == "compact":
+        print(f"Base compactée à la version {compact(store)}")
+    else:
+        for e in read_log(store):
+            print(f"v{e['v']}  {e['at']}  {e['table']:<11} +{len(e['upserts'])} -{len(e['deletes'])}  {e['source'] or ''}")
+
+if __name__ == "__main__":
+    main()
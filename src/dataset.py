@@ -0,0 +1,127 @@
+"""Accès aux données partagé par la validation, la QA et le build.
+
+Les 4 CSV sont validés, puis joints une seule fois (même logique pour tout le
+monde) ; la table jointe est gardée en snapshot sur disque, indexé par le
+hash du contenu des fichiers d'entrée. Tant que les CSV ne changent pas, les
+trois points d'entrée rechargent ce snapshot au lieu de tout reparser.
+"""
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import src.validate_data as V
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / ".cache" / "dataset"
+
+# À incrémenter si la logique de jointure change (invalide les snapshots)
+SNAPSHOT_VERSION = 1
+TABLES = ["products", "agribalyse", "distances", "biodiv"]
+VALUE_COLUMNS = {"agribalyse": "kgco2e_unit", "distances": "distance_km", "biodiv": "biodiversity_risk"}
+
+def coerce_id(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    - Si 'id' absent mais 'gtin' présent, utilise gtin comme id.
+    - Force 'id' en string sans espaces.
+    """
+    if "id" not in df.columns:
+        if "gtin" in df.columns:
+            df = df.rename(columns={"gtin": "id"})
+        else:
+            # Génère un id si vraiment rien (ligne + hash simple)
+            df = df.copy()
+            df["id"] = [f"{name}_{i}" for i in range(len(df))]
+    df["id"] = df["id"].astype(str).str.strip()
+    return df
+
+def input_key(data_dir: Path = None) -> str:
+    """Hash du contenu des 4 CSV (lus par blocs) + version de la jointure."""
+    data_dir = data_dir or V.DATA_DIR
+    h = hashlib.sha256(f"v{SNAPSHOT_VERSION}".encode())
+    for name in TABLES:
+        h.update(name.encode())
+        with open(data_dir / f"{name}.csv", "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+def join(p, a, d, b) -> pd.DataFrame:
+    """Produits + valeurs d'impact, jointure gauche sur 'id' (str).
+
+    Les valeurs non numériques deviennent NaN, et un produit sans
+    correspondance garde NaN : la QA les signale, le build les remplace.
+    """
+    df = coerce_id(p, "products")
+    for name, t in zip(TABLES[1:], (a, d, b)):
+        df = df.merge(_impact(t, name), on="id", how="left")
+    return df.rename(columns={"kgco2e_unit": "base_kgco2e"})
+
+def _impact(t: pd.DataFrame, name: str) -> pd.DataFrame:
+    """(id, valeur numérique) d'une table d'impact."""
+    col = VALUE_COLUMNS[name]
+    t = coerce_id(t, name)[["id", col]].copy()
+    t[col] = pd.to_numeric(t[col], errors="coerce").astype(float)
+    return t
+
+def _impact_lookup(name: str, data_dir: Path, chunksize: int):
+    """(hash 64 bits des ids, triés ; valeurs) d'une table d'impact lue par blocs : 16 octets par id."""
+    col = VALUE_COLUMNS[name]
+    keys, values = [], []
+    for t in pd.read_csv(data_dir / f"{name}.csv", dtype={"id": str}, chunksize=chunksize,
+                         usecols=lambda c: c in ("id", "gtin", col)):
+        t = _impact(t, name)
+        keys.append(pd.util.hash_array(t["id"].to_numpy(dtype=object)))
+        values.append(t[col].to_numpy())
+    keys, values = np.concatenate(keys), np.concatenate(values)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], values[order]
+
+def _lookup(ids: pd.Series, table) -> np.ndarray:
+    """Valeur de chaque id (NaN si absent, comme la jointure gauche)."""
+    keys, values = table
+    out = np.full(len(ids), np.nan)
+    if len(keys):
+        h = pd.util.hash_array(ids.to_numpy(dtype=object))
+        pos = np.minimum(np.searchsorted(keys, h), len(keys) - 1)
+        hit = keys[pos] == h
+        out[hit] = values[pos[hit]]
+    return out
+
+def iter_joined(chunksize: int, data_dir: Path = None):
+    """Table jointe par blocs de `chunksize` produits, sans snapshot ni validation (cf. V.scan_all).
+
+    Mêmes valeurs que `join` sur des tables validées (ids uniques). Les tables
+    d'impact ne sont gardées que sous forme (hash de l'id, valeur) ; ids
+    produits lus en texte (un bloc ne doit pas les inférer autrement qu'un autre).
+    """
+    data_dir = data_dir or V.DATA_DIR
+    tables = {VALUE_COLUMNS[name]: _impact_lookup(name, data_dir, chunksize) for name in TABLES[1:]}
+    for chunk in pd.read_csv(data_dir / "products.csv", dtype={"id": str}, chunksize=chunksize):
+        df = coerce_id(chunk, "products")
+        for col, table in tables.items():
+            df[col] = _lookup(df["id"], table)
+        yield df.rename(columns={"kgco2e_unit": "base_kgco2e"})
+
+def snapshot_path(key: str, cache_dir: Path = None) -> Path:
+    return (cache_dir or CACHE_DIR) / f"joined-{key}.pkl"
+
+def load_joined(cache_dir: Path = None, use_cache: bool = True) -> pd.DataFrame:
+    """Table jointe validée ; depuis le snapshot si les CSV n'ont pas changé."""
+    cache_dir = cache_dir or CACHE_DIR
+    path = snapshot_path(input_key(), cache_dir)
+    if use_cache and path.exists():
+        return pd.read_pickle(path)
+
+    # Snapshot écrit seulement après validation : sa présence vaut validation
+    df = join(*V.load_all())
+    if use_cache:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        df.to_pickle(tmp)
+        tmp.replace(path)
+        for old in cache_dir.glob("joined-*.pkl"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    return df
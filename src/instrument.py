@@ -0,0 +1,126 @@
+"""Instrumentation du build : durées et pic mémoire par étape, compteurs.
+
+    report = BuildReport()
+    with report.stage("load"):
+        ...
+    report.count("pages_written", 2)
+    report.write(OUT / "build_report.json")
+
+Le pic mémoire d'une étape est échantillonné (RSS courant, toutes les
+SAMPLE_INTERVAL s) par un thread pendant l'étape ; hors Linux, seul le pic
+du process (ru_maxrss) est disponible.
+"""
+import os, json, time, threading, cProfile, pstats, io
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import src.output as O
+from src.validate_data import peak_rss_mb
+
+SAMPLE_INTERVAL = 0.02
+
+def current_rss_mb():
+    """RSS courant (Mo) via /proc ; None si indisponible."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+class _Sampler(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak = None
+        self._done = threading.Event()
+        self.sample()
+
+    def sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def run(self):
+        while not self._done.wait(SAMPLE_INTERVAL):
+            self.sample()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.sample()
+        return self.peak
+
+class BuildReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.counters = Counter()
+        self.sections = {}
+
+    @contextmanager
+    def stage(self, name):
+        sampler = _Sampler()
+        sampler.start()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t0
+            peak = sampler.stop()
+            self.stages.append({"name": name, "seconds": round(seconds, 4),
+                                "rss_peak_mb": round(peak, 1) if peak is not None else None})
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def add(self, name, value):
+        """Section libre du rapport (ex. débit de rendu par template)."""
+        self.sections[name] = value
+
+    def to_dict(self):
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+            "counters": dict(self.counters),
+            **self.sections,
+        }
+
+    def write(self, path: Path):
+        O.write_file(path, json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+
+    def summary(self):
+        lines = [f"{s['name']:<14}{s['seconds']:>9.3f}s {s['rss_peak_mb'] or '-':>8} Mo" for s in self.stages]
+        lines.append(" ".join(f"{k}={v}" for k, v in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+def tree_bytes(*paths):
+    """Taille cumulée (octets) de fichiers / dossiers existants."""
+    total = 0
+    for p in paths:
+        p = Path(p)
+        if p.is_file():
+            total += p.stat().st_size
+        elif p.is_dir():
+            total += sum(f.stat().st_size for f in p.rglob("*") if f.is_file())
+    return total
+
+@contextmanager
+def profiled(dest: Path, enabled: bool, top=25):
+    """cProfile autour du bloc si `enabled` : stats brutes dans `dest`, top cumulatif affiché."""
+    if not enabled:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(dest)
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(top)
+        print(out.getvalue())
+        print(f"Profil cProfile : {dest}")
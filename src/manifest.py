@@ -0,0 +1,105 @@
+"""Écriture / lecture en flux du manifest du build.
+
+Deux formats (variable MANIFEST_FORMAT) :
+- "json"   : historique, un seul `manifest.json` indenté contenant tous les records ;
+- "ndjson" : `manifest.json` réduit à un index (meta + liste des shards) et les
+  records en lignes JSON dans `manifest/records-<n>.ndjson`, SHARD_SIZE par fichier.
+
+En mode ndjson, chaque fichier a aussi une variante précompressée `.gz`
+(et `.br` si le module `brotli` est installé). Les lecteurs passent par
+`iter_records`, qui lit les deux formats sans charger tous les shards.
+"""
+import os, json, gzip, shutil
+from pathlib import Path
+
+try:
+    import brotli   # optionnel : variantes .br
+except ImportError:
+    brotli = None
+
+SHARD_SIZE = 50_000
+FORMATS = ("json", "ndjson")
+
+def default_format() -> str:
+    fmt = os.environ.get("MANIFEST_FORMAT", "json")
+    if fmt not in FORMATS:
+        raise ValueError(f"MANIFEST_FORMAT inconnu: {fmt} (attendu: {', '.join(FORMATS)})")
+    return fmt
+
+class _Sink:
+    """Fichier + variantes compressées alimentés ligne à ligne."""
+    def __init__(self, path: Path, compress: bool):
+        self.files = [open(path, "wb")]
+        self.br = None
+        if compress:
+            self.files.append(gzip.open(f"{path}.gz", "wb", compresslevel=9))
+            if brotli is not None:
+                self.br_file = open(f"{path}.br", "wb")
+                self.br = brotli.Compressor(quality=11)
+
+    def write(self, data: bytes):
+        for f in self.files:
+            f.write(data)
+        if self.br is not None:
+            self.br_file.write(self.br.process(data))
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        if self.br is not None:
+            self.br_file.write(self.br.finish())
+            self.br_file.close()
+
+def _write_bytes(path: Path, data: bytes, compress: bool):
+    sink = _Sink(path, compress)
+    sink.write(data)
+    sink.close()
+
+def write(out: Path, records, meta: dict, fmt: str = None, shard_size: int = SHARD_SIZE) -> dict:
+    """Écrit le manifest dans `out` ; renvoie l'index (ou le manifest complet en mode json)."""
+    fmt = fmt or default_format()
+    shard_dir = out / "manifest"
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    # Jamais d'écriture sur place : un lecteur peut avoir l'ancien fichier ouvert
+    for stale in [out / "manifest.json", *out.glob("manifest.json.*")]:
+        stale.unlink(missing_ok=True)
+
+    if fmt == "json":
+        manifest = {"records": list(records), "meta": meta}
+        (out / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        return manifest
+
+    shard_dir.mkdir(parents=True)
+    shards, sink, count = [], None, 0
+    for rec in records:
+        if count % shard_size == 0:
+            if sink:
+                sink.close()
+            path = shard_dir / f"records-{len(shards):05d}.ndjson"
+            shards.append({"path": f"manifest/{path.name}", "count": 0})
+            sink = _Sink(path, compress=True)
+        sink.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        shards[-1]["count"] += 1
+        count += 1
+    if sink:
+        sink.close()
+
+    index = {"format": "ndjson", "count": count, "shards": shards, "meta": meta}
+    _write_bytes(out / "manifest.json", json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                 compress=True)
+    return index
+
+def read_index(build: Path) -> dict:
+    """`manifest.json` tel quel (index ndjson, ou manifest complet en mode json)."""
+    return json.loads((build / "manifest.json").read_text(encoding="utf-8"))
+
+def iter_records(build: Path):
+    """Records du manifest, shard par shard (une ligne à la fois en mode ndjson)."""
+    index = read_index(build)
+    if index.get("format") != "ndjson":
+        yield from index["records"]
+        return
+    for shard in index["shards"]:
+        with open(build / shard["path"], encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
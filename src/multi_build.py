@@ -0,0 +1,125 @@
+"""Build de plusieurs catalogues (partenaires, enseignes, locales) en parallèle.
+
+Usage : python -m src.multi_build catalogs.yaml [--workers N] [--report multi_report.json]
+
+catalogs.yaml (chemins relatifs au fichier) :
+
+    qr_cache: .cache/qr                 # cache QR partagé (défaut : .cache/qr du repo)
+    catalogs:
+      - name: enseigne-a
+        data: partners/a/data           # les 4 CSV (+ ACV pour scores/)
+        base_url: https://exemple.org/a
+        out: builds/a/site_build
+        config: partners/a/config.yaml  # défaut : config.yaml du repo
+        cache: builds/a/.cache          # défaut : <out>/../.cache/<name>
+        archive: false                  # true : <out>/../<name>.tar.gz
+
+Un catalogue = un process du pool (les chemins et BASE_URL du build sont des
+globales de module, cf. `build_site.configure`), neuf pour chaque catalogue.
+Le cache QR est commun : adressé par URL et écrit atomiquement, une URL
+déjà encodée pour un catalogue ne l'est pas de nouveau pour un autre.
+Durées et compteurs par catalogue en fin de build (et dans `--report`) ;
+un catalogue en échec n'interrompt pas les autres.
+"""
+import argparse, io, json, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from pathlib import Path
+
+import yaml
+
+import src.build_site as B
+
+REQUIRED = ["name", "data", "base_url", "out"]
+
+def load_specs(path: Path) -> dict:
+    """Définitions normalisées : chemins absolus, défauts appliqués, noms et sorties uniques."""
+    path = Path(path)
+    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    here = path.resolve().parent
+    specs = []
+    for i, c in enumerate(raw.get("catalogs") or []):
+        missing = [k for k in REQUIRED if not c.get(k)]
+        if missing:
+            raise ValueError(f"catalogue #{i + 1}: clés manquantes {missing}")
+        out = here / c["out"]
+        specs.append({
+            "name": str(c["name"]),
+            "data": here / c["data"],
+            "base_url": str(c["base_url"]),
+            "out": out,
+            "config": here / c["config"] if c.get("config") else None,
+            "cache": here / c["cache"] if c.get("cache") else out.parent / ".cache" / str(c["name"]),
+            "archive": out.parent / f"{c['name']}.tar.gz" if c.get("archive") else None,
+        })
+    for key in ("name", "out", "cache"):
+        values = [str(s[key]) for s in specs]
+        dup = sorted({v for v in values if values.count(v) > 1})
+        if dup:
+            raise ValueError(f"{key} en double : {dup}")
+    qr_cache = here / raw["qr_cache"] if raw.get("qr_cache") else B.CACHE_DIR / "qr"
+    return {"catalogs": specs, "qr_cache": qr_cache}
+
+def build_one(spec: dict, qr_cache: Path, qr_workers: int = 1) -> dict:
+    """Build d'un catalogue (dans un process du pool) ; sortie console capturée."""
+    t0 = time.perf_counter()
+    log = io.StringIO()
+    result = {"name": spec["name"], "out": str(spec["out"])}
+    try:
+        with redirect_stdout(log):
+            B.configure(spec["out"], spec["data"], spec["base_url"], spec["cache"],
+                        config=spec["config"], qr_cache=qr_cache, archive=spec["archive"])
+            B.main(qr_workers=qr_workers, archive=spec["archive"] is not None)
+        report = json.loads((Path(spec["out"]) / "build_report.json").read_text(encoding="utf-8"))
+        result.update(ok=True, stages={s["name"]: s["seconds"] for s in report["stages"]},
+                      counters=report["counters"])
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}")
+    result.update(seconds=round(time.perf_counter() - t0, 3), log=log.getvalue())
+    return result
+
+def build_all(specs: list, qr_cache: Path, workers: int = None) -> list:
+    """Catalogues construits en parallèle ; résultats dans l'ordre de `specs`."""
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, len(specs) or 1))
+    # Le pool de catalogues occupe déjà les cœurs : QR encodés dans le process du catalogue
+    qr_workers = max(1, cpus // workers)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = {pool.submit(build_one, spec, qr_cache, qr_workers): spec["name"] for spec in specs}
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+    return [results[spec["name"]] for spec in specs]
+
+def format_results(results: list, wall: float) -> str:
+    lines = [f"{'catalogue':<20}{'statut':>8}{'durée':>9}{'pages':>8}{'QR encodés':>12}{'QR en cache':>13}"]
+    for r in results:
+        c = r.get("counters", {})
+        lines.append(f"{r['name']:<20}{'ok' if r['ok'] else 'ÉCHEC':>8}{r['seconds']:>8.2f}s"
+                     f"{c.get('pages_rendered', 0):>8}{c.get('qr_encoded', 0):>12}{c.get('qr_from_cache', 0):>13}")
+        if not r["ok"]:
+            lines.append(f"  {r['error']}")
+    total = sum(r["seconds"] for r in results)
+    lines.append(f"{len(results)} catalogues en {wall:.2f}s (somme des builds : {total:.2f}s)")
+    return "\n".join(lines)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build de plusieurs catalogues en parallèle")
+    ap.add_argument("catalogs", type=Path, help="YAML des catalogues (data, base_url, out, config...)")
+    ap.add_argument("--workers", type=int, default=None, help="catalogues construits en même temps (défaut : cœurs)")
+    ap.add_argument("--report", type=Path, help="durées et compteurs par catalogue (JSON)")
+    args = ap.parse_args(argv)
+
+    defs = load_specs(args.catalogs)
+    t0 = time.perf_counter()
+    results = build_all(defs["catalogs"], defs["qr_cache"], args.workers)
+    wall = time.perf_counter() - t0
+    print(format_results(results, wall))
+    if args.report:
+        args.report.write_text(json.dumps({"seconds": round(wall, 3), "catalogs": results},
+                                          ensure_ascii=False, indent=2), encoding="utf-8")
+    if not all(r["ok"] for r in results):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Portage Python, vectorisé, du score multicritère de `src/score/compute.js`.
+
+Même modèle que `computeScore` (impacts ACV, étapes de transport, facteur de
+saisonnalité, normes par catégorie, bonus fournisseur), calculé pour tout le
+catalogue et pour les 12 mois d'un coup. Le build en tire des shards JSON
+(`scores/<suffixe du GTIN>.json`) : les pages produit / comparer / panier
+chargent un petit record précalculé au lieu de 5 CSV.
+"""
+import json, math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import src.output as O
+
+CRITERIA = ["ghg", "water", "land", "biodiversity", "pm", "eutro"]
+MONTHS = list(range(1, 13))
+
+# defaultWeights() de src/score/weights.js
+DEFAULT_WEIGHTS = {"ghg": 0.4, "water": 0.2, "land": 0.15, "biodiversity": 0.15, "pm": 0.05, "eutro": 0.05}
+
+# defaultNorms de src/score/compute.js
+DEFAULT_NORMS = {
+    "default": {"ghg": (0.2, 15), "water": (5, 4000), "land": (0.1, 20), "biodiversity": (0.05, 5),
+                "pm": (0.01, 0.5), "eutro": (0.01, 0.5)},
+    "dairy": {"ghg": (0.2, 5), "water": (5, 2000), "land": (0.05, 10), "biodiversity": (0.02, 3),
+              "pm": (0.005, 0.2), "eutro": (0.005, 0.3)},
+}
+
+# Lettres de compute.js (indépendantes des grade_bands de config.yaml)
+LETTERS = [("A", 90), ("B", 75), ("C", 60), ("D", 45)]
+
+def js_round(x):
+    """Math.round : arrondi à l'entier, demi vers +∞."""
+    return np.floor(np.asarray(x, dtype=float) + 0.5)
+
+def minmax_norm(x, vmin, vmax):
+    """minmaxNorm : 0–100, impact faible = note haute ; 50 si min == max."""
+    x, vmin, vmax = (np.asarray(v, dtype=float) for v in (x, vmin, vmax))
+    span = vmax - vmin
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v = (x - vmin) / np.where(span == 0, 1, span)
+    return np.where(span == 0, 50, js_round(np.clip(1 - v, 0, 1) * 100))
+
+def letters(score):
+    out = np.full(np.shape(score), "E", dtype=object)
+    for letter, cut in reversed(LETTERS):
+        out[np.asarray(score) >= cut] = letter
+    return out
+
+def season_factors(categories: pd.Series, season: pd.DataFrame) -> np.ndarray:
+    """seasonFactor pour chaque produit et chaque mois : tableau (n, 12), 1 par défaut."""
+    s = season.assign(
+        category=season["category"].astype(str).str.lower(),
+        month=pd.to_numeric(season["month"], errors="coerce"),
+        factor=pd.to_numeric(season["factor"], errors="coerce"),
+    ).dropna(subset=["month"])
+    # compute.js prend la première ligne qui correspond
+    s = s.drop_duplicates(subset=["category", "month"], keep="first")
+    s["factor"] = s["factor"].where(np.isfinite(s["factor"]) & (s["factor"] > 0), 1.0).clip(0.1, 1.0)
+    table = s.pivot(index="category", columns="month", values="factor").reindex(columns=MONTHS)
+    cats = categories.fillna("").astype(str).str.lower()
+    return table.reindex(cats).fillna(1.0).to_numpy(dtype=float)
+
+def supplier_bonus(supplier_ids: pd.Series, suppliers: pd.DataFrame) -> np.ndarray:
+    """Bonus socio-éthique : +3 AB/BIO, +2 FAIR/EQ, +2 agroecology."""
+    sup = suppliers.drop_duplicates(subset=["id"]).set_index("id")
+    certs = sup["certs"].fillna("").astype(str).str.upper()
+    practices = sup["practices"].fillna("").astype(str).str.lower()
+    adj = (3 * (certs.str.contains("AB") | certs.str.contains("BIO"))
+           + 2 * (certs.str.contains("FAIR") | certs.str.contains("EQ"))
+           + 2 * practices.str.contains("agroecology"))
+    return adj.reindex(supplier_ids.astype(str)).fillna(0).to_numpy(dtype=int)
+
+def precompute(products, lca, season, transport, suppliers, weights=None, norms=None):
+    """Scores multicritères de tous les produits pour les 12 mois.
+
+    Renvoie un dict de tableaux NumPy alignés sur `products` : `has_lca`, impacts
+    bruts (`ghg`, `water`, ...), `transport` (kgCO₂e), `sf` (n, 12), notes
+    normalisées `n_<critère>` ((n, 12) pour ghg, (n,) sinon), `adj`, `score` (n, 12).
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    norms = norms or DEFAULT_NORMS
+    n = len(products)
+
+    refs = products["lcaRefId"].astype(str)
+    has_lca = refs.isin(lca["ref"]).to_numpy()
+    impacts = lca.drop_duplicates(subset=["ref"], keep="last").set_index("ref").reindex(refs)
+    # Number(x || 0) : valeur absente ou non numérique -> 0
+    raw = {k: pd.to_numeric(impacts[k], errors="coerce").fillna(0).to_numpy(dtype=float) for k in CRITERIA}
+
+    legs = transport.assign(co2=pd.to_numeric(transport["km"], errors="coerce").fillna(0)
+                            * pd.to_numeric(transport["emissionFactor"], errors="coerce").fillna(0))
+    t_add = legs.groupby(legs["gtin"].astype(str))["co2"].sum()
+    t_add = t_add.reindex(products["gtin"].astype(str)).fillna(0).to_numpy(dtype=float)
+
+    sf = season_factors(products["category"], season)
+    ghg = (raw["ghg"] + t_add)[:, None] / sf                       # (n, 12)
+
+    cat = products["category"].fillna("").astype(str).replace("", "General").str.lower()
+    cat = cat.where(cat.isin(list(norms)), "default").to_numpy()
+    bounds = {k: (np.array([norms[c][k][0] for c in cat], dtype=float).reshape(n),
+                  np.array([norms[c][k][1] for c in cat], dtype=float).reshape(n)) for k in CRITERIA}
+
+    out = {"has_lca": has_lca, "transport": t_add, "sf": sf, **raw}
+    total = np.zeros((n, 12))
+    for k in CRITERIA:
+        vmin, vmax = bounds[k]
+        if k == "ghg":
+            nk = minmax_norm(ghg, vmin[:, None], vmax[:, None])
+        else:
+            nk = minmax_norm(raw[k], vmin, vmax)
+        out[f"n_{k}"] = nk.astype(int)
+        contrib = js_round(nk * float(weights.get(k, 0)))
+        total += contrib if contrib.ndim == 2 else contrib[:, None]
+
+    adj = supplier_bonus(products["supplierId"], suppliers)
+    score = np.clip(js_round(total + adj[:, None]), 0, 100).astype(int)
+    out["adj"] = adj
+    out["score"] = np.where(has_lca[:, None], score, 0)
+    return out
+
+# Les 5 CSV lus jusqu'ici par les pages JS, dans l'ordre de precompute()
+INPUTS = ["products.csv", "examples/lca.csv", "seasonality.csv", "examples/transport.csv", "suppliers.csv"]
+
+def load_inputs(data_dir: Path):
+    """INPUTS lus en texte (GTIN et ids gardés tels quels, zéros de tête compris)."""
+    return [pd.read_csv(data_dir / p, dtype=str, keep_default_na=False, na_values=[""]) for p in INPUTS]
+
+def suffix_len(n: int, target: int = 500) -> int:
+    """Longueur du suffixe de GTIN servant de clé de shard (~target produits par shard)."""
+    return min(4, max(1, math.ceil(math.log10(max(n, 1) / target)) if n > target else 1))
+
+def records(products, res):
+    """Record compact par produit, dans l'ordre de `products`."""
+    # Conversions NumPy -> listes Python faites une fois pour tout le catalogue
+    cols = {k: res[k].tolist() for k in CRITERIA}
+    n = {k: res[f"n_{k}"].tolist() for k in CRITERIA}
+    transport = res["transport"].round(6).tolist()
+    sf = res["sf"].round(4).tolist()
+    adj = res["adj"].tolist()
+    score = res["score"].tolist()
+    grades = letters(res["score"]).sum(axis=1).tolist()
+    keys = ["gtin", "name", "category", "originCountry", "unit"]
+    info = zip(*(products[k].astype(object).where(products[k].notna(), None).tolist() for k in keys))
+    for i, (row, has_lca) in enumerate(zip(info, res["has_lca"].tolist())):
+        rec = dict(zip(keys, row))
+        if not has_lca:
+            rec.update(score=[0] * 12, letter="E" * 12, note="No LCA")
+        else:
+            rec.update(impacts={k: cols[k][i] for k in CRITERIA}, transport=transport[i], sf=sf[i],
+                       n={k: n[k][i] for k in CRITERIA}, adj=adj[i], score=score[i], letter=grades[i])
+        yield rec
+
+def write_shards(out: Path, products, res, weights=None, write=None, remove=None):
+    """`scores/meta.json` + `scores/<suffixe>.json` ({gtin: record}) ; renvoie le nombre de shards."""
+    write, remove = write or O.write_file, remove or O.remove_path
+    dest = out / "scores"
+    k = suffix_len(len(products))
+    shards = {}
+    for rec in records(products, res):
+        shards.setdefault(str(rec["gtin"])[-k:], {})[rec["gtin"]] = rec
+    for key, shard in shards.items():
+        write(dest / f"{key}.json", json.dumps(shard, ensure_ascii=False, separators=(",", ":")))
+    meta = {"suffix_len": k, "months": MONTHS, "criteria": CRITERIA,
+            "weights": weights or DEFAULT_WEIGHTS, "shards": sorted(shards)}
+    write(dest / "meta.json", json.dumps(meta, separators=(",", ":")))
+    for old in dest.glob("*.json"):
+        if old.stem != "meta" and old.stem not in shards:
+            remove(old)
+    return len(shards)
@@ -0,0 +1,211 @@
+"""Écriture de site_build : groupée, atomique, et seulement si le contenu change.
+
+    with OutputWriter(OUT, CACHE_DIR / "output_hashes.json") as out:
+        out.write(out.root / "p" / slug / "index.html", html)
+        out.remove(out.root / "p" / old_slug)
+        ...
+        out.commit()          # fichiers du staging déplacés dans OUT
+
+`root` est OUT lui-même : les chemins du build y sont construits et les
+lectures (fiche encore présente ? fichiers orphelins ?) voient le build en
+ligne, que rien ne modifie avant `commit()`. Seuls les fichiers dont le
+contenu change sont écrits, dans un dossier de staging
+(`.site_build.staging`) : un fichier dont le sha256 est celui du build
+précédent (même taille, même mtime) n'est ni réécrit ni copié. Les
+écritures passent par un pool de threads ; les suppressions (`remove`)
+sont seulement notées.
+
+`commit()` note les suppressions dans un journal, les applique, puis
+déplace (rename) les fichiers du staging dans OUT : un travail
+proportionnel au changement, pas à la taille du site. Un build interrompu
+avant `commit()` laisse OUT intact ; interrompu pendant, le journal est
+rejoué au build suivant (`recover`). Premier build : le staging devient OUT.
+"""
+import os, io, json, gzip, hashlib, shutil, tarfile, threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+# Écritures en vol au plus (borne la mémoire des contenus en attente)
+MAX_PENDING = 256
+
+def default_workers() -> int:
+    """Threads d'écriture : variable OUTPUT_WORKERS, sinon 2 × cœurs (max 16)."""
+    env = os.environ.get("OUTPUT_WORKERS")
+    return max(1, int(env)) if env else min(16, 2 * (os.cpu_count() or 1))
+
+def write_file(path: Path, data) -> int:
+    """Écriture atomique (temporaire + rename), dossiers parents compris."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+    return len(data)
+
+def remove_path(path: Path):
+    """Supprime un fichier ou un dossier (absent : rien)."""
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+class OutputWriter:
+    def __init__(self, out: Path, index_path: Path, workers=None):
+        self.out = self.root = Path(out)
+        self.index_path = Path(index_path)
+        self.staging = self.out.parent / f".{self.out.name}.staging"
+        self.journal = self.out.parent / f".{self.out.name}.commit.json"
+        self.old = self.out.parent / f".{self.out.name}.old"
+        self.workers = workers or default_workers()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._removed = set()
+        self._committed = False
+        self.pool = None
+
+    def start(self):
+        """Reprise d'un commit interrompu, staging vide, index des hash du build précédent."""
+        self.recover()
+        shutil.rmtree(self.staging, ignore_errors=True)     # staging d'un build interrompu
+        self.staging.mkdir(parents=True)
+        try:
+            self.previous = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self.previous = {}
+        self.current = {}
+        self.pool = ThreadPoolExecutor(self.workers)
+        return self
+
+    def __enter__(self):
+        return self if self.pool else self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.pool.shutdown(wait=True)
+        # Erreur pendant commit() : staging gardé, le journal sera rejoué
+        if not self._committed and not self.journal.exists():
+            shutil.rmtree(self.staging, ignore_errors=True)
+        return False
+
+    def recover(self):
+        """Commit interrompu : journal rejoué ; ancien format (renommage de tout OUT) : OUT revient."""
+        if self.journal.exists():
+            self._apply(json.loads(self.journal.read_text(encoding="utf-8"))["remove"])
+        if not self.out.exists() and self.old.exists():
+            self.old.rename(self.out)
+        shutil.rmtree(self.old, ignore_errors=True)
+
+    def _apply(self, removed):
+        """Suppressions (journal d'abord marqué vide : à rejouer, elles effaceraient les fichiers déjà
+        déplacés) puis déplacement des fichiers du staging."""
+        for rel in removed:
+            remove_path(self.out / rel)
+        write_file(self.journal, json.dumps({"remove": []}))
+        if not self.out.exists():
+            self.staging.rename(self.out)
+        else:
+            for dirpath, _, files in os.walk(self.staging):
+                for name in files:
+                    src = Path(dirpath) / name
+                    dest = self.out / src.relative_to(self.staging)
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(src, dest)
+            shutil.rmtree(self.staging, ignore_errors=True)
+        self.journal.unlink()
+
+    def _write(self, path: Path, data: bytes):
+        rel = path.relative_to(self.root).as_posix()
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            st = None
+        # [sha256, taille, mtime] : un fichier modifié hors build (ou un index en
+        # retard après un crash) n'a plus le même mtime et est réécrit
+        if st and self.previous.get(rel) == [digest, len(data), st.st_mtime_ns] and st.st_size == len(data):
+            kind = "skipped"
+        else:
+            staged = self.staging / rel
+            write_file(staged, data)
+            st = staged.stat()        # rename au commit : même inode, même mtime
+            kind = "written"
+        with self._lock:
+            self.current[rel] = [digest, len(data), st.st_mtime_ns]
+            self.stats[f"files_{kind}"] += 1
+            self.stats[f"bytes_{kind}"] += len(data)
+
+    def write(self, path, data):
+        """Écriture asynchrone de `data` (str ou bytes) ; `path` absolu sous root ou relatif."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path = self.root / path
+        if len(self._pending) >= MAX_PENDING:
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                f.result()       # remonte une erreur d'écriture au plus tôt
+        self._pending.add(self.pool.submit(self._write, path, data))
+
+    def copy(self, src, dest):
+        self.write(dest, Path(src).read_bytes())
+
+    def remove(self, path):
+        """Fichier ou dossier de OUT à supprimer au commit (avant les déplacements)."""
+        self._removed.add((self.root / path).relative_to(self.root).as_posix())
+
+    def flush(self):
+        """Attend toutes les écritures en cours."""
+        done, _ = wait(self._pending)
+        self._pending = set()
+        for f in done:
+            f.result()
+
+    def _resolve_removed(self):
+        """Suppressions sans effacer un fichier de ce build (non réécrit car inchangé) :
+        un dossier qui en contient est remplacé par ses autres fichiers."""
+        if not self._removed:
+            return set()
+        kept = set(self.current)
+        kept_dirs = {rel.rsplit("/", i)[0] for rel in kept for i in range(1, rel.count("/") + 1)}
+        out = set()
+        for rel in self._removed - kept:
+            if rel not in kept_dirs:
+                out.add(rel)
+                continue
+            for path in (self.out / rel).rglob("*"):
+                sub = path.relative_to(self.out).as_posix()
+                if path.is_file() and sub not in kept:
+                    out.add(sub)
+        return out
+
+    def commit(self):
+        """Écritures terminées, suppressions et déplacements dans OUT, puis index des hash."""
+        self.flush()
+        removed = sorted(self._resolve_removed())
+        write_file(self.journal, json.dumps({"remove": removed}))
+        self._apply(removed)
+        self._committed = True
+        # Entrées des fichiers supprimés retirées (dossiers : par préfixe), sans stat de l'arbre
+        files, dirs = set(removed), tuple(f"{rel}/" for rel in removed)
+        index = {rel: h for rel, h in self.previous.items()
+                 if rel not in self.current and rel not in files and not rel.startswith(dirs)}
+        index.update(self.current)
+        write_file(self.index_path, json.dumps(index, separators=(",", ":")))
+
+def archive(src: Path, dest: Path, exclude=()) -> int:
+    """Archive tar.gz reproductible de `src` (ordre trié, dates et propriétaires neutres)."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.tmp")
+    with open(tmp, "wb") as raw, gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as gz, \
+            tarfile.open(fileobj=gz, mode="w") as tar:
+        for path in sorted(p for p in src.rglob("*") if p.is_file()):
+            rel = path.relative_to(src).as_posix()
+            if rel in exclude:
+                continue
+            data = path.read_bytes()
+            info = tarfile.TarInfo(rel)
+            info.size, info.mode = len(data), 0o644
+            tar.addfile(info, io.BytesIO(data))
+    tmp.replace(dest)
+    return dest.stat().st_size
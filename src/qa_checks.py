@@ -1,61 +1,195 @@
+"""QA de la table jointe selon `qa_rules.yaml`, toutes les règles en une passe.
+
+Les règles sont compilées une fois :
+- `no_missing_columns`, valeurs manquantes : colonnes requises ;
+- `max_values`, `ranges` : une matrice de bornes [min, max] par colonne,
+  comparée d'un coup à la matrice des valeurs du bloc (lignes × règles) ;
+- `references` : colonne -> table de référence (`supplierId` dans
+  suppliers.csv, `lcaRefId` dans la table ACV), ids chargés une fois.
+
+La table est parcourue par blocs de lignes (mémoire des masques bornée) et
+le rapport donne, pour chaque règle, le nombre de lignes en échec et
+quelques exemples : un fichier partenaire se corrige en un seul aller-retour.
+Seuls ces compteurs et exemples sont gardés d'un bloc à l'autre : avec
+`--chunksize N`, products.csv est lu en flux (validation bornée puis
+jointure bloc par bloc) et la table jointe n'est jamais chargée entière.
+
+Usage : python -m src.qa_checks [--report qa_report.json] [--chunksize N]
+"""
+from itertools import chain
 from pathlib import Path
+import argparse, json, yaml, sys
+
+import numpy as np
 import pandas as pd
-import yaml, sys
+
+import src.dataset as D
+import src.validate_data as V
 
 ROOT = Path(__file__).resolve().parents[1]
-DATA = ROOT / "data"
 CFG = ROOT / "qa_rules.yaml"
 
+# Colonnes requises, sans valeur manquante tolérée
+REQUIRED = ["id", "name", "base_kgco2e", "distance_km", "biodiversity_risk"]
+DEFAULT_CHUNKSIZE = 100_000
+# Exemples gardés par règle
+SAMPLES = 5
+
 def fail(msg):
     print(f"QA FAIL: {msg}")
     sys.exit(1)
 
-def main():
-    cfg = yaml.safe_load(CFG.read_text(encoding="utf-8"))
-    # charger tables
-    try:
-        products = pd.read_csv(DATA / "products.csv")
-        agr = pd.read_csv(DATA / "agribalyse.csv")
-        dist = pd.read_csv(DATA / "distances.csv")
-        biod = pd.read_csv(DATA / "biodiv.csv")
-    except FileNotFoundError as e:
-        fail(str(e))
-
-    # jointure minimale pour contrôles transverses
-    df = (products.merge(agr, on="id", how="left")
-                 .merge(dist, on="id", how="left")
-                 .merge(biod, on="id", how="left"))
-
-    # Renommage cohérent avec le build
-    if "kgco2e_unit" in df.columns:
-        df = df.rename(columns={"kgco2e_unit":"base_kgco2e"})
-
-    # colonnes manquantes
+def load_rules(path: Path = None) -> dict:
+    return yaml.safe_load((path or CFG).read_text(encoding="utf-8")) or {}
+
+def _reference_ids(spec: dict) -> pd.Index:
+    col = spec.get("column", "id")
+    ref = pd.read_csv(V.DATA_DIR / spec["table"], usecols=[col], dtype=str)
+    return pd.Index(ref[col].dropna().str.strip().unique())
+
+def compile_rules(cfg: dict, columns) -> dict:
+    """Règles prêtes à appliquer sur les colonnes `columns` de la table.
+
+    Une règle `max_values` / `ranges` sur une colonne absente est ignorée,
+    sauf avec `strict_columns: true` (échec structurel). Une référence dont
+    la colonne ou la table manque est toujours un échec structurel. Les
+    autres règles s'appliquent quand même.
+    """
+    columns = set(columns)
+    structural = []
     if cfg.get("no_missing_columns", False):
-        required = ["id","name","base_kgco2e","distance_km","biodiversity_risk"]
-        missing = [c for c in required if c not in df.columns]
+        missing = [c for c in REQUIRED if c not in columns]
         if missing:
-            fail(f"Colonnes manquantes: {missing}")
-
-    # valeurs manquantes
-    if df[["id","name","base_kgco2e","distance_km","biodiversity_risk"]].isna().any().any():
-        bad = df[df[["base_kgco2e","distance_km","biodiversity_risk"]].isna().any(axis=1)]
-        fail(f"Valeurs manquantes détectées sur {len(bad)} lignes (ex: {bad.head(3).to_dict(orient='records')})")
-
-    # max
-    for col, mx in (cfg.get("max_values") or {}).items():
-        if col in df.columns and (df[col] > mx).any():
-            top = df[df[col] > mx][["id","name",col]].head(5).to_dict(orient="records")
-            fail(f"{col} > {mx} détecté (exemples: {top})")
-
-    # ranges
-    ranges = cfg.get("ranges") or {}
-    for col, (mn, mx) in ranges.items():
-        if col in df.columns and ((df[col] < mn) | (df[col] > mx)).any():
-            bad = df[(df[col] < mn) | (df[col] > mx)][["id","name",col]].head(5).to_dict(orient="records")
-            fail(f"{col} hors [{mn},{mx}] détecté (ex: {bad})")
-
-    print("QA OK: règles respectées")
+            structural.append({"rule": "no_missing_columns", "column": None,
+                               "message": f"colonnes manquantes {missing}"})
+
+    missing = [(f"missing_values.{c}", c) for c in REQUIRED if c in columns]
+    bounds = []
+    limits = [(f"max_values.{c}", c, -np.inf, float(mx)) for c, mx in (cfg.get("max_values") or {}).items()]
+    limits += [(f"ranges.{c}", c, float(mn), float(mx)) for c, (mn, mx) in (cfg.get("ranges") or {}).items()]
+    for name, col, lo, hi in limits:
+        if col in columns:
+            bounds.append((name, col, lo, hi))
+        elif cfg.get("strict_columns", False) and (not cfg.get("no_missing_columns", False)
+                                                   or col not in REQUIRED):
+            structural.append({"rule": name, "column": col, "message": "colonne absente"})
+
+    references = []
+    for col, spec in (cfg.get("references") or {}).items():
+        name = f"references.{col}"
+        if col not in columns:
+            structural.append({"rule": name, "column": col, "message": "colonne absente"})
+            continue
+        try:
+            references.append((name, col, _reference_ids(spec)))
+        except (FileNotFoundError, ValueError) as e:
+            structural.append({"rule": name, "column": col,
+                               "message": f"table de référence illisible ({spec.get('table')}: {e})"})
+    return {"missing": missing, "bounds": bounds, "references": references, "structural": structural}
+
+def _violations(chunk: pd.DataFrame, rules: dict) -> np.ndarray:
+    """Masque (lignes × règles) : manquants, bornes puis références, dans l'ordre de `rules`."""
+    masks = []
+    if rules["missing"]:
+        masks.append(chunk[[col for _, col in rules["missing"]]].isna().to_numpy())
+    bounds = rules["bounds"]
+    if bounds:
+        # Toutes les règles de bornes en une comparaison (colonnes répétées si besoin) ;
+        # une valeur manquante ne viole aucune borne (règle missing_values)
+        x = chunk[[col for _, col, _, _ in bounds]].to_numpy(dtype=float, na_value=np.nan)
+        lo = np.array([b[2] for b in bounds])
+        hi = np.array([b[3] for b in bounds])
+        with np.errstate(invalid="ignore"):
+            masks.append((x < lo) | (x > hi))
+    for _, col, ids in rules["references"]:
+        values = chunk[col]
+        present = values.notna().to_numpy()
+        known = ids.get_indexer(values.astype(str)) >= 0
+        # Espaces parasites : seules les valeurs inconnues telles quelles sont nettoyées
+        retry = present & ~known
+        if retry.any():
+            known[retry] = ids.get_indexer(values[retry].astype(str).str.strip()) >= 0
+        masks.append((present & ~known)[:, None])
+    return np.hstack(masks) if masks else np.zeros((len(chunk), 0), dtype=bool)
+
+def _blocks(df: pd.DataFrame, chunksize: int):
+    yield from (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+    if df.empty:
+        yield df                # colonnes seules : règles structurelles
+
+def check(data, cfg: dict = None, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+    """Rapport complet : {ok, rows, chunks, violations: [{rule, column, rows, samples}]}.
+
+    `data` : table jointe (parcourue par blocs de `chunksize` lignes) ou itérable
+    de blocs de mêmes colonnes (ex. `D.iter_joined`), consommé une fois.
+    """
+    cfg = load_rules() if cfg is None else cfg
+    blocks = _blocks(data, chunksize) if isinstance(data, pd.DataFrame) else iter(data)
+    first = next(blocks, None)
+    columns = first.columns if first is not None else []
+    rules = compile_rules(cfg, columns)
+    names = [(name, col) for name, col, *_ in rules["missing"] + rules["bounds"] + rules["references"]]
+    counts = np.zeros(len(names), dtype=np.int64)
+    samples = [[] for _ in names]
+    shown = [c for c in ("id", "name") if c in columns]
+
+    rows = chunks = 0
+    for chunk in chain([first] if first is not None else [], blocks):
+        bad = _violations(chunk, rules)
+        counts += bad.sum(axis=0)
+        rows += len(chunk)
+        chunks += 1
+        # Exemples : uniquement pour les règles en échec dont la liste n'est pas pleine
+        for j in np.flatnonzero(bad.any(axis=0)):
+            need = SAMPLES - len(samples[j])
+            if need > 0:
+                idx = np.flatnonzero(bad[:, j])[:need]
+                col = names[j][1]
+                cols = shown + ([col] if col not in shown else [])
+                samples[j] += json.loads(chunk.iloc[idx][cols].to_json(orient="records", force_ascii=False))
+
+    violations = list(rules["structural"])
+    violations += [{"rule": name, "column": col, "rows": int(n), "samples": samples[j]}
+                   for j, ((name, col), n) in enumerate(zip(names, counts)) if n]
+    return {"ok": not violations, "rows": rows, "chunks": chunks,
+            "rules": len(names) + len(rules["structural"]), "violations": violations}
+
+def format_report(report: dict) -> str:
+    if report["ok"]:
+        return f"QA OK: {report['rules']} règles respectées ({report['rows']} lignes)"
+    lines = [f"QA FAIL: {len(report['violations'])} règle(s) en échec sur {report['rules']} "
+             f"({report['rows']} lignes)"]
+    for v in report["violations"]:
+        if "message" in v:
+            lines.append(f"  {v['rule']:<32} {v['message']}")
+        else:
+            lines.append(f"  {v['rule']:<32} {v['rows']} ligne(s)  ex: {v['samples']}")
+    return "\n".join(lines)
+
+def main(argv=None, df=None):
+    """QA sur la table jointe ; `df` déjà chargée (pipeline `python -m src all`) ou lue ici."""
+    ap = argparse.ArgumentParser(description="QA des données jointes (qa_rules.yaml)")
+    ap.add_argument("--report", help="écrit le rapport complet (JSON) dans ce fichier")
+    ap.add_argument("--chunksize", type=int, default=None,
+                    help="lit products.csv en flux par blocs de N lignes (défaut : table jointe en mémoire)")
+    args = ap.parse_args(argv)
+    # table jointe (même jointure que le build, snapshot partagé), ou en flux
+    if df is None:
+        try:
+            if args.chunksize:
+                V.scan_all(args.chunksize)
+                df = D.iter_joined(args.chunksize)
+            else:
+                df = D.load_joined()
+        except (FileNotFoundError, ValueError) as e:
+            fail(str(e))
+
+    report = check(df, load_rules(), args.chunksize or DEFAULT_CHUNKSIZE)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(format_report(report))
+    if not report["ok"]:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,58 @@
+"""Étape QR du build : encodage parallèle + cache adressé par contenu.
+
+Chaque URL distincte n'est encodée qu'une fois : le PNG est rangé dans le
+cache sous le sha256 de l'URL, puis copié vers `qr/<slug>.png`. Les URLs
+absentes du cache sont encodées dans un pool de processus.
+"""
+import os, hashlib, shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import qrcode
+
+def make_qr(url, dest):
+    img = qrcode.make(url)
+    img.save(dest)
+
+def default_workers() -> int:
+    """Nombre de workers : variable QR_WORKERS, sinon nombre de cœurs."""
+    env = os.environ.get("QR_WORKERS")
+    return max(1, int(env)) if env else (os.cpu_count() or 1)
+
+def cache_path(cache_dir: Path, url: str) -> Path:
+    return cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.png"
+
+def _encode(job):
+    url, dest = job
+    tmp = Path(f"{dest}.{os.getpid()}.tmp")
+    make_qr(url, tmp)
+    tmp.replace(dest)   # écriture atomique : pas de PNG tronqué dans le cache
+    return url
+
+def encode_missing(urls, cache_dir: Path, workers=None) -> int:
+    """Encode dans le cache les URLs qui n'y sont pas encore ; renvoie leur nombre."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    for url in dict.fromkeys(urls):          # dédoublonne en gardant l'ordre
+        dest = cache_path(cache_dir, url)
+        if not dest.exists():
+            jobs.append((url, str(dest)))
+    workers = workers or default_workers()
+    if workers <= 1 or len(jobs) < 2:
+        for job in jobs:
+            _encode(job)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            for _ in pool.map(_encode, jobs, chunksize=max(1, len(jobs) // (workers * 4))):
+                pass
+    return len(jobs)
+
+def generate(jobs, cache_dir: Path, workers=None, copy=shutil.copyfile) -> dict:
+    """Produit les PNG demandés. `jobs` : liste de (url, chemin de destination)."""
+    encoded = encode_missing([url for url, _ in jobs], cache_dir, workers)
+    written = 0
+    for url, dest in jobs:
+        src = cache_path(cache_dir, url)
+        copy(src, dest)
+        written += src.stat().st_size
+    return {"requested": len(jobs), "encoded": encoded, "from_cache": len(jobs) - encoded, "bytes": written}
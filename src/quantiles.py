@@ -0,0 +1,160 @@
+"""Quantiles approchés fusionnables (sketch KLL) pour les bornes automatiques.
+
+    sk = KLLSketch(eps=0.005)
+    for chunk in blocs:            # flux, ou un sketch par worker...
+        sk.update(chunk)
+    sk.merge(autre_sketch)         # ... fusionnés ensuite
+    lo, hi = sk.quantiles([0.05, 0.95])
+
+Un niveau h contient des valeurs de poids 2**h ; un niveau plein est trié
+puis une valeur sur deux (décalage tiré au sort) monte au niveau suivant.
+L'erreur de rang normalisée reste de l'ordre de `eps` (k = 1.65 / eps
+valeurs au niveau le plus haut), pour une taille en O(k). Tant qu'aucune
+compaction n'a eu lieu, le sketch est exact et `quantiles` donne le même
+résultat que `Series.quantile` (interpolation linéaire).
+
+Mise à jour incrémentale entre deux builds (`incremental_sketch`) : les
+lignes sont réparties en `buckets` paquets selon le hash de leur id ; un
+paquet dont l'empreinte (ids + valeurs) n'a pas changé réutilise son
+sketch sauvegardé, seuls les paquets modifiés sont re-sketchés, puis tout
+est fusionné. Les suppressions et modifications restent exactes (un
+sketch ne sait pas « retirer » une valeur, un paquet se reconstruit).
+"""
+import math, pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_EPS = 0.005
+DEFAULT_BUCKETS = 64
+# Décroissance des capacités d'un niveau au suivant (valeur usuelle de KLL)
+DECAY = 2 / 3
+# À incrémenter si le format des sketches change (invalide l'état sauvegardé)
+STATE_VERSION = 1
+
+class KLLSketch:
+    def __init__(self, eps: float = DEFAULT_EPS, seed: int = 0):
+        self.eps = float(eps)
+        self.k = max(8, math.ceil(1.65 / self.eps))
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, h: int) -> int:
+        return max(2, math.ceil(self.k * DECAY ** (len(self.levels) - 1 - h)))
+
+    def _compress(self):
+        while True:
+            over = [h for h, lvl in enumerate(self.levels) if len(lvl) > self._capacity(h)]
+            if not over:
+                return
+            h = over[0]
+            if h + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            lvl = np.sort(self.levels[h])
+            # Nombre impair : la plus petite valeur reste au niveau h
+            odd = len(lvl) % 2
+            promoted = lvl[odd:][self._rng.integers(2)::2]
+            self.levels[h] = lvl[:odd]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+
+    def update(self, values) -> "KLLSketch":
+        """Ajoute un bloc de valeurs (NaN ignorés)."""
+        v = np.asarray(values, dtype=float).ravel()
+        v = v[~np.isnan(v)]
+        if len(v):
+            self.levels[0] = np.concatenate([self.levels[0], v])
+            self.n += len(v)
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fusionne `other` dans ce sketch (blocs, workers ou paquets d'un état sauvegardé)."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, lvl in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], lvl])
+        self.n += other.n
+        self._compress()
+        return self
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1 or not any(len(lvl) for lvl in self.levels[1:])
+
+    def quantiles(self, qs) -> list:
+        if not self.n:
+            raise ValueError("sketch vide")
+        if self.exact:
+            return [float(x) for x in np.quantile(self.levels[0], qs)]
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cum = values[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs, dtype=float) * cum[-1], side="left")
+        return [float(x) for x in values[np.minimum(idx, len(values) - 1)]]
+
+    def __len__(self):
+        return sum(len(lvl) for lvl in self.levels)
+
+def sketch_chunks(chunks, eps: float = DEFAULT_EPS) -> KLLSketch:
+    """Un sketch par bloc puis fusion : même chemin qu'une lecture en flux ou par workers."""
+    out = KLLSketch(eps)
+    for chunk in chunks:
+        out.merge(KLLSketch(eps).update(chunk))
+    return out
+
+def id_hashes(ids) -> np.ndarray:
+    """Hash 64 bits des ids (à calculer une fois pour plusieurs colonnes)."""
+    return pd.util.hash_array(pd.Series(ids).astype(str).to_numpy(dtype=object), categorize=False)
+
+def _buckets(id_hash: np.ndarray, values: np.ndarray, buckets: int):
+    """{paquet: (empreinte, lignes)} ; l'empreinte ne dépend pas de l'ordre des lignes."""
+    row_hash = id_hash * np.uint64(0x9E3779B97F4A7C15) ^ pd.util.hash_array(values)
+    bucket = (id_hash % np.uint64(buckets)).astype(np.int64)
+    order = np.argsort(bucket, kind="stable")
+    present, starts, counts = np.unique(bucket[order], return_index=True, return_counts=True)
+    sums = np.add.reduceat(row_hash[order], starts) if len(order) else np.empty(0, dtype=np.uint64)
+    return {int(b): ((int(s), int(c)), order[i:i + c])
+            for b, s, c, i in zip(present, sums, counts, starts)}
+
+def incremental_sketch(ids, values, state: dict, eps: float = DEFAULT_EPS,
+                       buckets: int = DEFAULT_BUCKETS):
+    """(sketch de toute la colonne, nouvel état, paquets re-sketchés).
+
+    `ids` : ids des lignes, ou leurs `id_hashes` ; `state` : {paquet: (empreinte, sketch)}
+    d'un build précédent (même eps / buckets).
+    """
+    values = np.asarray(values, dtype=float)
+    id_hash = ids if isinstance(ids, np.ndarray) and ids.dtype == np.uint64 else id_hashes(ids)
+    new_state, rebuilt = {}, 0
+    for b, (digest, rows) in _buckets(id_hash, values, buckets).items():
+        old = state.get(b)
+        if old is not None and old[0] == digest:
+            new_state[b] = old
+        else:
+            new_state[b] = (digest, KLLSketch(eps, seed=b).update(values[rows]))
+            rebuilt += 1
+    merged = KLLSketch(eps)
+    for b in sorted(new_state):
+        merged.merge(new_state[b][1])
+    return merged, new_state, rebuilt
+
+def load_state(path: Path, eps: float, buckets: int) -> dict:
+    """État sauvegardé ({colonne: {paquet: (empreinte, sketch)}}), vide s'il est absent ou incompatible."""
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return {}
+    if saved.get("key") != (STATE_VERSION, float(eps), int(buckets)):
+        return {}
+    return saved["columns"]
+
+def save_state(path: Path, columns: dict, eps: float, buckets: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump({"key": (STATE_VERSION, float(eps), int(buckets)), "columns": columns}, f)
+    tmp.replace(path)
@@ -0,0 +1,184 @@
+"""Rendu HTML multi-langue (FR + EN, extensible via LOCALES).
+
+Les templates sont « précompilés » une fois par build : tout ce qui ne dépend
+pas du produit (en-tête, liens d'assets, bloc sources, script de recherche)
+est substitué à la construction du `Renderer`, il ne reste par fiche qu'un
+`str.format_map` sur les champs du record. Le renderer compte les rendus et
+le temps passé par template (cf. `report()`).
+"""
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import src.catalog_index as CI
+
+# prefix : sous-dossier de la langue dans site_build ("" = racine)
+LOCALES = {
+    "fr": {
+        "prefix": "",
+        "site": "Éco-score",
+        "sheet_for": "Fiche éco-score pour",
+        "back": "← Retour",
+        "grade": "Note :",
+        "emissions": "Émissions (unité produit) :",
+        "distance": "Distance estimée :",
+        "biodiversity": "Risque biodiversité :",
+        "scan": "Scannez pour ouvrir cette fiche :",
+        "qr_alt": "QR code fiche",
+        "sources": "Sources & version",
+        "src_agribalyse": "Agribalyse :",
+        "src_distances": "Distances :",
+        "src_biodiversity": "Biodiversité :",
+        "method_version": "Version de la méthode :",
+        "build": "Build :",
+        "catalog_title": "Éco-score — Catalogue",
+        "catalog_h1": "Catalogue Éco-score",
+        "search": "Rechercher un produit...",
+        "th": ("Produit", "Note", "Score"),
+        "prev": "← Précédent",
+        "next": "Suivant →",
+    },
+    "en": {
+        "prefix": "en",
+        "site": "Eco-score",
+        "sheet_for": "Eco-score sheet for",
+        "back": "← Back",
+        "grade": "Grade:",
+        "emissions": "Emissions (per product unit):",
+        "distance": "Estimated distance:",
+        "biodiversity": "Biodiversity risk:",
+        "scan": "Scan to open this sheet:",
+        "qr_alt": "QR code for",
+        "sources": "Sources & version",
+        "src_agribalyse": "Agribalyse:",
+        "src_distances": "Distances:",
+        "src_biodiversity": "Biodiversity:",
+        "method_version": "Method version:",
+        "build": "Build:",
+        "catalog_title": "Eco-score — Catalog",
+        "catalog_h1": "Eco-score catalog",
+        "search": "Search a product...",
+        "th": ("Product", "Grade", "Score"),
+        "prev": "← Previous",
+        "next": "Next →",
+    },
+}
+
+def _lit(s) -> str:
+    """Texte invariant inséré dans un template format_map (accolades échappées)."""
+    return str(s).replace("{", "{{").replace("}", "}}")
+
+def locale_root(base, loc):
+    """Racine d'une langue : URL (base = BASE_URL) ou dossier (base = Path)."""
+    prefix = LOCALES[loc]["prefix"]
+    if isinstance(base, Path):
+        return base / prefix if prefix else base
+    return f"{base}/{prefix}" if prefix else base
+
+class Renderer:
+    def __init__(self, base_url, meta, locales=None):
+        self.base_url = base_url
+        self.locales = list(locales or LOCALES)
+        self.stats = defaultdict(lambda: [0, 0.0])    # template -> [rendus, secondes]
+        sources = meta.get("data_source", {})
+        self._product = {loc: self._compile_product(loc, meta, sources) for loc in self.locales}
+        self._row = {loc: self._compile_row(loc) for loc in self.locales}
+        self._index = {loc: self._compile_index(loc) for loc in self.locales}
+
+    # ---- compilation (une fois par build) ----------------------------------
+    def _compile_product(self, loc, meta, sources):
+        t, base = LOCALES[loc], _lit(self.base_url)
+        home = _lit(locale_root(self.base_url, loc))
+        return f"""<!doctype html>
+<html lang="{loc}"><head>
+<meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{{name}} — {_lit(t['site'])}</title>
+<meta name="description" content="{_lit(t['sheet_for'])} {{name}}">
+<link rel="stylesheet" href="{base}/assets/style.css">
+</head><body>
+<header><a href="{home}/">{_lit(t['back'])}</a></header>
+<main>
+  <h1>{{name}}</h1>
+  <p><strong>{_lit(t['grade'])}</strong> <span class="badge {{grade}}">{{grade}}</span> ({{score}}/100)</p>
+  <ul>
+    <li>{_lit(t['emissions'])} {{base_kgco2e}} kgCO₂e</li>
+    <li>{_lit(t['distance'])} {{distance_km}} km</li>
+    <li>{_lit(t['biodiversity'])} {{biodiversity_risk}}</li>
+  </ul>
+  <h2>QR code</h2>
+  <p>{_lit(t['scan'])}</p>
+  <img alt="{_lit(t['qr_alt'])} {{name}}" src="{base}/qr/{{slug}}.png" width="180">
+  <h3>{_lit(t['sources'])}</h3>
+  <ul>
+    <li>{_lit(t['src_agribalyse'])} {_lit(sources.get('agribalyse', ''))}</li>
+    <li>{_lit(t['src_distances'])} {_lit(sources.get('distances', ''))}</li>
+    <li>{_lit(t['src_biodiversity'])} {_lit(sources.get('biodiversity', ''))}</li>
+    <li>{_lit(t['method_version'])} {_lit(meta.get('method_version', ''))}</li>
+    <li>{_lit(t['build'])} {_lit(meta.get('build_time', ''))}</li>
+  </ul>
+</main>
+</body></html>"""
+
+    def _compile_row(self, loc):
+        home = _lit(locale_root(self.base_url, loc))
+        return f"""<tr>
+<td><a href="{home}/p/{{slug}}/">{{name}}</a></td>
+<td class="grade"><span class="badge {{grade}}">{{grade}}</span></td>
+<td>{{score}}</td>
+</tr>"""
+
+    def _compile_index(self, loc):
+        t = LOCALES[loc]
+        th = "".join(f"<th>{h}</th>" for h in t["th"])
+        script = CI.search_script(self.base_url, locale_root(self.base_url, loc))
+        head = f"""<!doctype html>
+<html lang="{loc}"><head>
+<meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{t['catalog_title']}</title>
+<link rel="stylesheet" href="{self.base_url}/assets/style.css">
+</head><body>
+<main>
+  <h1>{t['catalog_h1']}</h1>
+  <input id="q" type="search" placeholder="{t['search']}">
+  <table>
+    <thead><tr>{th}</tr></thead>
+    <tbody>"""
+        tail = f"""</tbody>
+  </table>
+  {{pager}}
+</main>
+{script}
+</body></html>"""
+        return head, tail
+
+    # ---- rendu --------------------------------------------------------------
+    def _timed(self, name, fn, *args):
+        t0 = time.perf_counter()
+        html = fn(*args)
+        s = self.stats[name]
+        s[0] += 1
+        s[1] += time.perf_counter() - t0
+        return html
+
+    def product_page(self, loc, item):
+        return self._timed(f"product.{loc}", self._product[loc].format_map, item)
+
+    def render_product(self, item):
+        """Toutes les langues d'une fiche en un passage : {loc: html}."""
+        return {loc: self.product_page(loc, item) for loc in self.locales}
+
+    def index_page(self, loc, items, page=1, pages=1):
+        def render():
+            head, tail = self._index[loc]
+            row = self._row[loc]
+            rows = "\n".join(row.format_map(it) for it in items)
+            t = LOCALES[loc]
+            pager = CI.pager_html(locale_root(self.base_url, loc), page, pages, t["prev"], t["next"])
+            return head + rows + tail.replace("{pager}", pager, 1)
+        return self._timed(f"index.{loc}", render)
+
+    def report(self):
+        """{template: {"count", "seconds", "per_second"}} depuis la création du renderer."""
+        return {name: {"count": n, "seconds": round(sec, 6),
+                       "per_second": round(n / sec, 1) if sec else None}
+                for name, (n, sec) in sorted(self.stats.items())}
@@ -0,0 +1,44 @@
+// Meilleures alternatives précalculées au build (src/alternatives.py) :
+// alternatives/meta.json + un shard JSON par suffixe de GTIN ({alt, ref}).
+// Avec les données ACV (meta.monthly), classement mois par mois sur le score
+// multicritère des pages, poids par défaut ; sinon éco-score du build. Chaque
+// alternative porte ses notes normalisées (`m`) : re-notation sans autre requête.
+import { scoreFor } from './precomputed.js';
+
+export const ALTERNATIVES_BASE = '../site_build/alternatives';
+
+const shards = {};
+let meta = null;
+
+async function getJSON(url){
+  const res = await fetch(url);
+  if(!res.ok) throw new Error(`${url}: ${res.status}`);
+  return res.json();
+}
+
+function loadMeta(base){
+  meta = meta || getJSON(`${base}/meta.json`).catch(()=> null);
+  return meta;
+}
+
+// [{gtin, name, score, grade, url, distance_km}, ...], meilleure d'abord ; [] si aucune.
+// `weights` + `score` (score affiché du produit) : alternatives re-notées avec ces poids
+// (notes normalisées du shard, comme scores/) et gardées seulement si leur score affiché est plus élevé.
+export async function loadAlternatives(gtin, { month = new Date().getMonth()+1, weights = null, score = null,
+                                                base = ALTERNATIVES_BASE } = {}){
+  const m = await loadMeta(base);
+  if(!m) return [];
+  const key = String(gtin).slice(-m.suffix_len);
+  if(!m.shards.includes(key)) return [];
+  shards[key] = shards[key] || getJSON(`${base}/${key}.json`).catch(()=> ({ alt:{}, ref:[] }));
+  const shard = await shards[key];
+  const row = shard.alt[gtin] || [];
+  const ids = Array.isArray(row[0]) ? row[month-1] : row;
+  const alts = ids.map(i=> shard.ref[i]).map(({ m: inputs, ...r })=> m.monthly
+    ? { ...r, score: r.score[month-1], grade: r.grade[month-1], inputs } : r);
+  if(!m.monthly || !weights || score === null) return alts.map(({ inputs, ...a })=> a);
+  return alts.filter(a=> a.inputs).map(({ inputs, ...a })=> {
+    const res = scoreFor(inputs, weights, month);
+    return { ...a, score: res.score, grade: res.letter };
+  }).filter(a=> a.score > score).sort((a, b)=> b.score - a.score);
+}
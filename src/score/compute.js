@@ -57,8 +57,8 @@ export async function computeScore(product, ctx){
   const sup = ctx.suppliersById[product.supplierId];
   if(sup){
     const certs = (sup.certs||'').toUpperCase();
-    if(certs.includes('AB') or certs.includes('BIO')) adj += 3;
-    if(certs.includes('FAIR') or certs.includes('EQ')) adj += 2;
+    if(certs.includes('AB') || certs.includes('BIO')) adj += 3;
+    if(certs.includes('FAIR') || certs.includes('EQ')) adj += 2;
     if((sup.practices||'').toLowerCase().includes('agroecology')) adj += 2;
   }
 
@@ -0,0 +1,51 @@
+// Scores précalculés au build (src/multicriteria.py) : scores/meta.json + un shard
+// JSON par suffixe de GTIN. Remplace le chargement des 5 CSV côté navigateur.
+export const SCORES_BASE = '../site_build/scores';
+
+const LABELS = { ghg:'Climat', water:'Eau', land:'Sols', biodiversity:'Biodiversité', pm:'Particules', eutro:'Eutrophisation' };
+const shards = {};
+let meta = null;
+
+async function getJSON(url){
+  const res = await fetch(url);
+  if(!res.ok) throw new Error(`${url}: ${res.status}`);
+  return res.json();
+}
+
+export function loadMeta(base = SCORES_BASE){
+  meta = meta || getJSON(`${base}/meta.json`);
+  return meta;
+}
+
+export function loadShard(key, base = SCORES_BASE){
+  shards[key] = shards[key] || getJSON(`${base}/${key}.json`).catch(()=> ({}));
+  return shards[key];
+}
+
+export async function loadRecord(gtin, base = SCORES_BASE){
+  const m = await loadMeta(base);
+  const shard = await loadShard(String(gtin).slice(-m.suffix_len), base);
+  return shard[gtin] || null;
+}
+
+// Tous les records (page Comparer) : un fetch par shard
+export async function loadAll(base = SCORES_BASE){
+  const m = await loadMeta(base);
+  const all = await Promise.all(m.shards.map(k=> loadShard(k, base)));
+  return all.flatMap(s=> Object.values(s));
+}
+
+// Même résultat que computeScore, à partir des notes normalisées précalculées
+export function scoreFor(rec, weights, month = (new Date().getMonth()+1)){
+  const i = month - 1;
+  if(!rec.n) return { score: 0, letter: 'E', breakdown: [], note: rec.note || 'No LCA' };
+  const breakdown = Object.keys(LABELS).map(k=> {
+    const normalized = k === 'ghg' ? rec.n.ghg[i] : rec.n[k];
+    const weight = Number(weights[k]||0);
+    return { key:k, label:LABELS[k], normalized, weight, contribution: Math.round(normalized*weight) };
+  });
+  let score = breakdown.reduce((a,c)=> a + c.contribution, 0) + rec.adj;
+  score = Math.max(0, Math.min(100, Math.round(score)));
+  const letter = score>=90?'A':score>=75?'B':score>=60?'C':score>=45?'D':'E';
+  return { score, letter, breakdown, adj: rec.adj, sf: rec.sf[i] };
+}
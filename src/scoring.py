@@ -0,0 +1,57 @@
+"""Moteur de score vectorisé (NumPy) — même formule que `build_site.score_row`.
+
+`score_row` reste l'implémentation de référence (ligne à ligne) ; ce module
+calcule les mêmes scores et notes pour tout un DataFrame en une seule passe.
+"""
+import numpy as np
+import pandas as pd
+
+def normalize_array(values, vmin, vmax):
+    """Équivalent colonne de `normalize` : (x - min) / (max - min) borné à [0, 1]."""
+    values = np.asarray(values, dtype=float)
+    if vmax <= vmin:
+        return np.zeros_like(values)
+    return np.clip((values - vmin) / (vmax - vmin), 0.0, 1.0)
+
+def round1(values):
+    """Arrondi à 0,1 identique au `round(x, 1)` de Python.
+
+    `np.round` passe par x*10 et peut diverger sur les cas limites (ex. 0.15) :
+    on corrige ces quelques valeurs avec l'arrondi Python.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.round(values, 1)
+    # |x*10 - floor(x*10) - 0.5|, calculé sur place (une seule copie)
+    frac = values * 10
+    np.subtract(frac, np.floor(frac), out=frac)
+    frac -= 0.5
+    np.abs(frac, out=frac)
+    ties = np.flatnonzero(frac < 1e-6)
+    # Vues à plat : marche aussi pour une matrice (produits × configurations)
+    flat, src = out.reshape(-1), values.reshape(-1)
+    for i in ties:
+        flat[i] = round(float(src[i]), 1)
+    return out
+
+def grade_array(score100, grade_bands):
+    """Note par bande (`grade_bands` trié décroissant), dernière bande par défaut."""
+    score100 = np.asarray(score100, dtype=float)
+    if not grade_bands:
+        return np.full(score100.shape, "E", dtype=object)
+    grades = np.full(score100.shape, grade_bands[-1][0], dtype=object)
+    # Parcours inverse : la première bande satisfaite (la plus haute) l'emporte
+    for g, cut in reversed(grade_bands):
+        grades[score100 >= cut] = g
+    return grades
+
+def impact_array(df: pd.DataFrame, weights, bounds):
+    """Impact pondéré normalisé (0 = meilleur, 1 = pire) pour chaque ligne."""
+    e = normalize_array(df["base_kgco2e"].to_numpy(float), *bounds["base_kgco2e"])
+    d = normalize_array(df["distance_km"].to_numpy(float), *bounds["distance_km"])
+    b = normalize_array(df["biodiversity_risk"].to_numpy(float), *bounds["biodiversity_risk"])
+    return weights["emissions"]*e + weights["distance"]*d + weights["biodiversity"]*b
+
+def score_frame(df: pd.DataFrame, weights, bounds, grade_bands):
+    """Renvoie (score100, grade) pour toutes les lignes, en tableaux NumPy."""
+    score100 = round1(100*(1 - impact_array(df, weights, bounds)))
+    return score100, grade_array(score100, grade_bands)
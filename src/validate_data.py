@@ -1,6 +1,13 @@
 from pathlib import Path
+import sys
+import numpy as np
 import pandas as pd
 
+try:
+    import resource   # Unix uniquement (mesure du pic mémoire)
+except ImportError:
+    resource = None
+
 # Ancre les chemins à la racine du repo, peu importe d'où Python est lancé
 ROOT = Path(__file__).resolve().parents[1]        # /<repo>
 DATA_DIR = ROOT / "data"
@@ -12,12 +19,90 @@ REQUIRED = {
     "biodiv": ["id", "biodiversity_risk"],
 }
 
+# Mode flux : types explicites et compacts pour les colonnes lues.
+# float32 suffit pour un contrôle de signe (validation seule, cf. scan_all) ;
+# biodiversity_risk reste en float64 pour une comparaison exacte aux bornes [0, 1].
+STREAM_DTYPES = {
+    "id": str,
+    "name": str,
+    "kgco2e_unit": "float32",
+    "distance_km": "float32",
+    "biodiversity_risk": "float64",
+}
+DEFAULT_CHUNKSIZE = 100_000
+
 def ensure_cols(df, cols, name):
     missing = [c for c in cols if c not in df.columns]
     if missing:
         raise ValueError(f"{name}: colonnes manquantes {missing}")
 
+def check_values(df, name):
+    """Valeurs hors bornes (négatifs, biodiversité hors [0,1])."""
+    if name == "agribalyse" and (df["kgco2e_unit"] < 0).any():
+        raise ValueError("agribalyse: kgco2e_unit négatif détecté")
+    if name == "distances" and (df["distance_km"] < 0).any():
+        raise ValueError("distances: distance_km négatif détecté")
+    if name == "biodiv" and ((df["biodiversity_risk"] < 0) | (df["biodiversity_risk"] > 1)).any():
+        raise ValueError("biodiv: biodiversity_risk doit être entre 0 et 1")
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du process (Mo), None si non mesurable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : Ko ; macOS : octets
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _duplicate_ids(path, suspects: np.ndarray, chunksize) -> list:
+    """Ids réellement dupliqués parmi ceux dont le hash est dans `suspects` (collision 64 bits écartée)."""
+    counts = {}
+    for chunk in pd.read_csv(path, usecols=["id"], dtype={"id": str}, chunksize=chunksize):
+        ids = chunk["id"].to_numpy(dtype=object)
+        for i in ids[np.isin(pd.util.hash_array(ids), suspects)].tolist():
+            counts[i] = counts.get(i, 0) + 1
+    return [i for i, n in counts.items() if n > 1]
+
+def iter_chunks(name, chunksize=DEFAULT_CHUNKSIZE):
+    """Lit `<name>.csv` par blocs (colonnes requises seulement) et valide chaque bloc.
+
+    Les doublons d'id sont détectés entre blocs via un tableau trié de hash
+    64 bits (8 octets par id, recherche vectorisée) ; les hash en double sont
+    revérifiés sur les ids eux-mêmes avant de conclure.
+    """
+    path = DATA_DIR / f"{name}.csv"
+    cols = REQUIRED[name]
+    ensure_cols(pd.read_csv(path, nrows=0), cols, name)
+    seen = np.empty(0, dtype=np.uint64)
+    reader = pd.read_csv(path, usecols=cols, dtype={c: STREAM_DTYPES[c] for c in cols}, chunksize=chunksize)
+    for chunk in reader:
+        ids = chunk["id"].to_numpy(dtype=object)
+        hashes = np.sort(pd.util.hash_array(ids))
+        repeated = hashes[1:][hashes[1:] == hashes[:-1]]
+        pos = np.minimum(np.searchsorted(seen, hashes), max(len(seen) - 1, 0))
+        known = hashes[seen[pos] == hashes] if len(seen) else hashes[:0]
+        suspects = np.union1d(repeated, known)
+        if len(suspects):
+            dups = _duplicate_ids(path, suspects, chunksize)
+            if dups:
+                raise ValueError(f"{name}: IDs dupliqués {dups}")
+        # Fusion de deux suites triées (tri stable : fusion des runs, linéaire)
+        seen = np.sort(np.concatenate([seen, np.unique(hashes)]), kind="stable")
+        check_values(chunk, name)
+        yield chunk
+
+def scan_all(chunksize=DEFAULT_CHUNKSIZE):
+    """Valide les 4 CSV en flux, sans les garder en mémoire ; renvoie un rapport."""
+    report = {}
+    for name in REQUIRED:
+        rows = chunks = 0
+        for chunk in iter_chunks(name, chunksize):
+            rows += len(chunk); chunks += 1
+        report[name] = {"rows": rows, "chunks": chunks}
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
 def load_all():
+    """Tables complètes en mémoire (toutes colonnes) ; validation bornée : scan_all."""
     # Lis les CSV avec des chemins absolus
     p = pd.read_csv(DATA_DIR / "products.csv")
     a = pd.read_csv(DATA_DIR / "agribalyse.csv")
@@ -36,11 +121,27 @@ def load_all():
             raise ValueError(f"{name}: IDs dupliqués {dups}")
 
     # Valeurs hors bornes
-    if (a["kgco2e_unit"] < 0).any():
-        raise ValueError("agribalyse: kgco2e_unit négatif détecté")
-    if (d["distance_km"] < 0).any():
-        raise ValueError("distances: distance_km négatif détecté")
-    if ((b["biodiversity_risk"] < 0) | (b["biodiversity_risk"] > 1)).any():
-        raise ValueError("biodiv: biodiversity_risk doit être entre 0 et 1")
+    for df, name in [(a,"agribalyse"), (d,"distances"), (b,"biodiv")]:
+        check_values(df, name)
 
     return p, a, d, b
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Validation des CSV de data/")
+    ap.add_argument("--chunksize", type=int, default=None,
+                    help="validation en flux, par blocs de N lignes (sans snapshot)")
+    args = ap.parse_args(argv)
+    if args.chunksize:
+        report = scan_all(args.chunksize)
+        for name in REQUIRED:
+            print(f"{name}: {report[name]['rows']} lignes ({report[name]['chunks']} blocs)")
+        print(f"Validation OK — pic mémoire {report['peak_rss_mb']} Mo")
+        return
+    # Par défaut : validation + jointure, réutilisées par la QA et le build
+    import src.dataset as D
+    df = D.load_joined()
+    print(f"Validation OK — {len(df)} produits (snapshot {D.input_key()})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Analyse « what-if » : N configurations candidates scorées d'un coup.
+
+Usage :
+  python -m src.whatif candidates.yaml [--top 10] [--json rapport.json]
+  python -m src.whatif --sweep 0.05          # toutes les pondérations au pas de 0,05
+
+`candidates.yaml` : liste (ou clé `configs:`) de configurations partielles
+{name, weights, bounds, grade_bands} ; ce qui manque vient de config.yaml.
+
+Les colonnes d'impact sont normalisées une fois par jeu de bornes, puis
+toutes les pondérations de ce jeu sont appliquées en une opération
+matricielle (produits × 3) · (3 × configurations), par blocs de
+configurations pour borner la mémoire. Même formule et même arrondi que `scoring.score_frame`.
+Pour chaque configuration : distribution des notes, matrice de transition
+depuis les notes actuelles et produits les plus déplacés.
+"""
+import argparse, json
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+import src.build_site as B
+import src.dataset as D
+from src.scoring import normalize_array, round1, score_frame
+
+COLUMNS = ["base_kgco2e", "distance_km", "biodiversity_risk"]
+WEIGHT_KEYS = ["emissions", "distance", "biodiversity"]     # alignées sur COLUMNS
+# Cellules (produits × configurations) traitées par bloc
+BLOCK_CELLS = 4_000_000
+
+def resolve(base: dict, candidates) -> list:
+    """Configurations complètes : chaque candidate complète la config de base."""
+    out = []
+    for i, c in enumerate(candidates):
+        out.append({
+            "name": str(c.get("name") or f"config-{i + 1}"),
+            "weights": {**base["weights"], **(c.get("weights") or {})},
+            "bounds": {**base["bounds"], **{k: list(v) for k, v in (c.get("bounds") or {}).items()}},
+            "grade_bands": [tuple(b) for b in (c.get("grade_bands") or base["grade_bands"])],
+        })
+    return out
+
+def weight_grid(step: float) -> list:
+    """Toutes les pondérations (emissions, distance, biodiversity) de somme 1 au pas `step`."""
+    n = int(round(1 / step))
+    return [{"name": f"w{e}-{d}-{n - e - d}",
+             "weights": dict(zip(WEIGHT_KEYS, (e / n, d / n, (n - e - d) / n)))}
+            for e in range(n + 1) for d in range(n + 1 - e)]
+
+def grade_codes(score100, grade_bands):
+    """Indice de bande (0 = meilleure) ; même règle que `grade_array`."""
+    # Bandes décroissantes : l'indice est le nombre de seuils non atteints
+    codes = np.zeros(np.shape(score100), dtype=np.int8)
+    for _, cut in grade_bands:
+        codes += score100 < cut
+    return np.minimum(codes, len(grade_bands) - 1)
+
+def _group_key(cfg):
+    return (json.dumps({k: cfg["bounds"][k] for k in COLUMNS}), json.dumps(cfg["grade_bands"]))
+
+def evaluate(df, base: dict, configs: list, top: int = 10, block_cells: int = BLOCK_CELLS) -> dict:
+    """Rapport what-if de `configs` (résolues) par rapport à `base`."""
+    base_score, _ = score_frame(df, base["weights"], base["bounds"], base["grade_bands"])
+    base_labels = [g for g, _ in base["grade_bands"]]
+    base_codes = grade_codes(base_score, base["grade_bands"]).astype(np.int64)
+    values = df[COLUMNS].to_numpy(float)
+    ids = df["id"].astype(str).to_numpy()
+    names = df["name"].astype(str).to_numpy() if "name" in df.columns else ids
+    n, nb = len(df), len(base_labels)
+    block = max(1, block_cells // max(n, 1))
+    top = min(top, n)
+
+    results = [None] * len(configs)
+    groups = {}
+    for i, cfg in enumerate(configs):
+        groups.setdefault(_group_key(cfg), []).append(i)
+
+    for members in groups.values():
+        first = configs[members[0]]
+        # Normalisation commune à toutes les configurations du groupe
+        norm = np.column_stack([normalize_array(values[:, j], *first["bounds"][col])
+                                for j, col in enumerate(COLUMNS)])
+        bands = first["grade_bands"]
+        labels = [g for g, _ in bands]
+        nc = len(labels)
+        # same[a, b] : la bande a de base et la bande b portent la même lettre
+        same = np.array([[x == y for y in labels] for x in base_labels], dtype=np.int64)
+        for start in range(0, len(members), block):
+            chunk = members[start:start + block]
+            w = np.array([[configs[i]["weights"][k] for k in WEIGHT_KEYS] for i in chunk]).T
+            # Produit (n × 3) · (3 × k) terme à terme, dans l'ordre d'impact_array :
+            # un `@` (BLAS) change l'ordre des sommes, donc l'arrondi des cas limites
+            impact = norm[:, 0:1] * w[0] + norm[:, 1:2] * w[1] + norm[:, 2:3] * w[2]
+            scores = round1(100 * (1 - impact))                                # (n, k)
+            codes = grade_codes(scores, bands)
+            k = len(chunk)
+            pairs = base_codes[:, None] * nc + codes + (np.arange(k) * nb * nc)[None, :]
+            trans = np.bincount(pairs.ravel(), minlength=k * nb * nc).reshape(k, nb, nc)
+            dist = trans.sum(axis=1)                                              # (k, nc)
+            changed = n - (trans * same).sum(axis=(1, 2))
+            delta = scores - base_score[:, None]
+            # Une ligne par configuration : argpartition sur des données contiguës
+            gap = np.abs(delta.T)
+            movers = np.argpartition(gap, n - top, axis=1)[:, n - top:] if top else np.empty((k, 0), int)
+            for j, i in enumerate(chunk):
+                rows = movers[j][np.argsort(-gap[j, movers[j]], kind="stable")]
+                results[i] = {
+                    "name": configs[i]["name"],
+                    "weights": configs[i]["weights"],
+                    "bounds": configs[i]["bounds"],
+                    "grade_bands": [list(b) for b in bands],
+                    "mean_score": round(float(scores[:, j].mean()), 2),
+                    "grades": dict(zip(labels, dist[j].tolist())),
+                    "changed": int(changed[j]),
+                    "transitions": {"from": base_labels, "to": labels, "counts": trans[j].tolist()},
+                    "most_affected": [{"id": ids[r], "name": names[r], "before": float(base_score[r]),
+                                       "after": float(scores[r, j]), "delta": round(float(delta[r, j]), 1)}
+                                      for r in rows],
+                }
+    return {"products": n, "base": {"weights": base["weights"], "bounds": base["bounds"],
+                                     "grades": dict(zip(base_labels, np.bincount(base_codes, minlength=nb).tolist()))},
+            "configs": results}
+
+def load_catalog():
+    """Table jointe prête à scorer + config de base (bornes auto résolues)."""
+    cfg = B.load_config()
+    base = dict(zip(["weights", "bounds", "grade_bands"], B.score_config(cfg)))
+    df = B.prepare(D.load_joined(B.CACHE_DIR / "dataset"), base["bounds"], cfg.get("auto_bounds"))
+    return df, base
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Analyse what-if de configurations de score")
+    ap.add_argument("candidates", nargs="?", help="YAML : liste de configurations partielles")
+    ap.add_argument("--sweep", type=float, help="ajoute toutes les pondérations au pas donné (ex. 0.05)")
+    ap.add_argument("--top", type=int, default=10, help="produits les plus déplacés par configuration")
+    ap.add_argument("--json", help="écrit le rapport complet dans ce fichier")
+    args = ap.parse_args(argv)
+    if not args.candidates and not args.sweep:
+        ap.error("donner un fichier de candidates et/ou --sweep")
+
+    df, base = load_catalog()
+    candidates = []
+    if args.candidates:
+        raw = yaml.safe_load(Path(args.candidates).read_text(encoding="utf-8")) or []
+        candidates += raw.get("configs", []) if isinstance(raw, dict) else raw
+    if args.sweep:
+        candidates += weight_grid(args.sweep)
+    report = evaluate(df, base, resolve(base, candidates), top=args.top)
+
+    ranked = sorted(report["configs"], key=lambda r: -r["changed"])
+    print(f"{report['products']} produits, {len(ranked)} configurations ; notes actuelles {report['base']['grades']}")
+    print(f"{'configuration':<24}{'score moyen':>12}{'notes changées':>16}  plus gros écart")
+    for r in ranked[:20]:
+        m = r["most_affected"][0] if r["most_affected"] else None
+        mover = f"{m['id']} {m['before']} -> {m['after']}" if m else "-"
+        print(f"{r['name']:<24}{r['mean_score']:>12}{r['changed']:>16}  {mover}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Rapport : {args.json}")
+
+if __name__ == "__main__":
+    main()
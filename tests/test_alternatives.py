@@ -0,0 +1,73 @@
+import json
+import numpy as np
+import pandas as pd
+import src.alternatives as AL
+
+def _catalog(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": [f"P{i}" for i in range(n)], "gtin": [f"{3000000000000 + i}" for i in range(n)],
+        "category": rng.choice(["Dairy", "Beef", "Tomate", ""], n), "unit": rng.choice(["kg", "unit"], n),
+        "score": rng.integers(0, 20, n) * 5.0, "distance_km": rng.integers(0, 3, n) * 100.0,
+        "originCountry": rng.choice(["FR", "ES"], n)})
+
+def test_rank_matches_pairwise_scan():
+    df = _catalog(400)
+    for same_unit in (False, True):
+        alt = AL.rank(df, k=4, same_unit=same_unit)
+        for i, row in df.iterrows():
+            same = (df["category"] == row["category"]) & (df["score"] > row["score"]) & (row["category"] != "")
+            if same_unit:
+                same &= df["unit"] == row["unit"]
+            expected = (df[same].sort_values(["score", "distance_km", "gtin"],
+                                             ascending=[False, True, True], kind="stable").index[:4].tolist())
+            assert [j for j in alt[i].tolist() if j >= 0] == expected
+
+def test_shards_resolve_in_one_lookup(tmp_path):
+    df = _catalog(300, seed=1)
+    records = [{"name": f"n{i}", "score": s, "grade": "A", "url": f"u{i}", "distance_km": d}
+               for i, (s, d) in enumerate(zip(df["score"], df["distance_km"]))]
+    AL.write_shards(tmp_path, df, records, k=3)
+    meta = json.loads((tmp_path / "alternatives" / "meta.json").read_text())
+    alt = AL.rank(df, k=3)
+    for i in (0, 7, 123):
+        gtin = df["gtin"][i]
+        shard = json.loads((tmp_path / "alternatives" / f"{gtin[-meta['suffix_len']:]}.json").read_text())
+        got = [shard["ref"][j]["gtin"] for j in shard["alt"].get(gtin, [])]
+        assert got == [df["gtin"][j] for j in alt[i] if j >= 0]
+
+def test_monthly_ranking_uses_page_scores(tmp_path):
+    import src.multicriteria as MC
+    from benchmarks.synth import generate
+    generate(tmp_path / "data", 300, seed=3)
+    inputs = MC.load_inputs(tmp_path / "data")
+    products, res = inputs[0], MC.precompute(*inputs)
+    df = products.assign(score=0.0, distance_km=0.0).reset_index(drop=True)
+    records = [{"name": f"n{i}", "score": 0.0, "grade": "E", "url": f"u{i}", "distance_km": 0.0}
+               for i in range(len(df))]
+    monthly = AL.monthly_scores(df, products, res)
+    AL.write_shards(tmp_path / "out", df, records, k=3, monthly=monthly)
+    dest = tmp_path / "out" / "alternatives"
+    meta = json.loads((dest / "meta.json").read_text())
+    assert meta["monthly"]
+    by_gtin = dict(zip(products["gtin"], res["score"].tolist()))
+    pages = {r["gtin"]: r for r in MC.records(products, res)}
+    checked = 0
+    for i, gtin in enumerate(df["gtin"]):
+        path = dest / f"{gtin[-meta['suffix_len']:]}.json"
+        shard = json.loads(path.read_text()) if path.exists() else {"alt": {}, "ref": []}
+        row = shard["alt"].get(gtin, [])
+        for m in (0, 6, 11):
+            ids = row[m] if row and isinstance(row[0], list) else row
+            expected = AL.rank(df, k=3, score=monthly[0][:, m])[i]
+            assert [shard["ref"][j]["gtin"] for j in ids] == [df["gtin"][j] for j in expected if j >= 0]
+            for j in ids:
+                ref = shard["ref"][j]
+                # Score et lettre du mois : ceux des pages (scores/), toujours au-dessus du produit
+                assert ref["score"][m] == by_gtin[ref["gtin"]][m] and ref["score"][m] > monthly[0][i, m]
+                assert ref["grade"][m] == MC.letters(ref["score"][m])
+                # Notes de re-notation côté JS : celles du record scores/, sans autre requête
+                page = pages[ref["gtin"]]
+                assert ref["m"] == {"n": page["n"], "adj": page["adj"], "sf": page["sf"]}
+                checked += 1
+    assert checked
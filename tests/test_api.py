@@ -0,0 +1,98 @@
+import asyncio, json, shutil
+from pathlib import Path
+import src.api as A
+import src.build_site as B
+import src.validate_data as V
+
+REPO = Path(__file__).resolve().parents[1]
+
+async def _get(port, target, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    method = "POST" if body is not None else "GET"
+    body = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    raw = await reader.read()
+    writer.close()
+    return status, json.loads(raw.split(b"\r\n\r\n", 1)[1])
+
+def test_lookup_batch_and_hot_reload(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    shutil.copytree(REPO / "data", data)
+    monkeypatch.setattr(V, "DATA_DIR", data)
+    monkeypatch.setattr(B, "CACHE_DIR", tmp_path / ".cache")
+
+    async def scenario():
+        service = A.ScoreService()
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            status, rec = await _get(port, "/score/3012345678901")
+            assert status == 200 and rec["name"] == "Yaourt nature 125g" and len(rec["monthly"]["score"]) == 12
+            assert (await _get(port, "/score/inconnu"))[0] == 404
+            status, res = await _get(port, "/scores", {"ids": ["3012345678901", "inconnu"]})
+            assert list(res["results"]) == ["3012345678901"] and res["missing"] == ["inconnu"]
+
+            # Données invalides : l'index précédent reste servi
+            products = (data / "products.csv").read_text(encoding="utf-8")
+            (data / "products.csv").write_text("name\nsans id\n", encoding="utf-8")
+            assert not await service.reload()
+            assert (await _get(port, "/score/3012345678901"))[0] == 200
+
+            (data / "products.csv").write_text(products.replace("Yaourt nature 125g", "Yaourt 500g"), encoding="utf-8")
+            assert await service.reload()
+            assert (await _get(port, "/score/3012345678901"))[1]["name"] == "Yaourt 500g"
+            assert (await _get(port, "/health"))[1]["reloads"] == 2
+
+    asyncio.run(scenario())
+
+def test_malformed_config_or_csv_keeps_serving_old_index(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    shutil.copytree(REPO / "data", data)
+    config = tmp_path / "config.yaml"
+    shutil.copy(REPO / "config.yaml", config)
+    monkeypatch.setattr(V, "DATA_DIR", data)
+    monkeypatch.setattr(B, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(B, "CONFIG_PATH", config)
+
+    async def scenario():
+        service = A.ScoreService(poll=0.01)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            before = (await _get(port, "/score/3012345678901"))[1]
+            version = (await _get(port, "/health"))[1]["version"]
+
+            # YAML illisible puis CSV binaire : erreurs hors ValueError/KeyError
+            good = config.read_text(encoding="utf-8")
+            config.write_text("weights: [emissions: {\n", encoding="utf-8")
+            assert not await service.reload()
+            assert (await _get(port, "/score/3012345678901"))[1] == before
+            config.write_text(good, encoding="utf-8")
+            (data / "agribalyse.csv").write_bytes(b"\xff\xfe\x00id,base\n\x00\x81")
+            assert not await service.reload()
+            assert (await _get(port, "/score/3012345678901"))[1] == before
+
+            # Config modifiée seule : nouvel index
+            shutil.copy(REPO / "data" / "agribalyse.csv", data / "agribalyse.csv")
+            config.write_text(good.replace("[A, 80]", "[A, 101]"), encoding="utf-8")
+            assert await service.reload()
+            assert (await _get(port, "/health"))[1]["version"] != version
+            assert (await _get(port, "/score/3012345678901"))[1]["grade"] == "B" != before["grade"]
+
+            # Une erreur pendant la surveillance n'arrête pas la boucle
+            calls = []
+            def flaky():
+                calls.append(1)
+                if len(calls) == 1:
+                    raise FileNotFoundError("products.csv")
+                return service.signature
+            monkeypatch.setattr(A, "data_signature", flaky)
+            task = asyncio.create_task(service.watch())
+            while len(calls) < 3:
+                await asyncio.sleep(0.01)
+            assert not task.done()
+            task.cancel()
+            assert (await _get(port, "/health"))[0] == 200
+
+    asyncio.run(scenario())
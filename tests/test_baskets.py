@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import src.baskets as BK
+from benchmarks.synth import generate
+
+def test_bulk_scores_match_per_basket_loop(tmp_path):
+    generate(tmp_path / "data", 200, seed=5)
+    impacts = BK.load_impacts(7, tmp_path / "data")
+    rng = np.random.default_rng(0)
+    gtins = impacts["index"].to_numpy()
+    n = 3_000
+    lines = pd.DataFrame({"basket_id": np.sort(rng.integers(0, 400, n)).astype(str),
+                          "gtin": rng.choice(gtins, n), "qty": rng.integers(1, 4, n).astype(float)})
+    lines.loc[::97, "gtin"] = "0000000000000"          # article inconnu
+    path = tmp_path / "lines.csv"
+    lines.to_csv(path, index=False)
+
+    res = pd.concat(list(BK.iter_csv(path, impacts, chunksize=256)), ignore_index=True)
+    assert res["basket_id"].is_unique and res["lines"].sum() == n
+    pos = {g: i for i, g in enumerate(gtins)}
+    for basket, items in list(lines.groupby("basket_id", sort=False))[:50]:
+        row = res.set_index("basket_id").loc[basket]
+        known = [(pos[g], q) for g, q in zip(items["gtin"], items["qty"]) if g in pos]
+        scored = [(i, q) for i, q in known if impacts["has_lca"][i]]
+        assert row["unknown"] == len(items) - len(known)
+        assert np.isclose(row["ghg_kg"], round(sum(impacts["ghg"][i] * q for i, q in known), 3))
+        assert np.isclose(row["water_l"], round(sum(impacts["water"][i] * q for i, q in known), 3))
+        assert row["score_mean"] == round(np.mean([impacts["score"][i] for i, _ in scored]), 1)
+        assert row["score_weighted"] == round(sum(impacts["score"][i] * q for i, q in scored)
+                                              / sum(q for _, q in scored), 1)
+        assert row[BK.GRADES].sum() == len(scored)
+
+def test_lines_without_basket_id_are_counted_not_fatal(tmp_path):
+    generate(tmp_path / "data", 50, seed=6)
+    impacts = BK.load_impacts(3, tmp_path / "data")
+    gtin = impacts["index"][0]
+    path = tmp_path / "lines.csv"
+    path.write_text(f"basket_id,gtin,qty\nT1,{gtin},1\n,{gtin},2\n  ,{gtin},1\nT2,{gtin},3\n", encoding="utf-8")
+    res = list(BK.iter_csv(path, impacts, chunksize=2))
+    out = pd.concat(res, ignore_index=True)
+    assert out["basket_id"].tolist() == ["T1", "T2"] and out["qty"].tolist() == [1.0, 3.0]
+    assert sum(r.attrs["invalid_lines"] for r in res) == 2
+
+def test_non_numeric_qty_counted_as_zero(tmp_path, monkeypatch, capsys):
+    generate(tmp_path / "data", 50, seed=6)
+    impacts = BK.load_impacts(3, tmp_path / "data")
+    gtin = impacts["index"][0]
+    path = tmp_path / "lines.csv"
+    path.write_text(f"basket_id,gtin,qty\nT1,{gtin},2\nT1,{gtin},abc\nT2,{gtin},\nT2,{gtin},1.5\n", encoding="utf-8")
+    res = list(BK.iter_csv(path, impacts, chunksize=3))
+    out = pd.concat(res, ignore_index=True)
+    assert out["qty"].tolist() == [2.0, 1.5] and out["lines"].tolist() == [2, 2]
+    assert sum(r.attrs["invalid_qty"] for r in res) == 2
+
+    monkeypatch.setattr(BK.V, "DATA_DIR", tmp_path / "data")
+    BK.main([str(path), "--month", "3", "--out", str(tmp_path / "out.csv")])
+    assert "2 ligne(s) avec qty vide ou non numérique" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+import json, shutil
+from pathlib import Path
+import pandas as pd
+import src.build_cache as BC
+import src.build_site as B
+import src.validate_data as V
+
+REPO = Path(__file__).resolve().parents[1]
+
+def test_record_hashes_only_change_for_edited_row():
+    df = pd.DataFrame({"id": ["a", "b", "c"], "distance_km": [1.0, 2.0, 3.0]})
+    before = BC.record_hashes(df, ["id", "distance_km"], "cfg")
+    df.loc[1, "distance_km"] = 20.0
+    after = BC.record_hashes(df, ["id", "distance_km"], "cfg")
+    assert [x == y for x, y in zip(before, after)] == [True, False, True]
+    assert BC.record_hashes(df, ["id", "distance_km"], "other") != after
+
+def _setup_repo(tmp_path, monkeypatch):
+    data = tmp_path / "data"; data.mkdir()
+    for name in ["products.csv", "agribalyse.csv", "distances.csv", "biodiv.csv"]:
+        shutil.copy(REPO / "data" / name, data / name)
+    shutil.copy(REPO / "config.yaml", tmp_path / "config.yaml")
+    monkeypatch.setattr(V, "DATA_DIR", data)
+    monkeypatch.setattr(B, "ROOT", tmp_path)
+    monkeypatch.setattr(B, "OUT", tmp_path / "site_build")
+    monkeypatch.setattr(B, "CACHE_DIR", tmp_path / ".cache")
+    return data
+
+def test_incremental_build_skips_unchanged_and_removes_stale(tmp_path, monkeypatch):
+    data = _setup_repo(tmp_path, monkeypatch)
+    B.main()
+    pages = {p.parent.name: p.stat().st_mtime_ns for p in (tmp_path / "site_build" / "p").glob("*/index.html")}
+    assert len(pages) == 3
+
+    # Une ligne modifiée, une ligne supprimée
+    lines = (data / "products.csv").read_text(encoding="utf-8").splitlines()
+    lines[1] = lines[1].replace("Yaourt nature 125g", "Yaourt nature 500g")
+    (data / "products.csv").write_text("\n".join(lines[:3]) + "\n", encoding="utf-8")
+    B.main()
+
+    after = {p.parent.name: p.stat().st_mtime_ns for p in (tmp_path / "site_build" / "p").glob("*/index.html")}
+    assert set(after) == {"3012345678901-yaourt-nature-500g", "5412345678902-steak-hache-100g"}
+    assert after["5412345678902-steak-hache-100g"] == pages["5412345678902-steak-hache-100g"]
+    assert not (tmp_path / "site_build" / "qr" / "7612345678903-lentilles-500g.png").exists()
+
+    report = json.loads((tmp_path / "site_build" / "build_report.json").read_text(encoding="utf-8"))
+    assert report["counters"]["pages_skipped"] == 2 and report["counters"]["qr_skipped"] == 1
+    assert report["counters"]["slugs_removed"] == 2
+    assert [s["name"] for s in report["stages"]][:4] == ["staging", "setup", "load", "bounds"]
@@ -0,0 +1,47 @@
+import json
+import src.catalog_index as CI
+
+RECORDS = [
+    {"id": "1", "name": "Yaourt nature", "slug": "1-yaourt-nature", "grade": "A", "score": 91.0},
+    {"id": "2", "name": "Yaourt à la fraise", "slug": "2-yaourt-a-la-fraise", "grade": "B", "score": 70.5},
+    {"id": "3", "name": "Lentilles vertes", "slug": "3-lentilles-vertes", "grade": "A", "score": 95.0},
+]
+
+def test_search_shards_by_prefix():
+    shards, split = CI.build_search_shards(RECORDS)
+    assert not split and "1" not in shards          # ids : shards à part
+    ya = shards["ya"]
+    assert [it[0] for it in ya["items"]] == ["1-yaourt-nature", "2-yaourt-a-la-fraise"]
+    assert ya["tokens"]["yaourt"] == [0, 1]
+    # accents normalisés, tokens < 2 caractères ignorés
+    assert "fraise" in shards["fr"]["tokens"] and "a" not in shards
+    assert shards["le"]["items"] == [["3-lentilles-vertes", "Lentilles vertes", "A", 95.0]]
+
+def test_write_pages_and_index(tmp_path):
+    render = lambda items, page, pages: json.dumps([page, pages, [it["id"] for it in items]])
+    assert CI.write_pages(tmp_path, RECORDS, render, page_size=2) == 2
+    assert json.loads((tmp_path / "index.html").read_text()) == [1, 2, ["1", "2"]]
+    assert json.loads((tmp_path / "page" / "2" / "index.html").read_text()) == [2, 2, ["3"]]
+    CI.write_search_index(tmp_path, RECORDS)
+    assert json.loads((tmp_path / "search" / "name" / "ve.json").read_text())["tokens"] == {"vertes": [0]}
+    assert json.loads((tmp_path / "search" / "meta.json").read_text()) == {"min": 2, "max_items": CI.MAX_ITEMS,
+                                                                           "name": [], "id": []}
+
+def test_shards_split_under_cap_when_ids_share_a_prefix(tmp_path):
+    words = ["yaourt", "yaourtiere", "compote", "comte", "cornichon", "lentilles", "lait"]
+    records = [{"id": f"SKU{i:08d}", "name": f"{words[i % 7]} {words[(i * 3) % 7]} lot{i}", "slug": f"s{i}",
+                "grade": "A", "score": 50.0} for i in range(3000)]
+    CI.write_search_index(tmp_path, records, max_items=100)
+    meta = json.loads((tmp_path / "search" / "meta.json").read_text())
+    assert "sk" in meta["id"] and "co" in meta["name"]
+    for path in (tmp_path / "search").rglob("*.json"):
+        if path.name != "meta.json":
+            assert len(json.loads(path.read_text())["items"]) <= 100
+    # Terme complet : le shard choisi par shard_key contient tous les produits du token
+    for field, term, expected in [("id", "sku00001234", {"s1234"}),
+                                  ("name", "lot42", {"s42"})]:
+        key = CI.shard_key(term, set(meta[field]))
+        shard = json.loads((tmp_path / "search" / field / f"{key}.json").read_text())
+        assert {shard["items"][i][0] for i in shard["tokens"][term]} == expected
+    # Token plus fréquent que le plafond : shard tronqué et signalé
+    assert json.loads((tmp_path / "search" / "name" / "cornichon.json").read_text())["partial"]
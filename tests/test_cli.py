@@ -0,0 +1,22 @@
+import csv
+import src.__main__ as CLI
+import src.build_site as B
+import src.validate_data as V
+import export_scores as E
+import qr_sheet as S
+from benchmarks.synth import generate
+
+def test_all_runs_the_pipeline_in_one_process(tmp_path, monkeypatch):
+    generate(tmp_path / "data", 40, seed=3)
+    (tmp_path / "config.yaml").write_text((B.ROOT / "config.yaml").read_text(encoding="utf-8"), encoding="utf-8")
+    monkeypatch.setattr(V, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(B, "ROOT", tmp_path)
+    monkeypatch.setattr(B, "OUT", tmp_path / "site_build")
+    monkeypatch.setattr(B, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(E, "OUT_DIR", tmp_path / "artifacts")
+    monkeypatch.setattr(S, "OUT_DIR", tmp_path / "artifacts")
+
+    CLI.main(["all", "--qr-workers", "1", "--workers", "1"])
+    with (tmp_path / "artifacts" / "scores.csv").open(encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 40
+    assert (tmp_path / "artifacts" / "qr_sheets_a4.pdf").exists()
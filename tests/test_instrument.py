@@ -0,0 +1,50 @@
+import json, pstats, shutil, time
+from pathlib import Path
+import src.build_site as B
+import src.instrument as IN
+import src.validate_data as V
+
+REPO = Path(__file__).resolve().parents[1]
+
+def test_stages_in_order_and_counters_summed(tmp_path):
+    report = IN.BuildReport()
+    for name in ["load", "score", "pages"]:
+        with report.stage(name):
+            time.sleep(0.01)
+    report.count("pages_rendered")
+    report.count("pages_rendered", 4)
+    report.count("bytes_written", 10)
+    report.write(tmp_path / "build_report.json")
+
+    data = json.loads((tmp_path / "build_report.json").read_text(encoding="utf-8"))
+    assert [s["name"] for s in data["stages"]] == ["load", "score", "pages"]
+    assert all(s["seconds"] >= 0.01 for s in data["stages"])
+    assert data["counters"] == {"pages_rendered": 5, "bytes_written": 10}
+
+def test_profiled_writes_readable_stats(tmp_path):
+    dest = tmp_path / "prof" / "build.prof"
+    with IN.profiled(dest, True, top=3):
+        sorted(range(1000), key=str)
+    assert any("sorted" in str(fn) for fn in pstats.Stats(str(dest)).stats)
+    with IN.profiled(tmp_path / "off.prof", False):
+        pass
+    assert not (tmp_path / "off.prof").exists()
+
+def test_build_bytes_cover_every_written_file(tmp_path, monkeypatch):
+    data = tmp_path / "data"; data.mkdir()
+    for name in ["products.csv", "agribalyse.csv", "distances.csv", "biodiv.csv"]:
+        shutil.copy(REPO / "data" / name, data / name)
+    shutil.copy(REPO / "config.yaml", tmp_path / "config.yaml")
+    monkeypatch.setattr(V, "DATA_DIR", data)
+    monkeypatch.setattr(B, "ROOT", tmp_path)
+    monkeypatch.setattr(B, "OUT", tmp_path / "site_build")
+    monkeypatch.setattr(B, "CACHE_DIR", tmp_path / ".cache")
+    B.main()
+
+    out = tmp_path / "site_build"
+    counters = json.loads((out / "build_report.json").read_text(encoding="utf-8"))["counters"]
+    manifest = IN.tree_bytes(*out.glob("manifest.json*"), out / "manifest")
+    assert counters["manifest_bytes"] == manifest
+    # Premier build : tout est écrit, rapport excepté
+    assert counters["bytes_written"] + manifest == IN.tree_bytes(out) - (out / "build_report.json").stat().st_size
+    assert counters.get("bytes_skipped", 0) == 0
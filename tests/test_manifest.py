@@ -0,0 +1,17 @@
+import gzip, json
+import src.manifest as M
+
+def test_ndjson_shards_roundtrip(tmp_path):
+    records = [{"id": str(i), "name": f"Produit {i}", "score": i / 2} for i in range(5)]
+    index = M.write(tmp_path, iter(records), {"method_version": "1.0.0"}, fmt="ndjson", shard_size=2)
+    assert index["count"] == 5 and [s["count"] for s in index["shards"]] == [2, 2, 1]
+    assert "records" not in M.read_index(tmp_path)
+    assert list(M.iter_records(tmp_path)) == records
+    first = tmp_path / index["shards"][0]["path"]
+    assert gzip.decompress(first.with_name(first.name + ".gz").read_bytes()) == first.read_bytes()
+
+    # Retour au format historique : shards et variantes supprimés
+    M.write(tmp_path, records, {}, fmt="json")
+    assert json.loads((tmp_path / "manifest.json").read_text())["records"] == records
+    assert not (tmp_path / "manifest").exists() and not (tmp_path / "manifest.json.gz").exists()
+    assert list(M.iter_records(tmp_path)) == records
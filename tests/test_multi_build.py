@@ -0,0 +1,39 @@
+import json
+import src.multi_build as MB
+from benchmarks.synth import generate
+
+def _yaml(path, catalogs):
+    lines = ["qr_cache: shared/qr", "catalogs:"]
+    for name, data, url in catalogs:
+        lines += [f"  - name: {name}", f"    data: {data}", f"    base_url: {url}", f"    out: builds/{name}/site_build"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+def test_catalogs_build_in_parallel_with_shared_qr_cache(tmp_path):
+    generate(tmp_path / "a", 12, seed=1)
+    generate(tmp_path / "b", 8, seed=2)
+    specs = _yaml(tmp_path / "catalogs.yaml", [("a", "a", "https://a.example"), ("b", "b", "https://b.example")])
+    MB.main([str(specs), "--workers", "2", "--report", str(tmp_path / "report.json")])
+
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    by_name = {r["name"]: r for r in report["catalogs"]}
+    for name, n in (("a", 12), ("b", 8)):
+        r = by_name[name]
+        assert r["ok"] and r["seconds"] > 0 and "qr" in r["stages"]
+        assert r["counters"]["qr_encoded"] == n
+        manifest = (tmp_path / "builds" / name / "site_build" / "manifest.json").read_text(encoding="utf-8")
+        assert f"https://{name}.example/p/" in manifest
+
+    # Même catalogue, même URL de base : tous les QR viennent du cache partagé
+    again = _yaml(tmp_path / "again.yaml", [("a2", "a", "https://a.example")])
+    res = MB.build_all(MB.load_specs(again)["catalogs"], tmp_path / "shared" / "qr", workers=1)
+    assert res[0]["ok"]
+    assert res[0]["counters"]["qr_encoded"] == 0 and res[0]["counters"]["qr_from_cache"] == 12
+
+def test_failed_catalog_does_not_stop_the_others(tmp_path):
+    generate(tmp_path / "a", 5, seed=3)
+    specs = _yaml(tmp_path / "catalogs.yaml", [("a", "a", "https://a.example"), ("x", "missing", "https://x.example")])
+    defs = MB.load_specs(specs)
+    res = MB.build_all(defs["catalogs"], defs["qr_cache"], workers=2)
+    assert [r["ok"] for r in res] == [True, False]
+    assert res[1]["error"]
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+import pytest
+import src.output as O
+
+def _build(out, index, files, fail=False, remove=()):
+    with O.OutputWriter(out, index, workers=4) as w:
+        for rel, data in files.items():
+            w.write(rel, data)
+        for rel in remove:
+            w.remove(rel)
+        if fail:
+            w.flush()
+            raise RuntimeError("build interrompu")
+        w.commit()
+    return w.stats
+
+def test_skips_unchanged_and_swaps_atomically(tmp_path):
+    out, index = tmp_path / "site_build", tmp_path / ".cache" / "hashes.json"
+    files = {f"p/{i}/index.html": f"page {i}" for i in range(50)}
+    assert _build(out, index, files)["files_written"] == 50
+    mtime = (out / "p/1/index.html").stat().st_mtime_ns
+
+    stats = _build(out, index, {**files, "p/2/index.html": "page 2 modifiée"})
+    assert stats["files_skipped"] == 49 and stats["files_written"] == 1
+    assert (out / "p/1/index.html").stat().st_mtime_ns == mtime
+    assert (out / "p/2/index.html").read_text() == "page 2 modifiée"
+
+    # Échec en cours de build : le site en ligne est intact
+    with pytest.raises(RuntimeError):
+        _build(out, index, {"p/1/index.html": "cassée"}, fail=True)
+    assert (out / "p/1/index.html").read_text() == "page 1"
+    assert not (tmp_path / ".site_build.staging").exists()
+
+def test_staging_holds_only_changed_files(tmp_path, monkeypatch):
+    out, index = tmp_path / "site_build", tmp_path / ".cache" / "hashes.json"
+    files = {f"p/{i}/index.html": f"page {i}" for i in range(50)}
+    _build(out, index, files)
+
+    moved = []
+    replace = O.os.replace
+    monkeypatch.setattr(O.os, "replace", lambda src, dest: (moved.append(Path(dest)), replace(src, dest)))
+    # Sans ré-écrire les autres pages : ni copie ni stat de l'arbre en ligne
+    stats = _build(out, index, {"p/3/index.html": "page 3 modifiée", "p/4/index.html": "page 4"},
+                   remove=["p/5", "p/6/index.html"])
+    assert stats["files_written"] == 1 and stats["files_skipped"] == 1
+    assert [p.relative_to(out).as_posix() for p in moved if p.is_relative_to(out)] == ["p/3/index.html"]
+    assert not (out / "p/5").exists() and not (out / "p/6/index.html").exists()
+    assert (out / "p/7/index.html").read_text() == "page 7"
+    kept = json.loads(index.read_text())
+    assert "p/5/index.html" not in kept and "p/7/index.html" in kept
+
+    # Dossier supprimé mais fichier inchangé (donc non réécrit) de ce build : gardé
+    _build(out, index, {"p/8/index.html": "page 8"}, remove=["p/8", "p/9"])
+    assert (out / "p/8/index.html").read_text() == "page 8" and not (out / "p/9").exists()
+
+def test_interrupted_commit_is_replayed(tmp_path, monkeypatch):
+    out, index = tmp_path / "site_build", tmp_path / ".cache" / "hashes.json"
+    _build(out, index, {"a.html": "a", "b.html": "b", "old/x.html": "x"})
+
+    replace = O.os.replace
+    def crash(src, dest):                            # staging -> OUT seulement
+        if Path(src).parent != Path(dest).parent:
+            raise OSError("coupure")
+        replace(src, dest)
+    monkeypatch.setattr(O.os, "replace", crash)
+    with pytest.raises(OSError):
+        _build(out, index, {"a.html": "a2", "b.html": "b2"}, remove=["old"])
+    assert not (out / "old").exists()                # suppressions faites, déplacements non
+
+    monkeypatch.setattr(O.os, "replace", replace)
+    O.OutputWriter(out, index).recover()
+    assert (out / "a.html").read_text() == "a2" and (out / "b.html").read_text() == "b2"
+    assert not (tmp_path / ".site_build.commit.json").exists()
+
+def test_archive_is_reproducible(tmp_path):
+    src = tmp_path / "site"
+    O.write_file(src / "index.html", "<h1>ok</h1>")
+    O.write_file(src / "build_report.json", "{}")
+    O.archive(src, tmp_path / "a.tar.gz", exclude={"build_report.json"})
+    O.archive(src, tmp_path / "b.tar.gz", exclude={"build_report.json"})
+    assert (tmp_path / "a.tar.gz").read_bytes() == (tmp_path / "b.tar.gz").read_bytes()
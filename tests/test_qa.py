@@ -0,0 +1,64 @@
+import pandas as pd
+import src.qa_checks as Q
+import src.validate_data as V
+
+def test_reports_every_rule_across_chunks(tmp_path, monkeypatch):
+    (tmp_path / "suppliers.csv").write_text("id,name\nS1,a\nS2,b\n", encoding="utf-8")
+    monkeypatch.setattr(V, "DATA_DIR", tmp_path)
+    df = pd.DataFrame({
+        "id": [f"P{i}" for i in range(10)], "name": [f"n{i}" for i in range(10)],
+        "base_kgco2e": [1, 2, None, 60, 1, 1, 1, 1, 70, 1],
+        "distance_km": [10.0] * 10,
+        "biodiversity_risk": [0.1, 0.2, 0.3, 0.4, 1.5, 0.1, -0.2, 0.1, 0.1, 0.1],
+        "supplierId": ["S1", "S2", "S9", None, "S1", " S2", "S1", "X", "S1", "S1"],
+    })
+    cfg = {"no_missing_columns": True, "max_values": {"base_kgco2e": 50},
+           "ranges": {"biodiversity_risk": [0, 1]},
+           "references": {"supplierId": {"table": "suppliers.csv", "column": "id"},
+                          "lcaRefId": {"table": "lca.csv", "column": "ref"}}}
+    report = Q.check(df, cfg, chunksize=3)
+    assert report["chunks"] == 4 and not report["ok"]
+    by_rule = {v["rule"]: v for v in report["violations"]}
+    assert by_rule["references.lcaRefId"]["message"] == "colonne absente"
+    assert by_rule["missing_values.base_kgco2e"]["rows"] == 1
+    assert by_rule["max_values.base_kgco2e"]["rows"] == 2
+    assert [s["id"] for s in by_rule["max_values.base_kgco2e"]["samples"]] == ["P3", "P8"]
+    assert [s["id"] for s in by_rule["ranges.biodiversity_risk"]["samples"]] == ["P4", "P6"]
+    assert [s["supplierId"] for s in by_rule["references.supplierId"]["samples"]] == ["S9", "X"]
+    assert set(by_rule) == {"references.lcaRefId", "missing_values.base_kgco2e", "max_values.base_kgco2e",
+                            "ranges.biodiversity_risk", "references.supplierId"}
+
+def test_bound_rules_on_absent_columns_skipped_unless_strict():
+    df = pd.DataFrame({"id": ["P1"], "name": ["n"], "base_kgco2e": [1.0], "distance_km": [1.0],
+                       "biodiversity_risk": [0.1]})
+    cfg = {"no_missing_columns": True, "max_values": {"water_l": 100}, "ranges": {"score_x": [0, 1]}}
+    report = Q.check(df, cfg)
+    assert report["ok"] and report["rules"] == 5           # valeurs manquantes seulement
+    report = Q.check(df, {**cfg, "strict_columns": True})
+    assert not report["ok"]
+    assert {v["rule"]: v["message"] for v in report["violations"]} == {
+        "max_values.water_l": "colonne absente", "ranges.score_x": "colonne absente"}
+
+def test_clean_catalog_passes(tmp_path, monkeypatch):
+    from benchmarks.synth import generate
+    import src.dataset as D
+    generate(tmp_path, 500, seed=2)
+    monkeypatch.setattr(V, "DATA_DIR", tmp_path)
+    report = Q.check(D.load_joined(use_cache=False), Q.load_rules(), chunksize=128)
+    assert report["ok"] and report["rules"] == 10 and report["chunks"] == 4
+
+def test_streamed_chunks_match_in_memory_report(tmp_path, monkeypatch):
+    from benchmarks.synth import generate
+    import src.dataset as D
+    generate(tmp_path, 500, seed=3)
+    lines = (tmp_path / "products.csv").read_text(encoding="utf-8").splitlines()
+    fields = lines[7].split(","); fields[2] = ""                       # nom manquant
+    lines[7] = ",".join(fields)
+    (tmp_path / "products.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    monkeypatch.setattr(V, "DATA_DIR", tmp_path)
+
+    whole = Q.check(D.load_joined(use_cache=False), Q.load_rules(), chunksize=128)
+    streamed = Q.check(D.iter_joined(100), Q.load_rules())
+    assert streamed["chunks"] == 5 and streamed["rows"] == whole["rows"] == 500
+    assert streamed["violations"] == whole["violations"]
+    assert [v["rule"] for v in whole["violations"]] == ["missing_values.name"]
@@ -0,0 +1,13 @@
+import src.qr_codes as QR
+
+def test_generate_encodes_each_url_once(tmp_path):
+    out = tmp_path / "qr"; out.mkdir()
+    cache = tmp_path / "cache"
+    jobs = [("https://x/p/a/", out / "a.png"), ("https://x/p/a/", out / "a2.png"), ("https://x/p/b/", out / "b.png")]
+    stats = QR.generate(jobs, cache, workers=2)
+    assert stats["encoded"] == 2
+    assert (out / "a.png").read_bytes() == (out / "a2.png").read_bytes()
+    assert len(list(cache.glob("*.png"))) == 2
+
+    again = QR.generate(jobs, cache, workers=1)
+    assert again["encoded"] == 0 and again["from_cache"] == 3
@@ -0,0 +1,19 @@
+import numpy as np
+import qrcode
+from PIL import PdfParser
+import qr_sheet as S
+
+def test_qr_image_draws_encoded_matrix():
+    url = "https://example.org/eco-score/p/sku-1/"
+    qr = qrcode.QRCode(border=4); qr.add_data(url); qr.make(fit=True)
+    matrix = np.array(qr.get_matrix())
+    img = np.array(S.qr_image(url, 500))
+    k = 500 // len(matrix); off = (500 - k * len(matrix)) // 2
+    centers = img[off + k // 2::k, off + k // 2::k][:len(matrix), :len(matrix)]
+    assert ((centers == 0) == matrix).all()
+
+def test_write_pdf_streams_pages(tmp_path):
+    items = [{"url": f"https://x/p/{i}/", "name": f"P{i}", "grade": "A", "score": 90.0} for i in range(10)]
+    dest = tmp_path / "sheets.pdf"
+    assert S.write_pdf(iter(items), dest, workers=2) == 2
+    assert len(PdfParser.PdfParser(str(dest)).pages) == 2
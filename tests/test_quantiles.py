@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import src.build_site as B
+import src.quantiles as QS
+
+def _rank_error(values_sorted, x, q):
+    lo = np.searchsorted(values_sorted, x, side="left") / len(values_sorted)
+    hi = np.searchsorted(values_sorted, x, side="right") / len(values_sorted)
+    return 0.0 if lo <= q <= hi else min(abs(lo - q), abs(hi - q))
+
+def test_sketch_bounds_match_exact_quantiles_on_large_data():
+    rng = np.random.default_rng(7)
+    values = np.concatenate([rng.lognormal(1, 1.2, 1_500_000), rng.uniform(0, 3000, 500_000)])
+    rng.shuffle(values)
+    exact = np.sort(values)
+    for eps in (0.01, 0.002):
+        # 4 « workers », chacun par blocs, puis fusion
+        parts = [QS.sketch_chunks(np.array_split(part, 20), eps) for part in np.array_split(values, 4)]
+        sketch = parts[0]
+        for p in parts[1:]:
+            sketch.merge(p)
+        assert sketch.n == len(values) and len(sketch) < 4 * sketch.k
+        for q, x in zip((0.05, 0.5, 0.95), sketch.quantiles([0.05, 0.5, 0.95])):
+            assert _rank_error(exact, x, q) <= eps
+
+def test_small_catalog_is_exact_and_incremental_state_is_reused(tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"id": [f"P{i}" for i in range(200)], "distance_km": rng.uniform(0, 5000, 200)})
+    bounds = {}
+    B.prepare(df.copy(), bounds, {"method": "sketch"}, tmp_path / "state.pkl")
+    exact = df["distance_km"].quantile([0.05, 0.95]).tolist()
+    assert bounds["distance_km"] == exact
+
+    big = pd.DataFrame({"id": [f"P{i}" for i in range(300_000)], "v": rng.lognormal(0, 1, 300_000)})
+    _, state, rebuilt = QS.incremental_sketch(big["id"], big["v"], {}, eps=0.005)
+    assert rebuilt == QS.DEFAULT_BUCKETS
+    big.loc[[10, 20], "v"] = 1e6
+    big = big.drop(index=[30]).sample(frac=1, random_state=0)        # ordre des lignes sans effet
+    sk, state, rebuilt = QS.incremental_sketch(big["id"], big["v"], state, eps=0.005)
+    assert rebuilt <= 3
+    fresh, _, _ = QS.incremental_sketch(big["id"], big["v"], {}, eps=0.005)
+    assert sk.quantiles([0.05, 0.95]) == fresh.quantiles([0.05, 0.95])
@@ -0,0 +1,22 @@
+import src.render as R
+
+ITEM = {"name": "Yaourt {nature}", "slug": "1-yaourt", "grade": "B", "score": 72.5,
+        "base_kgco2e": 1.2, "distance_km": 180.0, "biodiversity_risk": 0.2}
+META = {"method_version": "1.0.0", "build_time": "2025-01-01T00:00:00Z",
+        "data_source": {"agribalyse": "v3.2", "distances": "Base Carbone", "biodiversity": "proxy"}}
+
+def test_render_product_all_locales():
+    r = R.Renderer("https://x.io/eco", META)
+    pages = r.render_product(ITEM)
+    assert list(pages) == ["fr", "en"]
+    assert '<html lang="fr">' in pages["fr"] and "Yaourt {nature}" in pages["fr"]
+    assert '<a href="https://x.io/eco/">← Retour</a>' in pages["fr"]
+    assert '<a href="https://x.io/eco/en/">← Back</a>' in pages["en"]
+    assert "Method version: 1.0.0" in pages["en"] and 'src="https://x.io/eco/qr/1-yaourt.png"' in pages["en"]
+    assert r.report()["product.en"]["count"] == 1
+
+def test_index_page_links_to_locale():
+    r = R.Renderer("https://x.io/eco", META, locales=["en"])
+    html = r.index_page("en", [ITEM], page=1, pages=2)
+    assert 'href="https://x.io/eco/en/p/1-yaourt/"' in html
+    assert 'href="https://x.io/eco/en/page/2/"' in html and "{pager}" not in html
@@ -33,3 +33,36 @@ def test_score_row_monotonic():
     s1,_ = score_row(r1, weights, bounds, bands)
     s2,_ = score_row(r2, weights, bounds, bands)
     assert s1 > s2  # plus “propre” -> score plus haut
+
+def test_score_frame_matches_score_row():
+    import numpy as np
+    from src.build_site import score_row as ref_score_row
+    from src.scoring import score_frame
+
+    rng = np.random.default_rng(42)
+    n = 200_000
+    df = pd.DataFrame({
+        "base_kgco2e": rng.uniform(-1, 12, n).round(3),
+        "distance_km": rng.uniform(0, 4000, n).round(0),
+        "biodiversity_risk": rng.uniform(0, 1, n).round(2),
+    })
+    weights = {"emissions":0.6, "distance":0.2, "biodiversity":0.2}
+    bounds = {"base_kgco2e":[0,10], "distance_km":[0,3000], "biodiversity_risk":[0,1]}
+    bands = [["A",80],["B",60],["C",40],["D",20],["E",0]]
+
+    scores, grades = score_frame(df, weights, bounds, bands)
+    expected = [ref_score_row(r, weights, bounds, bands) for r in df.to_dict(orient="records")]
+    assert scores.tolist() == [s for s, _ in expected]
+    assert grades.tolist() == [g for _, g in expected]
+
+def test_score_frame_degenerate_bounds():
+    from src.scoring import score_frame
+    df = pd.DataFrame({"base_kgco2e":[1.0], "distance_km":[5.0], "biodiversity_risk":[0.5]})
+    bounds = {"base_kgco2e":[2,2], "distance_km":[0,10], "biodiversity_risk":[0,1]}
+    scores, grades = score_frame(df, {"emissions":0.5, "distance":0.3, "biodiversity":0.2}, bounds, [])
+    assert scores.tolist() == [75.0] and grades.tolist() == ["E"]
+
+def test_round1_matches_python_round():
+    from src.scoring import round1
+    values = [0.15, 0.25, 2.675, 87.25, 99.95, 12.345]
+    assert round1(values).tolist() == [round(v, 1) for v in values]
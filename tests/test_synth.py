@@ -0,0 +1,13 @@
+import src.validate_data as V
+from benchmarks.synth import generate
+
+def test_synthetic_catalog_is_deterministic_and_valid(tmp_path, monkeypatch):
+    rows = generate(tmp_path / "a", 300, seed=1)
+    generate(tmp_path / "b", 300, seed=1)
+    assert rows["products.csv"] == 300
+    for name in rows:
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+    monkeypatch.setattr(V, "DATA_DIR", tmp_path / "a")
+    p, a, d, b = V.load_all()
+    assert set(p["id"]) == set(a["id"]) == set(d["id"]) == set(b["id"])
@@ -14,3 +14,64 @@ def test_validate_columns(tmp_path, monkeypatch):
     monkeypatch.setattr(V, "DATA_DIR", d)
     p,a,di,b = V.load_all()
     assert list(p.columns) == ["id","name"]
+
+def _write(d, products, agri="id,kgco2e_unit\na,1\n"):
+    (d / "products.csv").write_text(products, encoding="utf-8")
+    (d / "agribalyse.csv").write_text(agri, encoding="utf-8")
+    (d / "distances.csv").write_text("id,distance_km\na,10\n", encoding="utf-8")
+    (d / "biodiv.csv").write_text("id,biodiversity_risk\na,0.1\n", encoding="utf-8")
+
+def test_scan_all_detects_duplicates_across_chunks(tmp_path, monkeypatch):
+    import pytest
+    d = tmp_path / "data"; d.mkdir()
+    _write(d, "id,name,brand\na,x,B\nb,y,B\nc,z,B\na,w,B\n")
+    monkeypatch.setattr(V, "DATA_DIR", d)
+    with pytest.raises(ValueError, match=r"products: IDs dupliqués \['a'\]"):
+        V.scan_all(chunksize=2)
+
+def test_hash_collisions_rechecked_on_ids(tmp_path, monkeypatch):
+    import numpy as np, pandas as pd, pytest
+    d = tmp_path / "data"; d.mkdir()
+    _write(d, "id,name\na,x\nb,y\nc,z\nd,w\n")
+    monkeypatch.setattr(V, "DATA_DIR", d)
+    # Hash constant : tous les ids « entrent en collision »
+    monkeypatch.setattr(pd.util, "hash_array", lambda values, **kw: np.zeros(len(values), dtype=np.uint64))
+    assert V.scan_all(chunksize=2)["products"]["rows"] == 4
+    _write(d, "id,name\na,x\nb,y\nc,z\nb,w\n")
+    with pytest.raises(ValueError, match=r"products: IDs dupliqués \['b'\]"):
+        V.scan_all(chunksize=3)
+
+def test_scan_all_report(tmp_path, monkeypatch):
+    import pytest
+    d = tmp_path / "data"; d.mkdir()
+    _write(d, "id,name,brand\na,x,B\nb,y,B\nc,z,B\n")
+    monkeypatch.setattr(V, "DATA_DIR", d)
+    report = V.scan_all(chunksize=2)
+    assert report["products"] == {"rows": 3, "chunks": 2}
+    p, a, di, b = V.load_all()
+    assert list(p.columns) == ["id", "name", "brand"] and len(p) == 3
+
+    _write(d, "id,name\na,x\n", agri="id,kgco2e_unit\na,1\nb,-2\n")
+    with pytest.raises(ValueError, match="négatif"):
+        V.scan_all(chunksize=1)
+
+def test_load_joined_snapshot_reused_until_inputs_change(tmp_path, monkeypatch):
+    import src.dataset as D
+    d = tmp_path / "data"; d.mkdir()
+    _write(d, "id,name\na,x\nb,y\n")
+    monkeypatch.setattr(V, "DATA_DIR", d)
+    cache = tmp_path / "cache"
+
+    df = D.load_joined(cache)
+    assert list(df.columns) == ["id", "name", "base_kgco2e", "distance_km", "biodiversity_risk"]
+    assert df["base_kgco2e"].tolist()[0] == 1.0 and pd.isna(df["base_kgco2e"].tolist()[1])
+
+    calls = []
+    monkeypatch.setattr(V, "load_all", lambda: calls.append(1))
+    assert D.load_joined(cache).equals(df) and calls == []
+
+    (d / "distances.csv").write_text("id,distance_km\na,20\n", encoding="utf-8")
+    monkeypatch.undo()
+    monkeypatch.setattr(V, "DATA_DIR", d)
+    assert D.load_joined(cache)["distance_km"].tolist()[0] == 20.0
+    assert len(list(cache.glob("joined-*.pkl"))) == 1
@@ -0,0 +1,51 @@
+import json
+import numpy as np
+import pandas as pd
+import src.whatif as W
+from src.scoring import score_frame
+
+def test_batch_matches_score_frame_per_config():
+    rng = np.random.default_rng(4)
+    n = 5_000
+    df = pd.DataFrame({"id": [f"P{i}" for i in range(n)],
+                       "base_kgco2e": rng.uniform(0, 12, n).round(2),
+                       "distance_km": rng.uniform(0, 3500, n).round(0),
+                       "biodiversity_risk": rng.random(n).round(2)})
+    base = {"weights": {"emissions": 0.6, "distance": 0.2, "biodiversity": 0.2},
+            "bounds": {"base_kgco2e": [0, 10], "distance_km": [0, 3000], "biodiversity_risk": [0, 1]},
+            "grade_bands": [("A", 80), ("B", 60), ("C", 40), ("D", 20), ("E", 0)]}
+    candidates = W.weight_grid(0.1) + [
+        {"name": "bornes", "bounds": {"base_kgco2e": [1, 8]}},
+        {"name": "bandes", "grade_bands": [["A", 90], ["B", 70], ["C", 50], ["E", 0]]},
+    ]
+    configs = W.resolve(base, candidates)
+    assert len(configs) == 66 + 2
+
+    report = W.evaluate(df, base, configs, top=5, block_cells=40_000)   # plusieurs blocs
+    base_score, base_grades = score_frame(df, base["weights"], base["bounds"], base["grade_bands"])
+    for cfg, res in zip(configs, report["configs"]):
+        score, grades = score_frame(df, cfg["weights"], cfg["bounds"], cfg["grade_bands"])
+        assert res["mean_score"] == round(float(score.mean()), 2)
+        assert res["grades"] == {g: int((grades == g).sum()) for g, _ in cfg["grade_bands"]}
+        assert res["changed"] == int((grades != base_grades).sum())
+        assert sum(map(sum, res["transitions"]["counts"])) == n
+        assert abs(res["most_affected"][0]["delta"]) == round(float(np.abs(score - base_score).max()), 1)
+
+def test_missing_config_sections_use_build_defaults(tmp_path, monkeypatch):
+    import src.api as A
+    import src.build_site as B
+    import src.validate_data as V
+    from benchmarks.synth import generate
+    generate(tmp_path / "data", 20, seed=2)
+    (tmp_path / "config.yaml").write_text("meta:\n  method_version: '1.0.0'\n", encoding="utf-8")
+    monkeypatch.setattr(V, "DATA_DIR", tmp_path / "data")
+    monkeypatch.setattr(B, "CACHE_DIR", tmp_path / ".cache")
+    monkeypatch.setattr(B, "CONFIG_PATH", tmp_path / "config.yaml")
+
+    df, base = W.load_catalog()
+    assert base["weights"] == B.DEFAULT_WEIGHTS and base["grade_bands"] == B.DEFAULT_GRADE_BANDS
+    catalog = A.load_catalog()
+    score, _ = score_frame(df, base["weights"], base["bounds"], base["grade_bands"])
+    assert catalog.count == len(df)
+    for i in (0, 7, 19):
+        assert json.loads(catalog.by_key[str(df["id"].iloc[i])])["score"] == score[i]